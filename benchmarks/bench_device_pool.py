@@ -0,0 +1,93 @@
+"""
+多设备吞吐: 单进程同时驱动N台设备时每秒帧数与操作数
+使用 benchmarks/fake_adb.py 作为本地 adb 替身，无需模拟器
+用法: python -m benchmarks.bench_device_pool --devices 1 2 4 8 --seconds 5
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+import cv2
+import numpy as np
+
+from benchmarks import fake_adb
+from core.device_pool import DevicePool, mumu_ports
+from core.game_image_detector import GameImageDetector
+
+
+def make_fake_adb(directory):
+    """生成调用 fake_adb.py 的可执行包装，使其可以作为 adb_path 传入"""
+    script = os.path.abspath(fake_adb.__file__)
+    if os.name == "nt":
+        path = os.path.join(directory, "adb.bat")
+        content = f'@"{sys.executable}" "{script}" %*\n'
+    else:
+        path = os.path.join(directory, "adb")
+        content = f'#!/bin/sh\nexec "{sys.executable}" "{script}" "$@"\n'
+    with open(path, "w") as f:
+        f.write(content)
+    os.chmod(path, 0o755)
+    return path
+
+
+def build_detector(frame, count):
+    rng = np.random.default_rng(0)
+    detector = GameImageDetector()
+    for i in range(count):
+        x = int(rng.integers(0, frame.shape[1] - 96))
+        y = int(rng.integers(0, frame.shape[0] - 48))
+        detector.template_cache[f"t{i}"] = frame[y:y + 48, x:x + 96].copy()
+    return detector
+
+
+def main():
+    parser = argparse.ArgumentParser(description="多设备吞吐")
+    parser.add_argument("--frame", default="resources/test.png")
+    parser.add_argument("--devices", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--templates", type=int, default=5)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--seconds", type=float, default=5)
+    args = parser.parse_args()
+
+    frame = cv2.imread(args.frame)
+    if frame is None:
+        raise ValueError(f"无法读取图片: {args.frame}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        adb_path = make_fake_adb(tmp)
+        frame_path = os.path.join(tmp, "frame.png")
+        cv2.imwrite(frame_path, frame)
+        os.environ[fake_adb.FAKE_FRAME_ENV] = frame_path
+
+        detector = build_detector(frame, args.templates)
+
+        def bot(device):
+            frames = actions = 0
+            deadline = time.perf_counter() + args.seconds
+            while time.perf_counter() < deadline:
+                hits = device.find_elements(device.capture(), grayscale=True, pyramid_levels=2)
+                frames += 1
+                for x, y, _ in hits.values():
+                    device.tap(x, y)
+                    actions += 1
+            return frames, actions
+
+        print(f"{'设备数':>6} {'帧/秒':>10} {'操作/秒':>10} {'单设备帧/秒':>12}")
+        for count in args.devices:
+            with DevicePool(adb_path, detector=detector, detect_workers=args.workers) as pool:
+                pool.connect(mumu_ports(count))
+                with contextlib.redirect_stdout(io.StringIO()):
+                    results = pool.run(bot)
+
+            frames = sum(r[0] for r in results.values())
+            actions = sum(r[1] for r in results.values())
+            fps = frames / args.seconds
+            print(f"{count:>6} {fps:>10.2f} {actions / args.seconds:>10.2f} {fps / count:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
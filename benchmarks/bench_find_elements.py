@@ -0,0 +1,76 @@
+"""
+批量模板匹配: 每帧延迟随模板数量的变化
+逐个调用 find_element 与 find_elements 的几种配置对比，无需设备
+除标明"+位置提示"的配置外都关闭位置提示，各配置每帧都做完整搜索，结果可直接比较
+用法: python -m benchmarks.bench_find_elements --counts 1 5 10 20 40
+"""
+import argparse
+import contextlib
+import io
+import time
+
+import cv2
+import numpy as np
+
+from core.game_image_detector import GameImageDetector
+
+
+def build_library(frame, count, size=(96, 48), seed=0, use_hints=False):
+    """从画面中随机裁剪模板，模拟一个模板库"""
+    rng = np.random.default_rng(seed)
+    w, h = size
+    detector = GameImageDetector(use_hints=use_hints)
+    for i in range(count):
+        x = int(rng.integers(0, frame.shape[1] - w))
+        y = int(rng.integers(0, frame.shape[0] - h))
+        detector.template_cache[f"t{i}"] = frame[y:y + h, x:x + w].copy()
+    return detector
+
+
+def per_frame_ms(func, repeat):
+    func()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    return float(np.median(samples))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="批量模板匹配延迟")
+    parser.add_argument("--frame", default="resources/test.png")
+    parser.add_argument("--counts", type=int, nargs="+", default=[1, 5, 10, 20, 40])
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    frame = cv2.imread(args.frame)
+    if frame is None:
+        raise ValueError(f"无法读取图片: {args.frame}")
+
+    # 配置名 -> (是否使用位置提示, 每帧的调用)；两种接口都传入已解码的画面
+    configs = {
+        "find_element 循环": (False, lambda d: [d.find_element(frame, name) for name in d.template_cache]),
+        "find_elements": (False, lambda d: d.find_elements(frame)),
+        "+线程池": (False, lambda d: d.find_elements(frame, max_workers=args.workers)),
+        "+灰度": (False, lambda d: d.find_elements(frame, grayscale=True, max_workers=args.workers)),
+        "+灰度+金字塔2层": (False, lambda d: d.find_elements(frame, grayscale=True, pyramid_levels=2,
+                                                         max_workers=args.workers)),
+        "+位置提示": (True, lambda d: d.find_elements(frame)),
+    }
+
+    print(f"{'模板数':>6} " + " ".join(f"{name:>16}" for name in configs))
+    for count in args.counts:
+        row = []
+        # 屏蔽检测器逐条打印的日志，避免干扰计时
+        with contextlib.redirect_stdout(io.StringIO()):
+            for use_hints, run in configs.values():
+                # 每种配置使用各自的检测器，位置提示和缓存不会在配置之间共享
+                with build_library(frame, count, use_hints=use_hints) as detector:
+                    row.append(per_frame_ms(lambda: run(detector), args.repeat))
+        print(f"{count:>6} " + " ".join(f"{ms:>13.1f} ms" for ms in row))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+跨进程传帧: PNG落盘 vs multiprocessing.Queue(pickle) vs 共享内存帧总线
+主进程逐帧发送，子进程接收后回传确认，统计每帧往返延迟，无需设备
+用法: python -m benchmarks.bench_frame_bus --frames 50
+"""
+import argparse
+import multiprocessing
+import os
+import tempfile
+import time
+
+import cv2
+import numpy as np
+
+from core.frame_bus import FrameBus
+
+
+def png_worker(path, requests, acks):
+    while requests.get() is not None:
+        frame = cv2.imread(path)
+        acks.put(int(frame[0, 0, 0]))
+
+
+def queue_worker(requests, acks):
+    while True:
+        frame = requests.get()
+        if frame is None:
+            break
+        acks.put(int(frame[0, 0, 0]))
+
+
+def bus_worker(name, requests, acks):
+    bus = FrameBus.attach(name)
+    while True:
+        seq = requests.get()
+        if seq is None:
+            break
+        frame = bus.read(seq)
+        acks.put(int(frame.image[0, 0, 0]))
+        del frame
+    bus.close()
+
+
+def measure(name, target, args, send, requests, acks, frames):
+    process = multiprocessing.Process(target=target, args=args, daemon=True)
+    process.start()
+
+    samples = []
+    for i in range(frames + 1):
+        start = time.perf_counter()
+        send(i)
+        acks.get()
+        if i:
+            samples.append((time.perf_counter() - start) * 1000)
+
+    requests.put(None)
+    process.join()
+    print(f"{name:<20} 中位数 {np.median(samples):8.2f} ms/帧  p90 {np.percentile(samples, 90):8.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="跨进程传帧延迟")
+    parser.add_argument("--frame", default="resources/test.png")
+    parser.add_argument("--frames", type=int, default=50)
+    args = parser.parse_args()
+
+    frame = cv2.imread(args.frame)
+    if frame is None:
+        raise ValueError(f"无法读取图片: {args.frame}")
+
+    requests, acks = multiprocessing.Queue(), multiprocessing.Queue()
+
+    path = os.path.join(tempfile.mkdtemp(), "frame.png")
+
+    def send_png(i):
+        cv2.imwrite(path, frame)
+        requests.put(i)
+
+    measure("PNG落盘", png_worker, (path, requests, acks), send_png, requests, acks, args.frames)
+    os.remove(path)
+
+    measure("Queue(pickle)", queue_worker, (requests, acks), lambda i: requests.put(frame),
+            requests, acks, args.frames)
+
+    with FrameBus.create(slots=4, max_shape=frame.shape) as bus:
+        measure("共享内存帧总线", bus_worker, (bus.name, requests, acks),
+                lambda i: requests.put(bus.publish(frame, serial="bench")), requests, acks, args.frames)
+
+
+if __name__ == "__main__":
+    main()
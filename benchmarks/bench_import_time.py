@@ -0,0 +1,115 @@
+"""
+冷启动导入耗时: 每个入口模块在全新解释器中用 python -X importtime 导入，取多次的中位数
+同时检查无界面入口没有导入OCR、绘图等重型依赖；可保存/对比基线(格式同 benchmarks.suite)
+用法:
+    python -m benchmarks.bench_import_time --save import_baseline.json
+    python -m benchmarks.bench_import_time --compare import_baseline.json --threshold 0.3
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+from collections import defaultdict
+
+import numpy as np
+
+from benchmarks.suite import compare
+
+TARGETS = ["runtime", "core.adb_manager", "core.game_image_detector", "core.template_pack", "core.device_pool",
+           "core.ocr_worker", "core.debug_sink", "utils.image_debugger", "demo"]
+# 只做匹配和输入的入口，不应导入下列模块
+HEADLESS_TARGETS = ["runtime", "core.adb_manager", "core.game_image_detector", "core.template_pack"]
+HEAVY_MODULES = ["paddleocr", "paddle", "paddlex", "matplotlib", "av", "PIL", "torch"]
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def import_profile(module: str):
+    """
+    在新进程中导入模块
+    :return: (总耗时ms, 各顶层包自身耗时ms, 已导入模块名集合)，导入失败返回None
+    """
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            capture_output=True, text=True, cwd=ROOT)
+    if result.returncode != 0:
+        print(f"导入 {module} 失败: {result.stderr.strip().splitlines()[-1]}")
+        return None
+
+    total = 0.0
+    packages = defaultdict(float)
+    modules = set()
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        name = name.strip()
+        modules.add(name)
+        packages[name.split(".")[0]] += int(self_us) / 1000
+        if name == module:
+            total = int(cumulative_us) / 1000
+    return total, dict(packages), modules
+
+
+def main():
+    parser = argparse.ArgumentParser(description="冷启动导入耗时")
+    parser.add_argument("--targets", nargs="+", default=TARGETS)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=5, help="显示自身耗时最多的N个顶层包")
+    parser.add_argument("--save", help="保存结果为基线JSON")
+    parser.add_argument("--compare", help="与基线JSON对比")
+    parser.add_argument("--threshold", type=float, default=0.3, help="允许的相对回退比例")
+    parser.add_argument("--noise-ms", type=float, default=5.0, help="小于该绝对差值的变化不视为回退")
+    args = parser.parse_args()
+
+    results = {}
+    violations = []
+    for target in args.targets:
+        profiles = [import_profile(target) for _ in range(args.repeat)]
+        if None in profiles:
+            continue
+
+        totals = [total for total, _, _ in profiles]
+        packages = profiles[-1][1]
+        modules = profiles[-1][2]
+        heavy = sorted({name.split(".")[0] for name in modules} & set(HEAVY_MODULES))
+        results[f"import/{target}"] = {
+            "repeat": args.repeat,
+            "p50_ms": float(np.median(totals)),
+            "min_ms": float(min(totals)),
+            "modules": len(modules),
+            "heavy": heavy,
+        }
+
+        top = sorted(packages.items(), key=lambda item: item[1], reverse=True)[:args.top]
+        print(f"{target:<28} {np.median(totals):8.1f} ms  {len(modules):4d} 个模块  "
+              + ", ".join(f"{name} {ms:.1f}" for name, ms in top))
+        if heavy:
+            print(f"{'':<28} 重型依赖: {', '.join(heavy)}")
+            if target in HEADLESS_TARGETS:
+                violations.append(f"{target} 导入了 {', '.join(heavy)}")
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump({"meta": {"python": sys.version.split()[0]}, "results": results}, f,
+                      ensure_ascii=False, indent=2)
+        print(f"\n基线已保存: {args.save}")
+
+    failed = bool(violations)
+    for violation in violations:
+        print(f"无界面入口 {violation}")
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(results, baseline, args.threshold, args.noise_ms)
+        if regressions:
+            print(f"\n{len(regressions)} 个入口导入耗时回退超过 {args.threshold:.0%}: {', '.join(regressions)}")
+            failed = True
+
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+回放录制的会话，离线测量 截图 → 匹配 → 点击 主循环的端到端延迟，无需模拟器
+录制: python runtime.py --templates <模板目录> --tap ... --record session.rec
+回放: python -m benchmarks.bench_replay session.rec --templates <模板目录或模板包> --tap start_button
+没有录制文件时可用 --make-sample 由 resources/ 下的截图生成一段示例录制
+"""
+import argparse
+import contextlib
+import io
+import json
+
+import cv2
+
+from core.game_image_detector import GameImageDetector
+from core.session_recorder import ReplayDevice, SessionRecorder, SessionReplay
+from core.tracing import tracer
+from runtime import load_detector, run
+
+
+def make_sample(path, images, frames=60, change_every=10):
+    """用几张截图生成示例录制: 每 change_every 帧切换一次画面，其余为重复帧或局部变化"""
+    sources = []
+    for image in images:
+        frame = cv2.imread(image)
+        if frame is None:
+            raise ValueError(f"无法读取图片: {image}")
+        sources.append(frame)
+
+    with SessionRecorder(path) as recorder:
+        for i in range(frames):
+            frame = sources[i // change_every % len(sources)].copy()
+            if i % 3 == 0:
+                # 模拟计时器等局部变化
+                cv2.putText(frame, f"{i:04d}", (40, 60), cv2.FONT_HERSHEY_SIMPLEX, 1.2, (255, 255, 255), 2)
+            recorder.add_frame(frame)
+    return recorder.stats()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="会话回放端到端延迟")
+    parser.add_argument("recording")
+    parser.add_argument("--templates", help="模板目录或模板包；不指定时只测截图解码")
+    parser.add_argument("--base-resolution", default="1920x1080", help="采集模板时的分辨率")
+    parser.add_argument("--tap", nargs="*", default=[], help="按优先级排列的要点击的模板名，默认全部模板")
+    parser.add_argument("--speed", type=float, help="回放倍速，默认最快速度")
+    parser.add_argument("--make-sample", action="store_true", help="先由截图生成示例录制")
+    parser.add_argument("--images", nargs="+", default=["resources/test.png", "resources/screenshot.png"])
+    parser.add_argument("--trace", help="导出 Chrome trace 文件")
+    args = parser.parse_args()
+
+    if args.make_sample:
+        stats = make_sample(args.recording, args.images)
+        print(f"示例录制: {stats['frames']} 帧，其中重复 {stats['repeats']} 帧，"
+              f"{stats['raw_mb']:.1f} MB -> {stats['stored_mb']:.1f} MB")
+
+    replay = SessionReplay(args.recording)
+    print(f"录制: {len(replay)} 帧，{len(replay.events)} 个操作，时长 {replay.duration:.1f}s")
+
+    device = ReplayDevice(replay, speed=args.speed)
+    if args.templates:
+        base_resolution = tuple(int(v) for v in args.base_resolution.lower().split("x"))
+        # 与 runtime.py 相同的加载方式，模板目录按录制画面的分辨率缩放
+        detector = load_detector(device, args.templates, base_resolution)
+    else:
+        detector = GameImageDetector()
+    tap_names = args.tap or list(detector.template_cache)
+
+    tracer.reset()
+    tracer.enable()
+    # 屏蔽检测器逐条打印的日志，避免干扰计时
+    with contextlib.redirect_stdout(io.StringIO()):
+        frames = run(device, detector, tap_names, interval=0, max_frames=0)
+
+    summary = tracer.summary()
+    print(f"处理 {frames} 帧，回放中点击 {len(device.issued_events)} 次"
+          f"(录制时 {sum(1 for _, event in replay.events if event['type'] == 'tap')} 次)")
+    print(f"{'阶段':<16} {'次数':>6} {'p50':>9} {'p90':>9} {'p99':>9}")
+    for name, stats in sorted(summary["spans"].items()):
+        print(f"{name:<16} {stats['count']:>6} {stats['p50_ms']:>7.1f}ms {stats['p90_ms']:>7.1f}ms "
+              f"{stats['p99_ms']:>7.1f}ms")
+    if summary["counters"]:
+        print(json.dumps(summary["counters"], ensure_ascii=False))
+
+    if args.trace:
+        tracer.export_chrome_trace(args.trace)
+        print(f"trace 已导出: {args.trace}")
+
+
+if __name__ == "__main__":
+    main()
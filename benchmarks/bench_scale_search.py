@@ -0,0 +1,67 @@
+"""
+多尺度匹配: 逐尺度全图匹配 vs 金字塔粗到精，对比精度与延迟
+模板从 resources/ 下的截图中裁剪后按已知比例缩放，模拟不同分辨率设备上采集的模板，无需设备
+用法: python -m benchmarks.bench_scale_search --levels 1 2 3
+"""
+import argparse
+import time
+
+import cv2
+import numpy as np
+
+from core.image_detector import ImageDetector
+
+
+def make_cases(frame, count, seed=0, size=(120, 60), scales=(0.85, 0.95, 1.05, 1.15)):
+    """返回 (模板, 期望中心, 期望尺度) 列表"""
+    rng = np.random.default_rng(seed)
+    w, h = size
+    cases = []
+    for i in range(count):
+        x = int(rng.integers(0, frame.shape[1] - w))
+        y = int(rng.integers(0, frame.shape[0] - h))
+        scale = scales[i % len(scales)]
+        crop = frame[y:y + h, x:x + w]
+        # 模板按 1/scale 缩放，匹配时需要用 scale 放大回原尺寸
+        template = cv2.resize(crop, (int(round(w / scale)), int(round(h / scale))), interpolation=cv2.INTER_AREA)
+        cases.append((template, (x + w // 2, y + h // 2), scale))
+    return cases
+
+
+def run(detector, frame, cases, **kwargs):
+    latencies = []
+    hits = 0
+    for template, (cx, cy), _ in cases:
+        start = time.perf_counter()
+        match = detector.find_template_with_scale(frame, template, scale_range=(0.8, 1.2), scale_steps=9, **kwargs)
+        latencies.append((time.perf_counter() - start) * 1000)
+        # 中心误差在4像素内视为命中
+        if match and abs(match[0] - cx) <= 4 and abs(match[1] - cy) <= 4:
+            hits += 1
+    return float(np.median(latencies)), hits / len(cases)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="多尺度匹配精度/延迟对比")
+    parser.add_argument("--frames", nargs="+", default=["resources/test.png", "resources/screenshot.png"])
+    parser.add_argument("--cases", type=int, default=8)
+    parser.add_argument("--levels", type=int, nargs="+", default=[1, 2, 3])
+    args = parser.parse_args()
+
+    detector = ImageDetector()
+    for path in args.frames:
+        frame = cv2.imread(path)
+        if frame is None:
+            raise ValueError(f"无法读取图片: {path}")
+
+        cases = make_cases(frame, args.cases)
+        print(path)
+        base_ms, base_acc = run(detector, frame, cases)
+        print(f"  {'逐尺度全图':<12} {base_ms:8.1f} ms  命中率 {base_acc:5.0%}")
+        for levels in args.levels:
+            ms, acc = run(detector, frame, cases, pyramid_levels=levels)
+            print(f"  {f'金字塔{levels}层':<12} {ms:8.1f} ms  命中率 {acc:5.0%}  加速 {base_ms / ms:5.1f}x")
+
+
+if __name__ == "__main__":
+    main()
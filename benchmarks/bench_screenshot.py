@@ -0,0 +1,54 @@
+"""
+截图吞吐对比: 旧的 sdcard+pull 路径 vs exec-out 内存路径
+用法: python -m benchmarks.bench_screenshot --port 16384 --frames 20
+"""
+import argparse
+import time
+
+import cv2
+import numpy as np
+
+from core.adb_manager import ADBManager
+
+
+def measure(name, capture, frames):
+    # 预热一次，排除首次连接开销
+    capture()
+
+    start = time.perf_counter()
+    for _ in range(frames):
+        capture()
+    elapsed = time.perf_counter() - start
+
+    fps = frames / elapsed
+    print(f"{name:<24} {fps:6.2f} fps  {elapsed / frames * 1000:8.1f} ms/帧")
+    return fps
+
+
+def legacy_capture(adb):
+    # 旧路径，同时计入转换为BGR数组的开销，保证结果可比
+    img = adb.screenshot()
+    return cv2.cvtColor(np.array(img), cv2.COLOR_RGB2BGR)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="截图吞吐对比")
+    parser.add_argument("--adb", default="adb")
+    parser.add_argument("--ip", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=16384)
+    parser.add_argument("--frames", type=int, default=20)
+    args = parser.parse_args()
+
+    adb = ADBManager(adb_path=args.adb, default_port=args.port)
+    if not adb.connect_device(args.ip, args.port):
+        raise RuntimeError("无法连接到设备")
+
+    baseline = measure("screenshot (sdcard+pull)", lambda: legacy_capture(adb), args.frames)
+    raw = measure("exec-out raw", lambda: adb.screenshot_array(raw=True), args.frames)
+    png = measure("exec-out png", lambda: adb.screenshot_array(raw=False), args.frames)
+
+    print(f"raw 加速比: {raw / baseline:.2f}x, png 加速比: {png / baseline:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+本地 adb 替身，供无设备的基准测试使用
+支持: devices / connect / disconnect / exec-out screencap / shell(单条命令或常驻会话)
+截图内容取自环境变量 FAKE_ADB_FRAME 指向的图片
+"""
+import os
+import struct
+import sys
+
+import cv2
+
+FAKE_DEVICES_ENV = "FAKE_ADB_DEVICES"
+FAKE_FRAME_ENV = "FAKE_ADB_FRAME"
+
+
+def raw_screencap(path):
+    # 与 screencap 原始输出相同的格式: 16字节头 + RGBA像素
+    cache_path = path + ".raw"
+    if not os.path.exists(cache_path):
+        image = cv2.cvtColor(cv2.imread(path), cv2.COLOR_BGR2RGBA)
+        h, w = image.shape[:2]
+        with open(cache_path, "wb") as f:
+            f.write(struct.pack("<4I", w, h, 1, 0) + image.tobytes())
+    with open(cache_path, "rb") as f:
+        return f.read()
+
+
+def shell_session():
+    # 常驻会话只需回显哨兵，其余命令(input tap 等)视为成功执行
+    for line in sys.stdin:
+        line = line.strip()
+        if line.startswith("echo "):
+            sys.stdout.write(line[5:] + "\n")
+            sys.stdout.flush()
+
+
+def main(argv):
+    while argv and argv[0] == "-s":
+        argv = argv[2:]
+    if not argv:
+        return
+
+    command = argv[0]
+    if command == "devices":
+        print("List of devices attached")
+        for serial in os.environ.get(FAKE_DEVICES_ENV, "").split(","):
+            if serial:
+                print(f"{serial}\tdevice")
+    elif command == "connect":
+        print(f"connected to {argv[1]}")
+    elif command == "exec-out" and argv[1:2] == ["screencap"]:
+        sys.stdout.buffer.write(raw_screencap(os.environ[FAKE_FRAME_ENV]))
+    elif command == "shell" and len(argv) == 1:
+        shell_session()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
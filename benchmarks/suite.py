@@ -0,0 +1,226 @@
+"""
+离线基准套件: 模板匹配与OCR结果解析的热点路径，无需设备
+使用 resources/ 下的截图和合成画面，扫描分辨率、模板数量、尺度步数和OCR结果规模，
+输出延迟分位数与内存峰值；可保存为基线JSON，之后与基线对比，回退超过阈值时以非零状态退出。
+
+用法:
+    python -m benchmarks.suite --save baseline.json
+    python -m benchmarks.suite --compare baseline.json --threshold 0.2
+    python -m benchmarks.suite --filter find_template/ --repeat 20
+"""
+import argparse
+import contextlib
+import io
+import json
+import platform
+import sys
+import time
+import tracemalloc
+
+import cv2
+import numpy as np
+
+from core.game_image_detector import GameImageDetector
+from core.image_detector import ImageDetector
+from core.paddle_result import PaddleResult
+
+RESOLUTIONS = [(1280, 720), (1920, 1080), (2560, 1440)]
+TEMPLATE_COUNTS = [1, 10, 40]
+SCALE_STEPS = [5, 9, 15]
+OCR_SIZES = [10, 100, 1000]
+TEMPLATE_SIZE = (96, 48)
+
+
+def synthetic_frame(width, height, seed=0):
+    """随机色块 + 文字的合成画面，纹理接近游戏界面"""
+    rng = np.random.default_rng(seed)
+    frame = np.full((height, width, 3), 40, dtype=np.uint8)
+    for _ in range(120):
+        x, y = int(rng.integers(0, width)), int(rng.integers(0, height))
+        w, h = int(rng.integers(20, width // 6)), int(rng.integers(20, height // 6))
+        color = tuple(int(c) for c in rng.integers(0, 256, 3))
+        cv2.rectangle(frame, (x, y), (x + w, y + h), color, -1)
+    for i in range(40):
+        x, y = int(rng.integers(0, width - 100)), int(rng.integers(20, height))
+        cv2.putText(frame, f"item{i}", (x, y), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255, 255, 255), 2)
+    return frame
+
+
+def load_frames(paths):
+    """name -> 1080p 画面"""
+    frames = {}
+    for path in paths:
+        frame = cv2.imread(path)
+        if frame is None:
+            raise ValueError(f"无法读取图片: {path}")
+        frames[path.replace("\\", "/").rsplit("/", 1)[-1].rsplit(".", 1)[0]] = frame
+    frames["synthetic"] = synthetic_frame(1920, 1080)
+    return frames
+
+
+def crop_templates(frame, count, size=TEMPLATE_SIZE, seed=0):
+    """从画面中随机裁剪模板，返回 [(模板, (x, y))]"""
+    rng = np.random.default_rng(seed)
+    w, h = size
+    crops = []
+    for _ in range(count):
+        x = int(rng.integers(0, frame.shape[1] - w))
+        y = int(rng.integers(0, frame.shape[0] - h))
+        crops.append((frame[y:y + h, x:x + w].copy(), (x, y)))
+    return crops
+
+
+def ocr_output(count, seed=0):
+    """构造 PaddleOCR predict 格式的识别结果"""
+    rng = np.random.default_rng(seed)
+    texts, polys = [], []
+    for i in range(count):
+        x, y = int(rng.integers(0, 1800)), int(rng.integers(0, 1040))
+        texts.append(f"按钮{i}" if i % 3 else f"item-{i}")
+        polys.append([[x, y], [x + 80, y], [x + 80, y + 30], [x, y + 30]])
+    return [{"rec_texts": texts, "rec_polys": polys}]
+
+
+def build_cases(frames):
+    """返回 {用例名: 无参函数}"""
+    detector = ImageDetector()
+    cases = {}
+
+    for name, base in frames.items():
+        for width, height in RESOLUTIONS:
+            frame = base if (width, height) == base.shape[1::-1] else cv2.resize(base, (width, height),
+                                                                                 interpolation=cv2.INTER_AREA)
+            (template, (x, y)), = crop_templates(frame, 1)
+            region = (max(x - 150, 0), max(y - 100, 0), 300 + TEMPLATE_SIZE[0], 200 + TEMPLATE_SIZE[1])
+            key = f"{width}x{height}/{name}"
+            cases[f"find_template/{key}"] = lambda f=frame, t=template: detector.find_template(f, t)
+            cases[f"find_all_templates/{key}"] = lambda f=frame, t=template: detector.find_all_templates(f, t)
+            cases[f"find_template_in_region/{key}"] = \
+                lambda f=frame, t=template, r=region: detector.find_template_in_region(f, t, r)
+
+    frame = frames["synthetic"]
+    (template, _), = crop_templates(frame, 1, seed=1)
+    template = cv2.resize(template, None, fx=0.9, fy=0.9, interpolation=cv2.INTER_AREA)
+    for steps in SCALE_STEPS:
+        cases[f"find_template_with_scale/steps{steps}"] = \
+            lambda s=steps: detector.find_template_with_scale(frame, template, scale_range=(0.8, 1.2), scale_steps=s)
+
+    for count in TEMPLATE_COUNTS:
+        game_detector = GameImageDetector(use_hints=False)
+        for i, (template, _) in enumerate(crop_templates(frame, count, seed=2)):
+            game_detector.template_cache[f"t{i}"] = template
+        cases[f"find_elements/templates{count}"] = lambda d=game_detector: d.find_elements(frame)
+
+    for count in OCR_SIZES:
+        raw = ocr_output(count)
+
+        def parse_and_lookup(raw=raw, count=count):
+            result = PaddleResult(paddle_result=raw)
+            result.try_get_text_coord(f"按钮{count - 1}")
+            result.try_get_text_coord_in_range("item", 0, 0, 960, 540)
+            return result
+
+        cases[f"paddle_result/items{count}"] = parse_and_lookup
+
+    return cases
+
+
+def measure(func, repeat, warmup=1):
+    # 屏蔽检测器逐条打印的日志，避免干扰计时
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(warmup):
+            func()
+
+        samples = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            samples.append((time.perf_counter() - start) * 1000)
+
+        # tracemalloc 会拖慢Python代码，单独跑一次只测内存峰值(只统计经Python分配器的内存，含numpy数组)
+        tracemalloc.start()
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    p50, p90, p99 = np.percentile(samples, [50, 90, 99])
+    return {
+        "repeat": repeat,
+        "mean_ms": float(np.mean(samples)),
+        "p50_ms": float(p50),
+        "p90_ms": float(p90),
+        "p99_ms": float(p99),
+        "peak_kb": peak / 1024,
+    }
+
+
+def compare(results, baseline, threshold, noise_ms):
+    """
+    按 p50 对比，超过 基线*(1+threshold) 且绝对差值大于 noise_ms 视为回退
+    :return: 回退的用例名列表
+    """
+    regressions = []
+    print(f"\n{'用例':<48} {'基线p50':>10} {'当前p50':>10} {'变化':>8}")
+    for name, current in results.items():
+        base = baseline.get(name)
+        if base is None:
+            print(f"{name:<48} {'-':>10} {current['p50_ms']:>8.2f}ms {'新增':>8}")
+            continue
+
+        change = current["p50_ms"] / base["p50_ms"] - 1 if base["p50_ms"] else 0.0
+        regressed = change > threshold and current["p50_ms"] - base["p50_ms"] > noise_ms
+        flag = "  回退" if regressed else ""
+        print(f"{name:<48} {base['p50_ms']:>8.2f}ms {current['p50_ms']:>8.2f}ms {change:>+8.1%}{flag}")
+        if regressed:
+            regressions.append(name)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="离线基准套件")
+    parser.add_argument("--frames", nargs="+", default=["resources/test.png", "resources/screenshot.png"])
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--filter", default="", help="只运行名称包含该字符串的用例")
+    parser.add_argument("--save", help="保存结果为基线JSON")
+    parser.add_argument("--compare", help="与基线JSON对比")
+    parser.add_argument("--threshold", type=float, default=0.2, help="p50 允许的相对回退比例")
+    parser.add_argument("--noise-ms", type=float, default=0.2, help="小于该绝对差值的变化不视为回退")
+    args = parser.parse_args()
+
+    cases = build_cases(load_frames(args.frames))
+    results = {}
+    print(f"{'用例':<48} {'p50':>9} {'p90':>9} {'p99':>9} {'内存峰值':>10}")
+    for name, func in cases.items():
+        if args.filter not in name:
+            continue
+        stats = results[name] = measure(func, args.repeat)
+        print(f"{name:<48} {stats['p50_ms']:>7.2f}ms {stats['p90_ms']:>7.2f}ms {stats['p99_ms']:>7.2f}ms "
+              f"{stats['peak_kb']:>8.0f}KB")
+
+    if args.save:
+        report = {
+            "meta": {
+                "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+                "python": platform.python_version(),
+                "numpy": np.__version__,
+                "opencv": cv2.__version__,
+                "machine": platform.platform(),
+            },
+            "results": results,
+        }
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"\n基线已保存: {args.save}")
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(results, baseline, args.threshold, args.noise_ms)
+        if regressions:
+            print(f"\n{len(regressions)} 个用例回退超过 {args.threshold:.0%}: {', '.join(regressions)}")
+            sys.exit(1)
+        print("\n无回退")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,23 +1,117 @@
 import os
 import subprocess
-import tempfile
 import time
 
 import cv2
 import numpy as np
-from PIL import Image
+
+from core.adb_session import ADBShellSession
+from core.gesture_macro import GestureMacro
+from core.image_detector import ImageDetector
+from core.session_recorder import SessionRecorder
+from core.stream_capture import ScreenStream
+from core.template_cache import default_template_cache
+from core.template_profile import TemplateProfile, prepare_template, split_alpha
+from core.tracing import traced, tracer
+
+
+# screencap 原始输出的像素格式(android.graphics.PixelFormat)
+SCREENCAP_FORMAT_RGBA_8888 = 1
+SCREENCAP_FORMAT_RGBX_8888 = 2
+
+# 一次shell往返取回全部属性与屏幕尺寸
+DEVICE_INFO_COMMAND = "getprop; wm size"
+
+
+@traced("decode")
+def decode_raw_screencap(data):
+    """
+    解析 `screencap` 原始输出为BGR图像
+    头部为小端 width/height/format(Android 9起额外带4字节colorspace)，其后为逐行像素
+    :param data: screencap 输出的字节串
+    :return: BGR格式的 np.ndarray
+    """
+    if len(data) < 12:
+        raise ValueError(f"screencap 输出过短: {len(data)} 字节")
+
+    width, height, pixel_format = np.frombuffer(data, dtype="<u4", count=3)
+    if pixel_format not in (SCREENCAP_FORMAT_RGBA_8888, SCREENCAP_FORMAT_RGBX_8888):
+        raise ValueError(f"不支持的 screencap 像素格式: {pixel_format}")
+
+    pixel_bytes = int(width) * int(height) * 4
+    header_size = len(data) - pixel_bytes
+    if header_size not in (12, 16):
+        raise ValueError(f"screencap 数据长度不匹配: {len(data)} 字节, 分辨率 {width}x{height}")
+
+    rgba = np.frombuffer(data, dtype=np.uint8, offset=header_size).reshape(int(height), int(width), 4)
+    return cv2.cvtColor(rgba, cv2.COLOR_RGBA2BGR)
+
+
+@traced("decode")
+def decode_png_screencap(data):
+    """
+    解码 `screencap -p` 输出的PNG字节为BGR图像
+    :param data: PNG字节串
+    :return: BGR格式的 np.ndarray
+    """
+    image = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_COLOR)
+    if image is None:
+        raise ValueError("无法解码 screencap PNG 数据")
+    return image
+
+
+def match_template_file(screen_cv, template_path, threshold, prepared_templates):
+    """
+    在截图中查找模板文件，find_image_on_screen 的匹配部分(同步和异步版本共用)
+    模板旁有预处理配置(同名 .json)或为透明PNG时，与 GameImageDetector 一样按配置匹配
+    :param prepared_templates: 模板路径 -> (缓存中的模板数组, BGR模板, 预处理模板)，模板文件更新后按新数组重建
+    :return: 匹配位置的中心坐标(x,y)，未找到返回None
+    """
+    raw = default_template_cache.get(template_path, cv2.IMREAD_UNCHANGED)
+    if raw is None:
+        raise ValueError(f"无法读取模板图片: {template_path}")
+
+    cached = prepared_templates.get(template_path)
+    if cached is None or cached[0] is not raw:
+        template, mask = split_alpha(raw)
+        profile = TemplateProfile.load(template_path)
+        prepared = None
+        if not profile.is_default or (mask is not None and profile.use_mask):
+            prepared = prepare_template(template, mask, profile)
+        cached = prepared_templates[template_path] = (raw, template, prepared)
+    _, template, prepared = cached
+
+    if prepared is not None:
+        result = ImageDetector().match_profiled(screen_cv, prepared, threshold)
+        return result[:2] if result else None
+
+    result = cv2.matchTemplate(screen_cv, template, cv2.TM_CCOEFF_NORMED)
+    min_val, max_val, min_loc, max_loc = cv2.minMaxLoc(result)
+
+    if max_val >= threshold:
+        # 返回中心点坐标
+        h, w = template.shape[:2]
+        return (max_loc[0] + w // 2, max_loc[1] + h // 2)
+    return None
 
 
 class ADBManager:
-    def __init__(self, adb_path="adb", default_port=5555):
+    def __init__(self, adb_path="adb", default_port=5555, persistent_shell=False):
         """
         初始化ADB管理器
         :param adb_path: adb可执行文件路径
         :param default_port: 默认连接端口
+        :param persistent_shell: 是否通过常驻 adb shell 会话执行 shell 命令
         """
         self.adb_path = adb_path
         self.default_port = default_port
         self.device_serial = None
+        self.persistent_shell = persistent_shell
+        self._shell_session = None
+        # 开启录制后 screenshot_array 的帧和输入操作都会写入录制文件
+        self.recorder = None
+        # find_image_on_screen 的预处理模板缓存，见 match_template_file
+        self._prepared_templates = {}
 
     def check_adb_available(self):
         """检查ADB是否可用"""
@@ -49,35 +143,86 @@ class ADBManager:
 
     def disconnect_device(self):
         """断开当前连接的设备"""
+        self.release()
         if self.device_serial:
             subprocess.run([self.adb_path, "disconnect", self.device_serial])
             self.device_serial = None
 
-    def execute_command(self, command, with_device=True):
+    def release(self):
+        """停止录制并关闭常驻shell会话，不断开设备的adb连接"""
+        self.stop_recording()
+        if self._shell_session:
+            self._shell_session.close()
+            self._shell_session = None
+
+    def execute_command(self, command, with_device=True, timeout=None):
         """
         执行ADB命令
         :param command: 命令字符串或列表
         :param with_device: 是否包含设备序列号
+        :param timeout: 超时时间(秒)，None 时常驻会话使用其默认超时，普通命令不限时
         :return: 命令执行结果
         """
         if isinstance(command, str):
             command = command.split()
 
+        if self.persistent_shell and with_device and command and command[0] == "shell":
+            # 与 adb 行为一致: 参数以空格拼接后交给设备端shell解释
+            with tracer.span("adb.session", command=command):
+                return self.shell_session.run(" ".join(command[1:]), timeout)
+
+        with tracer.span("adb.command", command=command):
+            result = subprocess.run(self._build_command(command, with_device),
+                                    capture_output=True,
+                                    text=True,
+                                    timeout=timeout)
+        return result.stdout.strip()
+
+    @property
+    def shell_session(self):
+        """当前设备的常驻shell会话(按需创建)"""
+        if self._shell_session is None or self._shell_session.device_serial != self.device_serial:
+            if self._shell_session:
+                self._shell_session.close()
+            self._shell_session = ADBShellSession(self.adb_path, self.device_serial)
+        return self._shell_session
+
+    def exec_out(self, command):
+        """
+        通过 adb exec-out 执行命令并返回原始二进制输出(不经过shell换行转换)
+        :param command: 命令字符串或列表
+        :return: stdout 字节串
+        """
+        if isinstance(command, str):
+            command = command.split()
+
+        with tracer.span("adb.exec_out", command=command):
+            result = subprocess.run(self._build_command(["exec-out"] + list(command)),
+                                    capture_output=True)
+        if result.returncode != 0:
+            raise RuntimeError(f"exec-out 执行失败: {result.stderr.decode(errors='ignore').strip()}")
+        return result.stdout
+
+    def _build_command(self, command, with_device=True):
+        """拼接完整的adb命令行"""
+        if isinstance(command, str):
+            command = command.split()
+
         full_command = [self.adb_path]
         if with_device and self.device_serial:
             full_command.extend(["-s", self.device_serial])
         full_command.extend(command)
-
-        result = subprocess.run(full_command,
-                                capture_output=True,
-                                text=True)
-        return result.stdout.strip()
+        return full_command
 
     # 基本操作功能
+    @traced("input")
     def tap(self, x, y):
         """点击屏幕指定位置"""
         self.execute_command(["shell", "input", "tap", str(x), str(y)])
+        if self.recorder:
+            self.recorder.add_event("tap", x=int(x), y=int(y))
 
+    @traced("input")
     def swipe(self, x1, y1, x2, y2, duration=300):
         """滑动/拖拽操作"""
         self.execute_command([
@@ -85,26 +230,51 @@ class ADBManager:
             str(x1), str(y1), str(x2), str(y2),
             str(duration)
         ])
+        if self.recorder:
+            self.recorder.add_event("swipe", x1=int(x1), y1=int(y1), x2=int(x2), y2=int(y2), duration=int(duration))
 
     def long_press(self, x, y, duration=1000):
         """长按操作"""
         self.swipe(x, y, x, y, duration)
 
+    @traced("input")
     def press_key(self, keycode):
         """按键操作"""
         self.execute_command(["shell", "input", "keyevent", str(keycode)])
+        if self.recorder:
+            self.recorder.add_event("key", keycode=str(keycode))
 
+    @traced("input")
     def input_text(self, text):
         """输入文本"""
         self.execute_command(["shell", "input", "text", text])
+        if self.recorder:
+            self.recorder.add_event("text", text=text)
+
+    @traced("input.macro")
+    def run_macro(self, macro):
+        """
+        一次adb往返执行手势宏(GestureMacro)，步骤间隔由设备端计时
+        :param macro: GestureMacro 对象或宏文件路径
+        """
+        if isinstance(macro, str):
+            macro = GestureMacro.load(macro)
+        macro.run(self)
+        if self.recorder:
+            self.recorder.add_event("macro", steps=macro.steps)
 
     # 屏幕相关功能
+    @traced("capture")
     def screenshot(self, save_path=None):
         """
         截取屏幕
         :param save_path: 保存路径，如果为None则返回PIL.Image对象
         :return: 如果save_path为None则返回Image对象，否则返回保存路径
         """
+        # 只有旧截图路径需要PIL，按需导入以加快启动
+        import tempfile
+        from PIL import Image
+
         # 使用临时文件保存截图
         with tempfile.NamedTemporaryFile(suffix=".png") as tmp:
             remote_path = f"/sdcard/screencap_{int(time.time())}.png"
@@ -124,10 +294,56 @@ class ADBManager:
                 return save_path
             return img
 
+    @traced("capture")
+    def screenshot_array(self, raw=True):
+        """
+        截取屏幕并直接解码到内存，不经过设备sdcard和本地临时文件
+        :param raw: True 使用 screencap 原始RGBA输出(无需PNG编解码)，False 使用PNG输出(传输量更小)
+        :return: BGR格式的 np.ndarray，可直接交给 ImageDetector 使用
+        """
+        if raw:
+            img = decode_raw_screencap(self.exec_out(["screencap"]))
+        else:
+            img = decode_png_screencap(self.exec_out(["screencap", "-p"]))
+
+        if self.recorder:
+            # 调用方会在截图上绘制或复用该数组，录制必须使用副本
+            self.recorder.add_frame(img, copy=True)
+        return img
+
+    def start_recording(self, path, **kwargs):
+        """
+        开始录制截图帧和输入操作，可用 SessionReplay / ReplayDevice 离线回放
+        :param path: 录制文件路径
+        :param kwargs: 传给 SessionRecorder 的参数
+        :return: SessionRecorder
+        """
+        self.stop_recording()
+        self.recorder = SessionRecorder(path, **kwargs)
+        return self.recorder
+
+    def stop_recording(self):
+        if self.recorder:
+            self.recorder.close()
+            self.recorder = None
+
+    def screen_stream(self, bit_rate=8_000_000, size=None, ring_size=8):
+        """
+        启动 screenrecord 连续画面流，适合需要高帧率的场景(动画等待、精确时机点击)
+        :param bit_rate: 编码码率
+        :param size: 编码分辨率(宽, 高)，None 为设备原始分辨率
+        :param ring_size: 缓存的最近帧数
+        :return: 已启动的 ScreenStream，通过 latest_frame() 取最新画面
+        """
+        return ScreenStream.from_adb(self, bit_rate, size, ring_size).start()
+
     def get_screen_resolution(self):
         """获取屏幕分辨率"""
-        output = self.execute_command(["shell", "wm", "size"])
-        # 输出格式通常是: "Physical size: 1080x1920"
+        return self._parse_resolution(self.execute_command(["shell", "wm", "size"]))
+
+    @staticmethod
+    def _parse_resolution(output):
+        # 输出格式通常是: "Physical size: 1080x1920"，存在 "Override size" 时以最后一行为准
         size_str = output.split()[-1]
         return tuple(map(int, size_str.split("x")))
 
@@ -135,28 +351,15 @@ class ADBManager:
     def find_image_on_screen(self, template_path, threshold=0.8):
         """
         在屏幕上查找指定图片
+        模板旁有预处理配置(同名 .json)或为透明PNG时，与 GameImageDetector 一样按配置匹配
         :param template_path: 模板图片路径
         :param threshold: 匹配阈值(0-1)
         :return: 匹配位置的坐标(x,y)，未找到返回None
         """
         # 获取屏幕截图
-        screen_img = self.screenshot()
-        screen_cv = cv2.cvtColor(np.array(screen_img), cv2.COLOR_RGB2BGR)
-
-        # 读取模板图片
-        template = cv2.imread(template_path)
-        if template is None:
-            raise ValueError(f"无法读取模板图片: {template_path}")
+        screen_cv = self.screenshot_array()
 
-        # 模板匹配
-        result = cv2.matchTemplate(screen_cv, template, cv2.TM_CCOEFF_NORMED)
-        min_val, max_val, min_loc, max_loc = cv2.minMaxLoc(result)
-
-        if max_val >= threshold:
-            # 返回中心点坐标
-            h, w = template.shape[:2]
-            return (max_loc[0] + w // 2, max_loc[1] + h // 2)
-        return None
+        return match_template_file(screen_cv, template_path, threshold, self._prepared_templates)
 
     def tap_image(self, template_path, threshold=0.8):
         """
@@ -173,17 +376,34 @@ class ADBManager:
 
     # 设备信息
     def get_device_info(self):
-        """获取设备基本信息"""
-        info = {
-            "model": self.execute_command(["shell", "getprop", "ro.product.model"]),
-            "manufacturer": self.execute_command(["shell", "getprop", "ro.product.manufacturer"]),
-            "android_version": self.execute_command(["shell", "getprop", "ro.build.version.release"]),
-            "sdk_version": self.execute_command(["shell", "getprop", "ro.build.version.sdk"]),
-            "resolution": self.get_screen_resolution(),
-            "serial": self.execute_command(["get-serialno"], with_device=False)
-        }
+        """获取设备基本信息(所有属性与分辨率在一次shell往返中取回)"""
+        output = self.execute_command(["shell", DEVICE_INFO_COMMAND])
+        info = self._parse_device_info(output)
+        info["serial"] = self.device_serial or self.execute_command(["get-serialno"], with_device=False)
         return info
 
+    @classmethod
+    def _parse_device_info(cls, output):
+        """解析 DEVICE_INFO_COMMAND 的输出(不含serial)"""
+        props = {}
+        size_lines = []
+        for line in output.splitlines():
+            line = line.strip()
+            if line.startswith("[") and "]: [" in line:
+                # getprop 输出格式: [ro.product.model]: [MuMu]
+                key, _, value = line.partition("]: [")
+                props[key[1:]] = value[:-1] if value.endswith("]") else value
+            elif "size:" in line:
+                size_lines.append(line)
+
+        return {
+            "model": props.get("ro.product.model", ""),
+            "manufacturer": props.get("ro.product.manufacturer", ""),
+            "android_version": props.get("ro.build.version.release", ""),
+            "sdk_version": props.get("ro.build.version.sdk", ""),
+            "resolution": cls._parse_resolution("\n".join(size_lines)) if size_lines else None,
+        }
+
 
 if __name__ == '__main__':
     adb = ADBManager(default_port=16384)
@@ -0,0 +1,154 @@
+import itertools
+import queue
+import subprocess
+import threading
+import uuid
+
+
+class ADBShellSession:
+    """
+    常驻的 `adb shell` 会话
+    所有命令通过同一个shell进程的stdin发送，每条命令后追加唯一的哨兵行来切分输出，
+    避免每次操作都重新拉起adb进程。会话断开时自动重连。
+    """
+
+    def __init__(self, adb_path="adb", device_serial=None, timeout=10.0):
+        """
+        :param adb_path: adb可执行文件路径
+        :param device_serial: 设备序列号，None表示默认设备
+        :param timeout: 单条命令等待输出的超时时间(秒)
+        """
+        self.adb_path = adb_path
+        self.device_serial = device_serial
+        self.timeout = timeout
+
+        self._process = None
+        self._lines = None
+        self._lock = threading.Lock()
+        self._marker = f"__ADB_SESSION_{uuid.uuid4().hex}__"
+        self._counter = itertools.count()
+
+    @property
+    def alive(self):
+        return self._process is not None and self._process.poll() is None
+
+    def open(self):
+        """启动shell进程(已启动则忽略)"""
+        if self.alive:
+            return
+
+        command = [self.adb_path]
+        if self.device_serial:
+            command.extend(["-s", self.device_serial])
+        command.append("shell")
+
+        self._process = subprocess.Popen(command,
+                                         stdin=subprocess.PIPE,
+                                         stdout=subprocess.PIPE,
+                                         stderr=subprocess.DEVNULL)
+        # 后台线程逐行读取stdout，使读取可以设置超时(Windows管道不支持select)
+        self._lines = queue.Queue()
+        threading.Thread(target=self._read_stdout,
+                         args=(self._process.stdout, self._lines),
+                         daemon=True).start()
+
+    def close(self):
+        """关闭shell进程"""
+        process, self._process = self._process, None
+        if process is None:
+            return
+        try:
+            process.stdin.close()
+        except OSError:
+            pass
+        try:
+            process.wait(timeout=1)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+    def run(self, command, timeout=None):
+        """
+        执行单条shell命令
+        :param command: shell命令字符串
+        :param timeout: 等待输出的超时时间(秒)，None 使用会话的默认超时
+        :return: 命令的stdout文本
+        """
+        return self.run_many([command], timeout)[0]
+
+    def run_many(self, commands, timeout=None):
+        """
+        流水线执行多条shell命令：一次性写入全部命令，再按哨兵依次收取输出
+        会话断开时重连并重试一次，只重发尚未收到哨兵的命令，已完成的输入操作不会重复执行；
+        超时不重试，超时的命令可能仍在设备上执行
+        :param commands: shell命令字符串列表
+        :param timeout: 每条命令等待输出的超时时间(秒)，None 使用会话的默认超时
+        :return: 与commands一一对应的stdout文本列表
+        """
+        outputs = []
+        with self._lock:
+            try:
+                self._run_many(commands, outputs, timeout)
+            except TimeoutError:
+                # TimeoutError 是 OSError 的子类，必须先于下面的重试分支处理
+                raise
+            except (OSError, EOFError):
+                # 写入管道失败或会话断开，尚未收到哨兵的命令重连后重发
+                self.close()
+                self._run_many(commands[len(outputs):], outputs, timeout)
+        return outputs
+
+    def _run_many(self, commands, outputs, timeout):
+        """执行commands，每收到一条命令的哨兵就把其输出追加到outputs"""
+        if not commands:
+            return
+        self.open()
+
+        sentinels = []
+        script = []
+        for command in commands:
+            sentinel = f"{self._marker}{next(self._counter)}"
+            sentinels.append(sentinel)
+            script.append(f"{command}\necho {sentinel}\n")
+
+        self._process.stdin.write("".join(script).encode("utf-8"))
+        self._process.stdin.flush()
+
+        for sentinel in sentinels:
+            outputs.append(self._read_until(sentinel, timeout))
+
+    def _read_until(self, sentinel, timeout=None):
+        if timeout is None:
+            timeout = self.timeout
+        output = []
+        while True:
+            try:
+                line = self._lines.get(timeout=timeout)
+            except queue.Empty:
+                # 超时后会话状态不可知，直接丢弃，下次调用时重建
+                self.close()
+                raise TimeoutError(f"adb shell 命令超时({timeout}s)")
+
+            if line is None:
+                raise EOFError("adb shell 会话已断开")
+
+            line = line.decode("utf-8", errors="ignore").rstrip("\r\n")
+            if line.endswith(sentinel):
+                # 命令输出不以换行结尾时，哨兵会接在最后一行后面
+                prefix = line[:-len(sentinel)]
+                if prefix:
+                    output.append(prefix)
+                return "\n".join(output).strip()
+            output.append(line)
+
+    @staticmethod
+    def _read_stdout(stream, lines):
+        for line in iter(stream.readline, b""):
+            lines.put(line)
+        lines.put(None)
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
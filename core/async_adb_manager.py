@@ -0,0 +1,212 @@
+import asyncio
+import io
+import os
+
+from core.adb_manager import (ADBManager, DEVICE_INFO_COMMAND, decode_png_screencap, decode_raw_screencap,
+                              match_template_file)
+
+
+class AsyncADBManager:
+    """
+    基于 asyncio.create_subprocess_exec 的 ADBManager
+    接口与 ADBManager 一致(方法均为协程)，单个事件循环中可同时挂起大量设备操作；
+    每条命令都有超时，超时或被取消时会结束对应的adb进程。
+    """
+
+    def __init__(self, adb_path="adb", default_port=5555, timeout=10.0, max_concurrency=None):
+        """
+        初始化ADB管理器
+        :param adb_path: adb可执行文件路径
+        :param default_port: 默认连接端口
+        :param timeout: 单条命令的默认超时时间(秒)
+        :param max_concurrency: 同时运行的adb进程上限，None表示不限制
+        """
+        self.adb_path = adb_path
+        self.default_port = default_port
+        self.timeout = timeout
+        self.device_serial = None
+        self._semaphore = asyncio.Semaphore(max_concurrency) if max_concurrency else None
+        # find_image_on_screen 的预处理模板缓存，见 match_template_file
+        self._prepared_templates = {}
+
+    async def check_adb_available(self):
+        """检查ADB是否可用"""
+        _, stdout, _ = await self._run([self.adb_path, "version"])
+        return b"Android Debug Bridge" in stdout
+
+    async def connect_device(self, ip="127.0.0.1", port=None):
+        """
+        连接模拟器设备
+        :param ip: 设备IP地址
+        :param port: 设备端口号
+        :return: 是否连接成功
+        """
+        if port is None:
+            port = self.default_port
+
+        await self.disconnect_device()
+
+        _, stdout, _ = await self._run([self.adb_path, "connect", f"{ip}:{port}"])
+        if b"connected" in stdout:
+            self.device_serial = f"{ip}:{port}"
+            return True
+        return False
+
+    async def disconnect_device(self):
+        """断开当前连接的设备"""
+        if self.device_serial:
+            await self._run([self.adb_path, "disconnect", self.device_serial])
+            self.device_serial = None
+
+    async def execute_command(self, command, with_device=True, timeout=None):
+        """
+        执行ADB命令
+        :param command: 命令字符串或列表
+        :param with_device: 是否包含设备序列号
+        :param timeout: 超时时间(秒)，默认使用构造时的 timeout
+        :return: 命令执行结果
+        """
+        _, stdout, _ = await self._run(self._build_command(command, with_device), timeout)
+        return stdout.decode("utf-8", errors="ignore").strip()
+
+    async def exec_out(self, command, timeout=None):
+        """
+        通过 adb exec-out 执行命令并返回原始二进制输出
+        :param command: 命令字符串或列表
+        :return: stdout 字节串
+        """
+        if isinstance(command, str):
+            command = command.split()
+
+        returncode, stdout, stderr = await self._run(self._build_command(["exec-out"] + list(command)), timeout)
+        if returncode != 0:
+            raise RuntimeError(f"exec-out 执行失败: {stderr.decode(errors='ignore').strip()}")
+        return stdout
+
+    def _build_command(self, command, with_device=True):
+        """拼接完整的adb命令行"""
+        if isinstance(command, str):
+            command = command.split()
+
+        full_command = [self.adb_path]
+        if with_device and self.device_serial:
+            full_command.extend(["-s", self.device_serial])
+        full_command.extend(command)
+        return full_command
+
+    async def _run(self, command, timeout=None):
+        if self._semaphore is None:
+            return await self._spawn(command, timeout)
+        async with self._semaphore:
+            return await self._spawn(command, timeout)
+
+    async def _spawn(self, command, timeout):
+        timeout = self.timeout if timeout is None else timeout
+        process = await asyncio.create_subprocess_exec(*command,
+                                                       stdout=asyncio.subprocess.PIPE,
+                                                       stderr=asyncio.subprocess.PIPE)
+        try:
+            stdout, stderr = await asyncio.wait_for(process.communicate(), timeout)
+        except asyncio.TimeoutError:
+            await self._kill(process)
+            raise TimeoutError(f"adb 命令超时({timeout}s): {' '.join(command)}")
+        except asyncio.CancelledError:
+            await self._kill(process)
+            raise
+        return process.returncode, stdout, stderr
+
+    @staticmethod
+    async def _kill(process):
+        if process.returncode is None:
+            process.kill()
+            await process.wait()
+
+    # 基本操作功能
+    async def tap(self, x, y):
+        """点击屏幕指定位置"""
+        await self.execute_command(["shell", "input", "tap", str(x), str(y)])
+
+    async def swipe(self, x1, y1, x2, y2, duration=300):
+        """滑动/拖拽操作"""
+        await self.execute_command([
+            "shell", "input", "swipe",
+            str(x1), str(y1), str(x2), str(y2),
+            str(duration)
+        ])
+
+    async def long_press(self, x, y, duration=1000):
+        """长按操作"""
+        await self.swipe(x, y, x, y, duration)
+
+    async def press_key(self, keycode):
+        """按键操作"""
+        await self.execute_command(["shell", "input", "keyevent", str(keycode)])
+
+    async def input_text(self, text):
+        """输入文本"""
+        await self.execute_command(["shell", "input", "text", text])
+
+    # 屏幕相关功能
+    async def screenshot(self, save_path=None):
+        """
+        截取屏幕(exec-out 直接取PNG，不经过sdcard)
+        :param save_path: 保存路径，如果为None则返回PIL.Image对象
+        :return: 如果save_path为None则返回Image对象，否则返回保存路径
+        """
+        data = await self.exec_out(["screencap", "-p"])
+
+        if save_path:
+            os.makedirs(os.path.dirname(save_path), exist_ok=True)
+            with open(save_path, "wb") as f:
+                f.write(data)
+            return save_path
+
+        from PIL import Image
+        return Image.open(io.BytesIO(data))
+
+    async def screenshot_array(self, raw=True):
+        """
+        截取屏幕并直接解码到内存
+        :param raw: True 使用 screencap 原始RGBA输出，False 使用PNG输出
+        :return: BGR格式的 np.ndarray
+        """
+        if raw:
+            return decode_raw_screencap(await self.exec_out(["screencap"]))
+        return decode_png_screencap(await self.exec_out(["screencap", "-p"]))
+
+    async def get_screen_resolution(self):
+        """获取屏幕分辨率"""
+        return ADBManager._parse_resolution(await self.execute_command(["shell", "wm", "size"]))
+
+    # 高级功能
+    async def find_image_on_screen(self, template_path, threshold=0.8):
+        """
+        在屏幕上查找指定图片，模板匹配在线程中执行，不阻塞事件循环
+        与 ADBManager.find_image_on_screen 一样支持模板预处理配置和透明PNG掩码
+        :param template_path: 模板图片路径
+        :param threshold: 匹配阈值(0-1)
+        :return: 匹配位置的坐标(x,y)，未找到返回None
+        """
+        screen_cv = await self.screenshot_array()
+        return await asyncio.to_thread(match_template_file, screen_cv, template_path, threshold,
+                                       self._prepared_templates)
+
+    async def tap_image(self, template_path, threshold=0.8):
+        """
+        点击屏幕上匹配的图片
+        :param template_path: 模板图片路径
+        :param threshold: 匹配阈值(0-1)
+        :return: 是否点击成功
+        """
+        pos = await self.find_image_on_screen(template_path, threshold)
+        if pos:
+            await self.tap(*pos)
+            return True
+        return False
+
+    # 设备信息
+    async def get_device_info(self):
+        """获取设备基本信息(所有属性与分辨率在一次shell往返中取回)"""
+        info = ADBManager._parse_device_info(await self.execute_command(["shell", DEVICE_INFO_COMMAND]))
+        info["serial"] = self.device_serial or await self.execute_command(["get-serialno"], with_device=False)
+        return info
@@ -0,0 +1,234 @@
+import os
+import queue
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from core.paddle_result import PaddleResultItemData
+from core.tracing import tracer
+
+# 队列满时的处理方式
+DROP_NEWEST = "drop_newest"
+DROP_OLDEST = "drop_oldest"
+
+_WRITE_PARAMS = {
+    "jpg": lambda quality: [cv2.IMWRITE_JPEG_QUALITY, quality],
+    "webp": lambda quality: [cv2.IMWRITE_WEBP_QUALITY, quality],
+    "png": lambda quality: [cv2.IMWRITE_PNG_COMPRESSION, 1],
+}
+
+
+def draw_matches(image: np.ndarray, matches: Dict[str, Tuple[int, int, float]],
+                 template_sizes: Optional[Dict[str, Tuple[int, int]]] = None,
+                 color: Tuple[int, int, int] = (0, 255, 0)) -> np.ndarray:
+    """
+    在图像上绘制模板匹配结果(原地修改)
+    :param matches: 模板名 -> (x, y, 置信度)，即 find_elements 的返回值
+    :param template_sizes: 模板名 -> (宽, 高)，有尺寸时绘制匹配框，否则只绘制中心点
+    """
+    for name, (x, y, confidence) in matches.items():
+        size = (template_sizes or {}).get(name)
+        label_y = y - 10
+        if size:
+            w, h = size
+            cv2.rectangle(image, (x - w // 2, y - h // 2), (x + w // 2, y + h // 2), color, 2)
+            label_y = y - h // 2 - 10
+        cv2.circle(image, (x, y), 5, (0, 0, 255), -1)
+        cv2.putText(image, f"{_ascii_label(name)} {confidence:.3f}", (x - 40, max(label_y, 15)),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.6, color, 2)
+    return image
+
+
+def draw_ocr_items(image: np.ndarray, items: Iterable[PaddleResultItemData],
+                   color: Tuple[int, int, int] = (255, 128, 0)) -> np.ndarray:
+    """在图像上绘制OCR条目的 predict_rect(原地修改)；非ASCII文本以序号标注"""
+    for index, item in enumerate(items):
+        x1, y1, x2, y2 = (int(v) for v in item.predict_rect)
+        cv2.rectangle(image, (x1, y1), (x2, y2), color, 1)
+        cv2.putText(image, _ascii_label(item.text, f"#{index}"), (x1, max(y1 - 4, 12)),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.45, color, 1)
+    return image
+
+
+def draw_boxes(image: np.ndarray, boxes: Iterable[Tuple[int, int, int, int]],
+               color: Tuple[int, int, int] = (0, 0, 255), thickness: int = 2) -> np.ndarray:
+    """绘制 (x1, y1, x2, y2) 矩形框(原地修改)"""
+    for x1, y1, x2, y2 in boxes:
+        cv2.rectangle(image, (int(x1), int(y1)), (int(x2), int(y2)), color, thickness)
+    return image
+
+
+def _ascii_label(text: str, fallback: str = "") -> str:
+    # cv2.putText 只能绘制ASCII字符
+    return text if text.isascii() else fallback or text.encode("ascii", "replace").decode()
+
+
+class DebugSink:
+    """
+    后台调试图输出
+    主循环只把内存中的帧和匹配/OCR结果放入有界队列，绘制叠加层和压缩写盘都在工作线程完成。
+    输出跟不上时按策略丢帧而不阻塞主循环；sample_every 可以只保留每N帧中的一帧。
+    """
+
+    def __init__(self, output_dir: str, max_queue: int = 8, image_format: str = "jpg", quality: int = 80,
+                 sample_every: int = 1, policy: str = DROP_NEWEST, max_width: Optional[int] = None):
+        """
+        :param output_dir: 输出目录
+        :param max_queue: 等待写出的最大帧数
+        :param image_format: jpg / webp / png
+        :param quality: JPEG/WebP 压缩质量(0-100)
+        :param sample_every: 每提交N帧只保留一帧
+        :param policy: 队列满时丢弃新帧(DROP_NEWEST)或丢弃最旧的帧(DROP_OLDEST)
+        :param max_width: 输出图片最大宽度，超出时等比缩小后再写出
+        """
+        if image_format not in _WRITE_PARAMS:
+            raise ValueError(f"不支持的图片格式: {image_format}")
+        if policy not in (DROP_NEWEST, DROP_OLDEST):
+            raise ValueError(f"未知的丢帧策略: {policy}")
+
+        self.output_dir = output_dir
+        self.image_format = image_format
+        self.write_params = _WRITE_PARAMS[image_format](quality)
+        self.sample_every = max(sample_every, 1)
+        self.policy = policy
+        self.max_width = max_width
+
+        self.submitted = 0
+        self.written = 0
+        self.dropped = 0
+        self.sampled_out = 0
+        self.errors = 0
+
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._lock = threading.Lock()
+        self._seq = 0
+        self._thread = None
+        os.makedirs(output_dir, exist_ok=True)
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._work, name="debug-sink", daemon=True)
+            self._thread.start()
+
+    def close(self, wait: bool = True):
+        """停止工作线程；wait=True 时先写完队列中剩余的帧"""
+        if self._thread is None:
+            return
+        if not wait:
+            self._drain()
+        self._queue.put(None)
+        self._thread.join()
+        self._thread = None
+
+    def submit(self, frame: np.ndarray, matches: Optional[Dict[str, Tuple[int, int, float]]] = None,
+               template_sizes: Optional[Dict[str, Tuple[int, int]]] = None,
+               ocr_items: Optional[List[PaddleResultItemData]] = None,
+               boxes: Optional[List[Tuple[int, int, int, int]]] = None,
+               name: str = "frame", copy: bool = True) -> bool:
+        """
+        提交一帧调试图，不阻塞
+        :param frame: BGR图像
+        :param matches: find_elements 的返回值
+        :param template_sizes: 模板名 -> (宽, 高)，用于绘制匹配框
+        :param ocr_items: PaddleResult.paddle_result 或其子集
+        :param boxes: 额外绘制的 (x1, y1, x2, y2) 矩形框
+        :param name: 文件名后缀
+        :param copy: 是否复制帧；为False时叠加层直接画在传入的数组上，
+                     调用方之后会复用该数组(共享内存、采集缓冲区)时必须为True
+        :return: 是否进入队列
+        """
+        self.start()
+        with self._lock:
+            self.submitted += 1
+            if (self.submitted - 1) % self.sample_every:
+                self.sampled_out += 1
+                return False
+            self._seq += 1
+            seq = self._seq
+
+        if self.policy == DROP_NEWEST and self._queue.full():
+            self._count_drop()
+            return False
+
+        # 丢帧判断之后再复制，被丢弃的帧不付出复制开销
+        item = (seq, name, frame.copy() if copy else frame, matches, template_sizes, ocr_items, boxes)
+        while True:
+            try:
+                self._queue.put_nowait(item)
+                return True
+            except queue.Full:
+                if self.policy == DROP_NEWEST:
+                    self._count_drop()
+                    return False
+                try:
+                    if self._queue.get_nowait() is not None:
+                        self._count_drop()
+                except queue.Empty:
+                    pass
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "submitted": self.submitted,
+            "written": self.written,
+            "dropped": self.dropped,
+            "sampled_out": self.sampled_out,
+            "errors": self.errors,
+            "pending": self._queue.qsize(),
+        }
+
+    def _count_drop(self):
+        with self._lock:
+            self.dropped += 1
+        tracer.count("debug.dropped")
+
+    def _drain(self):
+        while True:
+            try:
+                if self._queue.get_nowait() is not None:
+                    self._count_drop()
+            except queue.Empty:
+                return
+
+    def _work(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            try:
+                with tracer.span("debug.write"):
+                    self._write(*item)
+                self.written += 1
+            except Exception as e:
+                self.errors += 1
+                print(f"写出调试图出错: {e}")
+
+    def _write(self, seq, name, image, matches, template_sizes, ocr_items, boxes):
+        if matches:
+            draw_matches(image, matches, template_sizes)
+        if ocr_items:
+            draw_ocr_items(image, ocr_items)
+        if boxes:
+            draw_boxes(image, boxes)
+
+        if self.max_width and image.shape[1] > self.max_width:
+            scale = self.max_width / image.shape[1]
+            image = cv2.resize(image, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+
+        timestamp = time.strftime("%H%M%S")
+        path = os.path.join(self.output_dir, f"{seq:06d}_{timestamp}_{name}.{self.image_format}")
+        # cv2.imwrite 不支持非ASCII路径，先编码再写文件
+        ok, data = cv2.imencode(f".{self.image_format}", image, self.write_params)
+        if not ok:
+            raise RuntimeError(f"编码失败: {path}")
+        with open(path, "wb") as f:
+            f.write(data.tobytes())
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
@@ -0,0 +1,231 @@
+import subprocess
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import Future
+from typing import Callable, Dict, Iterable, List, Optional, Set
+
+import numpy as np
+
+from core.adb_manager import ADBManager
+from core.game_image_detector import GameImageDetector
+from core.template_library import TemplateLibrary
+
+# MuMu 模拟器多开时 adb 端口从 16384 开始，每个实例间隔 32
+MUMU_BASE_PORT = 16384
+MUMU_PORT_STEP = 32
+
+
+def mumu_ports(count: int, base: int = MUMU_BASE_PORT, step: int = MUMU_PORT_STEP) -> List[int]:
+    return [base + i * step for i in range(count)]
+
+
+class FairExecutor:
+    """
+    按设备公平调度的线程池
+    每个设备一个任务队列，工作线程按轮询顺序从各设备队列取任务，
+    避免某台设备提交大量任务时饿死其他设备。
+    """
+
+    def __init__(self, max_workers: int = 1, name: str = "fair-worker"):
+        self._queues = OrderedDict()
+        self._condition = threading.Condition()
+        self._shutdown = False
+        self._threads = [threading.Thread(target=self._work, name=f"{name}-{i}", daemon=True)
+                         for i in range(max_workers)]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, key, fn: Callable, *args, **kwargs) -> Future:
+        """
+        :param key: 调度分组(设备序列号)
+        """
+        future = Future()
+        with self._condition:
+            if self._shutdown:
+                raise RuntimeError("执行器已关闭")
+            self._queues.setdefault(key, deque()).append((future, fn, args, kwargs))
+            self._condition.notify()
+        return future
+
+    def shutdown(self, wait: bool = True):
+        with self._condition:
+            self._shutdown = True
+            self._condition.notify_all()
+        if wait:
+            for thread in self._threads:
+                thread.join()
+
+    def _next_task(self):
+        with self._condition:
+            while not self._queues and not self._shutdown:
+                self._condition.wait()
+            if not self._queues:
+                return None
+
+            # 取队首设备的一个任务，然后把该设备移到队尾
+            key, tasks = next(iter(self._queues.items()))
+            task = tasks.popleft()
+            del self._queues[key]
+            if tasks:
+                self._queues[key] = tasks
+            return task
+
+    def _work(self):
+        while True:
+            task = self._next_task()
+            if task is None:
+                return
+
+            future, fn, args, kwargs = task
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(fn(*args, **kwargs))
+            except BaseException as e:
+                future.set_exception(e)
+
+
+class DeviceContext:
+    """单台设备的采集/输入通道，检测和OCR提交到设备池共享的执行器"""
+
+    def __init__(self, pool: "DevicePool", adb: ADBManager):
+        self.pool = pool
+        self.adb = adb
+        self.serial = adb.device_serial
+        self._detector = None
+
+    @property
+    def detector(self) -> GameImageDetector:
+        """配置了模板库时按设备分辨率取对应尺寸的模板，否则使用设备池共享的检测器"""
+        if self._detector is None:
+            library = self.pool.template_library
+            self._detector = library.for_device(self.adb) if library else self.pool.detector
+        return self._detector
+
+    def capture(self) -> np.ndarray:
+        return self.adb.screenshot_array()
+
+    def find_elements(self, frame: np.ndarray, template_names: Optional[Iterable[str]] = None, **kwargs):
+        future = self.pool.detect_executor.submit(self.serial, self.detector.find_elements,
+                                                  frame, template_names, **kwargs)
+        return future.result()
+
+    def ocr(self, frame: np.ndarray):
+        if self.pool.ocr is None:
+            raise RuntimeError("设备池未配置OCR")
+        return self.pool.ocr_executor.submit(self.serial, self.pool.ocr, frame).result()
+
+    def tap(self, x, y):
+        self.adb.tap(x, y)
+
+    def swipe(self, x1, y1, x2, y2, duration=300):
+        self.adb.swipe(x1, y1, x2, y2, duration)
+
+
+class DevicePool:
+    """
+    多设备管理
+    在一个进程内同时驱动多台模拟器: 每台设备有独立的 ADBManager 与采集/输入线程，
+    模板检测与OCR由所有设备共享，并按设备公平调度。
+    """
+
+    def __init__(self, adb_path: str = "adb", detector: Optional[GameImageDetector] = None,
+                 ocr: Optional[Callable] = None, detect_workers: int = 2, persistent_shell: bool = True,
+                 template_library: Optional[TemplateLibrary] = None):
+        """
+        :param adb_path: adb可执行文件路径
+        :param detector: 共享的模板检测器，模板需预先加载
+        :param ocr: 共享的OCR函数 ocr(frame) -> PaddleResult，同一时间只执行一个
+        :param detect_workers: 检测线程数
+        :param persistent_shell: 各设备是否使用常驻shell会话发送输入
+        :param template_library: 模板库，不同分辨率的设备各自使用缩放好的模板，优先于 detector
+        """
+        self.adb_path = adb_path
+        self.detector = detector or GameImageDetector()
+        self.ocr = ocr
+        self.persistent_shell = persistent_shell
+        self.template_library = template_library
+        self.devices: Dict[str, DeviceContext] = {}
+        # 由本设备池 adb connect 的序列号，关闭时只断开这些设备
+        self._connected: Set[str] = set()
+
+        self.detect_executor = FairExecutor(detect_workers, name="detect")
+        self.ocr_executor = FairExecutor(1, name="ocr")
+
+    def discover(self) -> List[str]:
+        """列出 adb devices 中处于在线状态的设备序列号"""
+        result = subprocess.run([self.adb_path, "devices"], capture_output=True, text=True)
+        serials = []
+        for line in result.stdout.splitlines()[1:]:
+            parts = line.split()
+            if len(parts) >= 2 and parts[1] == "device":
+                serials.append(parts[0])
+        return serials
+
+    def connect(self, ports: Iterable[int], ip: str = "127.0.0.1") -> List[str]:
+        """
+        连接多个端口上的设备(不会断开已连接的其他设备)
+        连接前已处于连接状态的设备在 close() 时不会被断开
+        :return: 连接成功的序列号
+        """
+        connected = []
+        for port in ports:
+            serial = f"{ip}:{port}"
+            result = subprocess.run([self.adb_path, "connect", serial], capture_output=True, text=True)
+            if "connected" in result.stdout:
+                if "already connected" not in result.stdout:
+                    self._connected.add(serial)
+                self.add_device(serial)
+                connected.append(serial)
+            else:
+                print(f"连接 {serial} 失败: {result.stdout.strip()}")
+        return connected
+
+    def add_device(self, serial: str) -> DeviceContext:
+        if serial not in self.devices:
+            adb = ADBManager(adb_path=self.adb_path, persistent_shell=self.persistent_shell)
+            adb.device_serial = serial
+            self.devices[serial] = DeviceContext(self, adb)
+        return self.devices[serial]
+
+    def run(self, bot: Callable[[DeviceContext], object],
+            serials: Optional[Iterable[str]] = None) -> Dict[str, object]:
+        """
+        每台设备一个线程并发执行 bot(device)
+        :return: 序列号 -> bot返回值，出错时为异常对象
+        """
+        contexts = [self.devices[serial] for serial in (serials or list(self.devices))]
+        results = {}
+
+        def target(context):
+            try:
+                results[context.serial] = bot(context)
+            except Exception as e:
+                print(f"设备 {context.serial} 出错: {e}")
+                results[context.serial] = e
+
+        threads = [threading.Thread(target=target, args=(context,), name=f"device-{context.serial}")
+                   for context in contexts]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results
+
+    def close(self):
+        self.detect_executor.shutdown()
+        self.ocr_executor.shutdown()
+        for serial, context in self.devices.items():
+            if serial in self._connected:
+                context.adb.disconnect_device()
+            else:
+                # discover() 或外部连接的设备只释放本地资源，不断开连接
+                context.adb.release()
+        self.devices.clear()
+        self._connected.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
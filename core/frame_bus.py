@@ -0,0 +1,194 @@
+import time
+from multiprocessing import shared_memory
+from typing import Iterator, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+# 共享内存头部: 魔数、槽数、单槽最大字节数、最新帧序号
+_HEADER_DTYPE = np.dtype([("magic", "<u4"), ("slots", "<u4"), ("slot_bytes", "<u8"), ("latest", "<i8")])
+# 每个槽的元数据；seq 为 -1 表示正在写入
+_SLOT_DTYPE = np.dtype([("seq", "<i8"), ("timestamp", "<f8"), ("shape", "<i4", (3,)), ("serial", "S64")])
+_MAGIC = 0x46425553
+_ALIGN = 64
+
+
+def _aligned(size: int) -> int:
+    return (size + _ALIGN - 1) // _ALIGN * _ALIGN
+
+
+class Frame(NamedTuple):
+    image: np.ndarray
+    seq: int
+    timestamp: float
+    serial: str
+
+
+class FrameBus:
+    """
+    基于共享内存的帧总线
+    采集进程把帧写入环形槽，模板匹配、OCR等工作进程按名称挂载同一块共享内存，
+    直接得到 np.ndarray 视图，不经过pickle和磁盘。
+    单写者多读者；读者拿到的视图在写者绕回该槽前有效，可用 is_valid 校验或 copy=True 取副本。
+    """
+
+    def __init__(self, shm: shared_memory.SharedMemory, owner: bool):
+        self.shm = shm
+        self.owner = owner
+
+        self._header = np.ndarray((), dtype=_HEADER_DTYPE, buffer=shm.buf)
+        if self._header["magic"] != _MAGIC:
+            raise ValueError(f"共享内存 {shm.name} 不是帧总线")
+        self.slots = int(self._header["slots"])
+        self.slot_bytes = int(self._header["slot_bytes"])
+
+        meta_offset = _aligned(_HEADER_DTYPE.itemsize)
+        self._meta = np.ndarray((self.slots,), dtype=_SLOT_DTYPE, buffer=shm.buf, offset=meta_offset)
+        self._data_offset = _aligned(meta_offset + _SLOT_DTYPE.itemsize * self.slots)
+
+    @classmethod
+    def create(cls, name: Optional[str] = None, slots: int = 4,
+               max_shape: Tuple[int, int, int] = (1440, 2560, 3)) -> "FrameBus":
+        """
+        创建帧总线(采集进程)
+        :param name: 共享内存名，None 时自动生成，其他进程用 bus.name 挂载
+        :param slots: 环形槽数，决定读者最多可落后多少帧
+        :param max_shape: 单帧最大尺寸(高, 宽, 通道)，uint8
+        """
+        slot_bytes = _aligned(int(np.prod(max_shape)))
+        meta_offset = _aligned(_HEADER_DTYPE.itemsize)
+        size = _aligned(meta_offset + _SLOT_DTYPE.itemsize * slots) + slot_bytes * slots
+
+        shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        header = np.ndarray((), dtype=_HEADER_DTYPE, buffer=shm.buf)
+        header["slots"] = slots
+        header["slot_bytes"] = slot_bytes
+        header["latest"] = -1
+        meta = np.ndarray((slots,), dtype=_SLOT_DTYPE, buffer=shm.buf, offset=meta_offset)
+        meta["seq"] = -1
+        header["magic"] = _MAGIC
+        del header, meta
+        return cls(shm, owner=True)
+
+    @classmethod
+    def attach(cls, name: str) -> "FrameBus":
+        """按名称挂载已有的帧总线(工作进程)"""
+        try:
+            # 共享内存的生命周期由创建者管理，挂载方退出时不应被资源跟踪器删除
+            shm = shared_memory.SharedMemory(name=name, track=False)
+        except TypeError:
+            # Python 3.13 以前没有 track 参数；由 multiprocessing 启动的工作进程与创建者共用资源跟踪器，不受影响
+            shm = shared_memory.SharedMemory(name=name)
+        return cls(shm, owner=False)
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    @property
+    def latest_seq(self) -> int:
+        return int(self._header["latest"])
+
+    def _slot_array(self, index: int, shape) -> np.ndarray:
+        return np.ndarray(shape, dtype=np.uint8, buffer=self.shm.buf,
+                          offset=self._data_offset + index * self.slot_bytes)
+
+    def publish(self, image: np.ndarray, serial: str = "", timestamp: Optional[float] = None) -> int:
+        """
+        写入一帧
+        :return: 帧序号
+        """
+        if image.dtype != np.uint8:
+            raise ValueError(f"只支持 uint8 图像: {image.dtype}")
+        if image.nbytes > self.slot_bytes:
+            raise ValueError(f"帧大小 {image.shape} 超过槽容量 {self.slot_bytes} 字节")
+
+        seq = self.latest_seq + 1
+        index = seq % self.slots
+        shape = image.shape if image.ndim == 3 else (*image.shape, 1)
+        slot = self._meta[index]
+
+        # 先作废槽再写数据，读者据此判断视图是否被覆盖
+        slot["seq"] = -1
+        self._slot_array(index, image.shape)[...] = image
+        slot["timestamp"] = time.time() if timestamp is None else timestamp
+        slot["shape"] = shape
+        slot["serial"] = serial.encode()[:64]
+        slot["seq"] = seq
+        self._header["latest"] = seq
+        return seq
+
+    def read(self, seq: Optional[int] = None, copy: bool = False) -> Optional[Frame]:
+        """
+        读取一帧
+        :param seq: 帧序号，None 为最新帧
+        :param copy: 是否复制出独立数组；否则返回共享内存视图
+        :return: 帧已被覆盖或尚未写入时返回None
+        """
+        if seq is None:
+            seq = self.latest_seq
+        if seq < 0:
+            return None
+
+        slot = self._meta[seq % self.slots]
+        if slot["seq"] != seq:
+            return None
+
+        height, width, channels = (int(v) for v in slot["shape"])
+        shape = (height, width) if channels == 1 else (height, width, channels)
+        image = self._slot_array(seq % self.slots, shape)
+        frame = Frame(image.copy() if copy else image, seq, float(slot["timestamp"]),
+                      slot["serial"].decode(errors="ignore"))
+        # 读取元数据期间被写者覆盖
+        if slot["seq"] != seq:
+            return None
+        if not copy:
+            image.flags.writeable = False
+        return frame
+
+    def is_valid(self, frame: Frame) -> bool:
+        """视图帧所在的槽是否仍未被覆盖"""
+        return int(self._meta[frame.seq % self.slots]["seq"]) == frame.seq
+
+    def wait_frame(self, after_seq: int = -1, timeout: Optional[float] = None,
+                   poll_interval: float = 0.001, copy: bool = False) -> Optional[Frame]:
+        """
+        等待比 after_seq 更新的帧，返回当时的最新帧(落后时跳过中间帧)
+        :return: 超时返回None
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            seq = self.latest_seq
+            if seq > after_seq:
+                frame = self.read(seq, copy=copy)
+                if frame is not None:
+                    return frame
+            if deadline is not None and time.monotonic() >= deadline:
+                return None
+            time.sleep(poll_interval)
+
+    def frames(self, timeout: Optional[float] = None, copy: bool = False) -> Iterator[Frame]:
+        """持续产出最新帧，超时无新帧时结束"""
+        seq = -1
+        while True:
+            frame = self.wait_frame(seq, timeout=timeout, copy=copy)
+            if frame is None:
+                return
+            seq = frame.seq
+            yield frame
+
+    def close(self):
+        """释放本进程的映射；创建者同时删除共享内存"""
+        if self.shm is None:
+            return
+        # 共享内存上的 numpy 视图需先释放，否则 close 会报 BufferError
+        self._header = self._meta = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+        self.shm = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
@@ -0,0 +1,82 @@
+from typing import List, Optional, Tuple, Union
+
+import cv2
+import numpy as np
+
+
+def dhash(image: np.ndarray, hash_size: Union[int, Tuple[int, int]] = 8) -> int:
+    """
+    差值感知哈希: 缩小为 (宽+1) x 高 的灰度图，比较水平相邻像素明暗得到 宽*高 位整数
+    对压缩噪声、轻微亮度变化不敏感
+    :param hash_size: 边长，或 (宽, 高)
+    """
+    hash_w, hash_h = (hash_size, hash_size) if isinstance(hash_size, int) else hash_size
+    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if image.ndim == 3 else image
+    small = cv2.resize(gray, (hash_w + 1, hash_h), interpolation=cv2.INTER_AREA)
+    bits = (small[:, 1:] > small[:, :-1]).ravel()
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+
+def hamming_distance(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+class FrameDiffer:
+    """
+    帧变化检测
+    把画面缩小为灰度缩略图后与基准帧逐格比较，返回发生变化的区域(原分辨率坐标)，
+    用于在画面未变化时跳过模板匹配，或只在变化区域内匹配。
+    基准帧是最近一次报告了变化(即调用方实际处理过)的帧，判定为未变化的帧不会替换基准，
+    缓慢的淡入淡出、滚动在多帧内累积超过阈值后仍会被报告。
+    """
+
+    def __init__(self, grid_size: Tuple[int, int] = (64, 36), diff_threshold: int = 8):
+        """
+        :param grid_size: 缩略图尺寸(宽, 高)，每个像素代表原图的一个格子
+        :param diff_threshold: 格子灰度差超过该值视为变化
+        """
+        self.grid_size = grid_size
+        self.diff_threshold = diff_threshold
+        self._previous = None
+        self._frame_shape = None
+
+    def reset(self):
+        self._previous = None
+        self._frame_shape = None
+
+    def update(self, frame: np.ndarray) -> Optional[List[Tuple[int, int, int, int]]]:
+        """
+        输入新帧并与基准帧比较，有变化时该帧成为新的基准
+        :param frame: BGR或灰度图像
+        :return: None 表示没有可比较的基准帧(应全图处理)，[] 表示画面未变化，
+                 否则为变化区域列表 (x, y, w, h)
+        """
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if frame.ndim == 3 else frame
+        thumbnail = cv2.resize(gray, self.grid_size, interpolation=cv2.INTER_AREA)
+
+        previous = self._previous
+        if previous is None or self._frame_shape != frame.shape[:2]:
+            self._previous = thumbnail
+            self._frame_shape = frame.shape[:2]
+            return None
+
+        dirty = (cv2.absdiff(thumbnail, previous) > self.diff_threshold).astype(np.uint8)
+        if not dirty.any():
+            return []
+        self._previous = thumbnail
+
+        # 相邻的变化格子合并为一个区域
+        count, _, stats, _ = cv2.connectedComponentsWithStats(dirty, connectivity=8)
+
+        frame_h, frame_w = frame.shape[:2]
+        cell_w = frame_w / self.grid_size[0]
+        cell_h = frame_h / self.grid_size[1]
+
+        regions = []
+        for left, top, width, height, _ in stats[1:count]:
+            x = int(left * cell_w)
+            y = int(top * cell_h)
+            w = min(int(np.ceil((left + width) * cell_w)), frame_w) - x
+            h = min(int(np.ceil((top + height) * cell_h)), frame_h) - y
+            regions.append((x, y, w, h))
+        return regions
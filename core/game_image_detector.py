@@ -1,39 +1,184 @@
 import time
-from typing import Tuple, Optional, List
+from typing import Tuple, Optional, List, Dict, Iterable, Callable
 
 import cv2
 
-from core.image_detector import ImageDetector
+from core.frame_diff import FrameDiffer
+from core.image_detector import ImageDetector, ImageSource
+from core.screen_classifier import ScreenClassifier
+from core.template_cache import TemplateCache
+from core.template_pack import PackedTemplate, TemplatePack, write_pack
+from core.template_profile import TemplateProfile, load_template_meta, prepare_template, split_alpha
+from core.tracing import tracer
 
+# 未配置模板阈值时的默认匹配阈值
+DEFAULT_THRESHOLD = 0.8
+
+
+class HintStats:
+    """位置提示的命中统计，用于衡量局部搜索节省的时间"""
 
-class GameImageDetector:
     def __init__(self):
-        self.matcher = ImageDetector()
+        self.hint_hits = 0
+        self.hint_misses = 0
+        self.full_searches = 0
+        self.hint_time = 0.0
+        self.full_time = 0.0
+
+    def record_hint(self, hit: bool, elapsed: float):
+        if hit:
+            self.hint_hits += 1
+        else:
+            self.hint_misses += 1
+        self.hint_time += elapsed
+
+    def record_full(self, elapsed: float):
+        self.full_searches += 1
+        self.full_time += elapsed
+
+    @property
+    def hit_rate(self) -> float:
+        attempts = self.hint_hits + self.hint_misses
+        return self.hint_hits / attempts if attempts else 0.0
+
+    def as_dict(self) -> Dict[str, float]:
+        attempts = self.hint_hits + self.hint_misses
+        avg_hint = self.hint_time / attempts if attempts else 0.0
+        avg_full = self.full_time / self.full_searches if self.full_searches else 0.0
+        return {
+            "hint_hits": self.hint_hits,
+            "hint_misses": self.hint_misses,
+            "full_searches": self.full_searches,
+            "hit_rate": self.hit_rate,
+            "avg_hint_ms": avg_hint * 1000,
+            "avg_full_ms": avg_full * 1000,
+            # 命中提示的调用省去了一次全图搜索
+            "saved_ms": max(self.hint_hits * avg_full - self.hint_time, 0.0) * 1000,
+        }
+
+
+class GameImageDetector:
+    def __init__(self, template_cache: Optional[TemplateCache] = None, use_hints: bool = True,
+                 hint_padding: int = 32, screen_classifier: Optional[ScreenClassifier] = None,
+                 hint_miss_limit: int = 3):
+        """
+        :param template_cache: 模板解码缓存
+        :param use_hints: find_element 未指定区域时，是否优先在上次命中位置附近搜索
+        :param hint_padding: 位置提示搜索窗口向外扩展的像素
+        :param screen_classifier: 界面识别器，find_elements 据此只匹配当前界面的模板
+        :param hint_miss_limit: 上次命中位置连续多少次未命中后丢弃该位置提示
+        """
+        self.matcher = ImageDetector(template_cache)
+        self.screen_classifier = screen_classifier
+        # 最近一次 find_elements 识别出的界面
+        self.current_screen = None
+        self.use_hints = use_hints
+        self.hint_padding = hint_padding
+        self.hint_miss_limit = hint_miss_limit
+        # 模板名 -> 上次命中的中心坐标
+        self.location_hints = {}
+        # 模板名 -> 位置提示连续未命中次数
+        self._hint_misses = {}
+        # 模板名 -> 配置的常见出现区域 (x, y, w, h)，尚无命中位置时作为位置提示
+        self.region_hints = {}
+        # 模板名 -> 配置的匹配阈值，调用时未指定阈值则使用
+        self.thresholds = {}
+        self.hint_stats: Dict[str, HintStats] = {}
         self.template_cache = {}
+        # 带预处理配置或透明掩码的模板，匹配时走 ImageDetector.match_profiled
+        self.prepared_templates = {}
+        # (模板名, 是否灰度, 层数) -> 模板金字塔
+        self.pyramid_cache = {}
+        self._executor = None
+        self._executor_workers = 0
 
-    def load_template(self, template_name: str, template_path: str):
+    def load_template(self, template_name: str, template_path: str, profile: Optional[TemplateProfile] = None):
+        """
+        加载模板，同时读取模板旁的预处理配置(同名 .json)，透明PNG的alpha通道作为匹配掩码
+        :param profile: 指定预处理配置，None 时从配置文件读取
+        """
         try:
-            template = cv2.imread(template_path)
+            template = self.matcher.template_cache.get(template_path, cv2.IMREAD_UNCHANGED)
             if template is not None:
-                self.template_cache[template_name] = template_path
+                template, mask = split_alpha(template)
+                if profile is None:
+                    profile = TemplateProfile.load(template_path)
+
+                self.template_cache[template_name] = template
+                self.prepared_templates.pop(template_name, None)
+                if not profile.is_default or (mask is not None and profile.use_mask):
+                    self.prepared_templates[template_name] = prepare_template(template, mask, profile)
+                threshold, region = load_template_meta(template_path)
+                self.set_template_meta(template_name, threshold, region)
+                self._drop_pyramids(template_name)
                 print(f"模板 '{template_name}' 加载成功")
             else:
                 print(f"模板 '{template_name}' 加载失败")
         except Exception as e:
             print(f"加载模板出错: {e}")
 
-    def find_element(self, screenshot_path: str, template_name: str, threshold: float = 0.8,
+    def set_template_meta(self, template_name: str, threshold: Optional[float] = None,
+                          region: Optional[Tuple[int, int, int, int]] = None):
+        """
+        设置模板的匹配阈值与常见出现区域，None 表示清除
+        :param region: (x, y, w, h)，尚无命中位置时优先在该区域搜索
+        """
+        self.thresholds.pop(template_name, None)
+        self.region_hints.pop(template_name, None)
+        if threshold is not None:
+            self.thresholds[template_name] = threshold
+        if region:
+            self.region_hints[template_name] = region
+
+    def load_pack(self, pack_path: str) -> int:
+        """
+        加载 TemplatePack 编译好的模板包，数组直接映射文件内容，不解码图片
+        :return: 加载的模板数
+        """
+        pack = TemplatePack(pack_path)
+        for packed in pack.templates():
+            self.template_cache[packed.name] = packed.image
+            self.prepared_templates.pop(packed.name, None)
+            if packed.prepared is not None:
+                self.prepared_templates[packed.name] = packed.prepared
+            self.set_template_meta(packed.name, packed.threshold, packed.region)
+            self._drop_pyramids(packed.name)
+        print(f"模板包 '{pack_path}' 加载了 {len(pack)} 个模板")
+        return len(pack)
+
+    def save_pack(self, pack_path: str, meta: Optional[dict] = None) -> int:
+        """
+        把已加载的模板(含预处理结果、阈值和区域)编译为模板包
+        :return: 写入的模板数
+        """
+        packed = []
+        for name, image in self.template_cache.items():
+            prepared = self.prepared_templates.get(name)
+            packed.append(PackedTemplate(name=name,
+                                         image=image,
+                                         profile=prepared.profile if prepared else None,
+                                         mask=prepared.mask if prepared else None,
+                                         processed=prepared.processed if prepared else None,
+                                         processed_mask=prepared.processed_mask if prepared else None,
+                                         threshold=self.thresholds.get(name),
+                                         region=self.region_hints.get(name)))
+        write_pack(pack_path, packed, meta)
+        return len(packed)
+
+    def find_element(self, screenshot_path: ImageSource, template_name: str, threshold: Optional[float] = None,
                      region: Optional[Tuple[int, int, int, int]] = None) -> Optional[Tuple[int, int]]:
+        """
+        :param threshold: 匹配阈值，None 时使用模板配置的阈值或 DEFAULT_THRESHOLD
+        """
         if template_name not in self.template_cache:
             print(f"模板 '{template_name}' 未找到，请先加载")
             return None
+        if threshold is None:
+            threshold = self.thresholds.get(template_name, DEFAULT_THRESHOLD)
 
-        template_path = self.template_cache[template_name]
-
-        if region:
-            result = self.matcher.find_template_in_region(screenshot_path, template_path, region, threshold)
-        else:
-            result = self.matcher.find_template(screenshot_path, template_path, threshold)
+        with tracer.span("match", template=template_name):
+            result = self._find_element(screenshot_path, template_name, threshold, region)
+        tracer.count("match.hit" if result else "match.miss")
 
         if result:
             x, y, confidence = result
@@ -43,14 +188,204 @@ class GameImageDetector:
             print(f"未找到 '{template_name}'")
             return None
 
-    def find_multiple_elements(self, screenshot_path: str, template_name: str, threshold: float = 0.8) -> List[
-        Tuple[int, int]]:
+    def _find_element(self, screenshot_path: ImageSource, template_name: str, threshold: float,
+                      region: Optional[Tuple[int, int, int, int]]) -> Optional[Tuple[int, int, float]]:
+        screenshot = self.matcher.load_screenshot(screenshot_path)
+        if region is not None or screenshot is None:
+            return self._match(screenshot, template_name, threshold, region)
+        return self._match_hinted(screenshot, template_name, threshold,
+                                  lambda: self._match(screenshot, template_name, threshold))
+
+    def _match_hinted(self, screenshot, template_name: str, threshold: float,
+                      full_match: Callable[[], Optional[Tuple[int, int, float]]]) -> Optional[Tuple[int, int, float]]:
+        """
+        先在上次命中位置(或配置区域)附近搜索，未命中时调用 full_match 全图搜索，并更新位置提示和命中统计
+        """
+        result = None
+        hint_region = self._hint_region(screenshot, template_name) if self.use_hints else None
+        if hint_region:
+            start_time = time.perf_counter()
+            result = self._match(screenshot, template_name, threshold, hint_region)
+            self.hint_stats.setdefault(template_name, HintStats()).record_hint(
+                result is not None, time.perf_counter() - start_time)
+            if not result and template_name in self.location_hints:
+                misses = self._hint_misses.get(template_name, 0) + 1
+                self._hint_misses[template_name] = misses
+                if misses >= self.hint_miss_limit:
+                    # 元素已不在原位置(界面切换或布局变化)，不再为过期的提示多付一次局部搜索
+                    self.location_hints.pop(template_name)
+                    self._hint_misses.pop(template_name)
+
+        if not result:
+            start_time = time.perf_counter()
+            result = full_match()
+            self.hint_stats.setdefault(template_name, HintStats()).record_full(time.perf_counter() - start_time)
+
+        if result:
+            self.location_hints[template_name] = result[:2]
+            self._hint_misses.pop(template_name, None)
+        return result
+
+    def _match(self, screenshot, template_name: str, threshold: float,
+               region: Optional[Tuple[int, int, int, int]] = None) -> Optional[Tuple[int, int, float]]:
+        template = self.template_cache[template_name]
+        if template_name in self.prepared_templates and screenshot is not None:
+            return self.matcher.match_profiled(screenshot, self.prepared_templates[template_name], threshold, region)
+        if region:
+            return self.matcher.find_template_in_region(screenshot, template, region, threshold)
+        return self.matcher.find_template(screenshot, template, threshold)
+
+    def _hint_region(self, screenshot, template_name: str) -> Optional[Tuple[int, int, int, int]]:
+        """上次命中位置外扩 hint_padding 的搜索窗口 (x, y, w, h)，没有命中过时使用配置的区域"""
+        template_h, template_w = self.template_cache[template_name].shape[:2]
+        frame_h, frame_w = screenshot.shape[:2]
+
+        hint = self.location_hints.get(template_name)
+        if hint is not None:
+            x1 = max(hint[0] - template_w // 2 - self.hint_padding, 0)
+            y1 = max(hint[1] - template_h // 2 - self.hint_padding, 0)
+            x2 = min(hint[0] + template_w // 2 + self.hint_padding + 1, frame_w)
+            y2 = min(hint[1] + template_h // 2 + self.hint_padding + 1, frame_h)
+        elif template_name in self.region_hints:
+            x, y, w, h = self.region_hints[template_name]
+            x1, y1 = max(x, 0), max(y, 0)
+            x2, y2 = min(x + w, frame_w), min(y + h, frame_h)
+        else:
+            return None
+
+        if x2 - x1 < template_w or y2 - y1 < template_h:
+            return None
+        return (x1, y1, x2 - x1, y2 - y1)
+
+    def template_sizes(self) -> Dict[str, Tuple[int, int]]:
+        """模板名 -> (宽, 高)，供 DebugSink 绘制匹配框"""
+        return {name: (template.shape[1], template.shape[0]) for name, template in self.template_cache.items()}
+
+    def hint_statistics(self) -> Dict[str, Dict[str, float]]:
+        """各模板的位置提示命中统计"""
+        return {name: stats.as_dict() for name, stats in self.hint_stats.items()}
+
+    def find_elements(self, screenshot_path: ImageSource, template_names: Optional[Iterable[str]] = None,
+                      threshold: Optional[float] = None, grayscale: bool = False, pyramid_levels: int = 0,
+                      max_workers: Optional[int] = None) -> Dict[str, Tuple[int, int, float]]:
+        """
+        用一帧画面批量匹配多个模板，画面只解码和预处理一次
+        与 find_element 一样先在各模板的位置提示附近搜索，未命中再做全图(金字塔)匹配
+        :param screenshot_path: 截图路径或BGR数组
+        :param template_names: 要匹配的模板名；None 时若配置了界面识别则只匹配当前界面登记的模板，
+                               否则(或界面未知时)匹配所有已加载模板
+        :param threshold: 匹配阈值，None 时各模板使用配置的阈值或 DEFAULT_THRESHOLD
+        :param grayscale: 是否在灰度图上匹配
+        :param pyramid_levels: 金字塔粗匹配的下采样层数，0表示直接原分辨率匹配
+        :param max_workers: 线程池大小，None或1表示在当前线程串行匹配
+        :return: 找到的模板名 -> (x, y, 置信度)
+        """
+        screenshot = self.matcher.load_screenshot(screenshot_path)
+        if screenshot is None:
+            print("无法读取截图")
+            return {}
+
+        if template_names is None and self.screen_classifier is not None:
+            self.current_screen = self.screen_classifier.classify(screenshot)
+            template_names = self.screen_classifier.templates_for(self.current_screen)
+        if template_names is None:
+            template_names = list(self.template_cache)
+
+        names = []
+        for name in template_names:
+            if name in self.template_cache:
+                names.append(name)
+            else:
+                print(f"模板 '{name}' 未找到，请先加载")
+
+        frame_pyramid = self.matcher.build_pyramid(screenshot, pyramid_levels, grayscale)
+        # 预处理配置相同的模板共用一份预处理后的画面
+        processed_frames = {}
+
+        def match(name):
+            with tracer.span("match", template=name):
+                return _match(name)
+
+        def _match(name):
+            template_threshold = self.thresholds.get(name, DEFAULT_THRESHOLD) if threshold is None else threshold
+
+            def full_match():
+                if name in self.prepared_templates:
+                    return self.matcher.match_profiled(screenshot, self.prepared_templates[name], template_threshold,
+                                                       processed_frames=processed_frames)
+                template_pyramid = self._get_pyramid(name, pyramid_levels, grayscale)
+                return self.matcher.match_pyramid(frame_pyramid, template_pyramid, template_threshold)
+
+            # 每个模板只读写自己的提示和统计，多线程匹配时互不影响
+            return self._match_hinted(screenshot, name, template_threshold, full_match)
+
+        # OpenCV 的 matchTemplate 会释放GIL，多线程可以并行
+        with tracer.span("match.batch", templates=len(names)):
+            if max_workers and max_workers > 1 and len(names) > 1:
+                results = list(self._get_executor(max_workers).map(match, names))
+            else:
+                results = list(map(match, names))
+
+        found = {name: result for name, result in zip(names, results) if result}
+        print(f"批量匹配 {len(names)} 个模板，找到 {len(found)} 个")
+        return found
+
+    def _get_pyramid(self, template_name: str, levels: int, grayscale: bool) -> List:
+        key = (template_name, grayscale, levels)
+        pyramid = self.pyramid_cache.get(key)
+        if pyramid is None:
+            pyramid = self.matcher.build_pyramid(self.template_cache[template_name], levels, grayscale)
+            self.pyramid_cache[key] = pyramid
+        return pyramid
+
+    def _drop_pyramids(self, template_name: str):
+        for key in [key for key in self.pyramid_cache if key[0] == template_name]:
+            del self.pyramid_cache[key]
+
+    def _get_executor(self, max_workers: int):
+        # 只有多线程匹配才需要线程池，按需导入以加快启动
+        from concurrent.futures import ThreadPoolExecutor
+
+        if self._executor is None or self._executor_workers != max_workers:
+            if self._executor:
+                self._executor.shutdown(wait=False)
+            self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="template-match")
+            self._executor_workers = max_workers
+        return self._executor
+
+    def close(self):
+        """关闭多线程匹配的线程池，之后再调用 find_elements 会按需重建"""
+        if self._executor:
+            self._executor.shutdown()
+            self._executor = None
+            self._executor_workers = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def find_multiple_elements(self, screenshot_path: ImageSource, template_name: str,
+                               threshold: Optional[float] = None,
+                               overlap_threshold: float = 0.3) -> List[Tuple[int, int]]:
+        """
+        :param threshold: 匹配阈值，None 时使用模板配置的阈值或 DEFAULT_THRESHOLD
+        """
         if template_name not in self.template_cache:
             print(f"模板 '{template_name}' 未找到，请先加载")
             return []
+        if threshold is None:
+            threshold = self.thresholds.get(template_name, DEFAULT_THRESHOLD)
 
-        template_path = self.template_cache[template_name]
-        results = self.matcher.find_all_templates(screenshot_path, template_path, threshold)
+        if template_name in self.prepared_templates:
+            screenshot = self.matcher.load_screenshot(screenshot_path)
+            results = [] if screenshot is None else self.matcher.find_all_profiled(
+                screenshot, self.prepared_templates[template_name], threshold, overlap_threshold)
+        else:
+            template = self.template_cache[template_name]
+            results = self.matcher.find_all_templates(screenshot_path, template, threshold,
+                                                      overlap_threshold=overlap_threshold)
 
         coordinates = [(x, y) for x, y, _ in results]
         print(f"找到 {len(coordinates)} 个 '{template_name}'")
@@ -58,17 +393,88 @@ class GameImageDetector:
         return coordinates
 
     def wait_for_element(self, screenshot_func, template_name: str, timeout: int = 10, interval: float = 1.0,
-                         threshold: float = 0.8) -> Optional[Tuple[int, int]]:
+                         threshold: Optional[float] = None,
+                         min_interval: Optional[float] = None) -> Optional[Tuple[int, int]]:
+        found = self.wait_for_elements(screenshot_func, [template_name], timeout, interval, threshold, min_interval)
+        return found[1] if found else None
+
+    def wait_for_elements(self, screenshot_func, template_names: Iterable[str], timeout: int = 10,
+                          interval: float = 1.0, threshold: Optional[float] = None,
+                          min_interval: Optional[float] = None) -> Optional[Tuple[str, Tuple[int, int]]]:
+        """
+        等待多个模板中任意一个出现
+        只在画面发生变化时重新匹配，且只匹配变化区域；画面静止时轮询间隔逐步放大到 interval，
+        画面一旦变化立即回到 min_interval
+        :param screenshot_func: 返回截图路径或BGR数组的函数
+        :param template_names: 模板名列表，同一帧内按顺序检查
+        :param interval: 最大轮询间隔(秒)
+        :param threshold: 匹配阈值，None 时各模板使用配置的阈值或 DEFAULT_THRESHOLD
+        :param min_interval: 最小轮询间隔(秒)，默认 interval / 10
+        :return: (模板名, (x, y))，超时返回None
+        """
+        names = []
+        for name in template_names:
+            if name in self.template_cache:
+                names.append(name)
+            else:
+                print(f"模板 '{name}' 未找到，请先加载")
+        if not names:
+            return None
+
+        if min_interval is None:
+            min_interval = interval / 10
+
+        differ = FrameDiffer()
+        delay = min_interval
         start_time = time.time()
 
         while time.time() - start_time < timeout:
-            screenshot_path = screenshot_func()
-            result = self.find_element(screenshot_path, template_name, threshold)
-            if result:
-                return result
-            time.sleep(interval)
+            screenshot = self.matcher.load_screenshot(screenshot_func())
+            if screenshot is not None:
+                regions = differ.update(screenshot)
+                if regions == []:
+                    # 与上次匹配的帧相比画面未变化，上次没找到这一帧也不会找到
+                    delay = min(delay * 2, interval)
+                else:
+                    found = self._match_in_regions(screenshot, names, regions, threshold)
+                    if found:
+                        name, (x, y, confidence) = found
+                        print(f"找到 '{name}': 坐标({x}, {y}), 置信度: {confidence:.3f}")
+                        return name, (x, y)
+                    delay = min_interval
+            time.sleep(delay)
+
+        print(f"等待 {', '.join(repr(name) for name in names)} 超时")
+        return None
+
+    def _match_in_regions(self, screenshot, names: List[str], regions, threshold: Optional[float]):
+        """在变化区域内依次匹配模板，regions 为 None 时全图匹配"""
+        frame_h, frame_w = screenshot.shape[:2]
+
+        for name in names:
+            template = self.template_cache[name]
+            template_h, template_w = template.shape[:2]
+            template_threshold = self.thresholds.get(name, DEFAULT_THRESHOLD) if threshold is None else threshold
+
+            if regions is None:
+                result = self._match(screenshot, name, template_threshold)
+                if result:
+                    return name, result
+                continue
+
+            for x, y, w, h in regions:
+                # 模板只要与变化区域有重叠就可能出现，区域向外扩展一个模板尺寸
+                x1 = max(x - template_w, 0)
+                y1 = max(y - template_h, 0)
+                x2 = min(x + w + template_w, frame_w)
+                y2 = min(y + h + template_h, frame_h)
+                if x2 - x1 < template_w or y2 - y1 < template_h:
+                    continue
+
+                result = self._match(screenshot, name, template_threshold, (x1, y1, x2 - x1, y2 - y1))
+                if result:
+                    return name, result
 
-        print(f"等待 '{template_name}' 超时")
         return None
 
 
@@ -0,0 +1,168 @@
+import json
+import shlex
+import time
+from typing import List, Tuple
+
+# 单条 adb shell 命令行的长度上限，超出时拆成多次执行
+MAX_SCRIPT_LENGTH = 4000
+# 执行宏脚本时在步骤总时长之外额外等待的时间(秒)，覆盖adb往返和 input 命令自身的开销
+MACRO_TIMEOUT_MARGIN = 10.0
+
+
+class GestureMacro:
+    """
+    手势宏
+    把一串点击、滑动、按键和等待编译成一段设备端shell脚本，一次adb往返执行完，
+    步骤之间的等待由设备端 sleep 完成，不受adb往返延迟影响。可保存为JSON文件回放。
+    """
+
+    def __init__(self, steps: List[dict] = None):
+        self.steps = list(steps or [])
+
+    def tap(self, x, y) -> "GestureMacro":
+        self.steps.append({"type": "tap", "x": int(x), "y": int(y)})
+        return self
+
+    def swipe(self, x1, y1, x2, y2, duration=300) -> "GestureMacro":
+        self.steps.append({"type": "swipe", "x1": int(x1), "y1": int(y1), "x2": int(x2), "y2": int(y2),
+                           "duration": int(duration)})
+        return self
+
+    def long_press(self, x, y, duration=1000) -> "GestureMacro":
+        return self.swipe(x, y, x, y, duration)
+
+    def press_key(self, keycode) -> "GestureMacro":
+        self.steps.append({"type": "key", "keycode": str(keycode)})
+        return self
+
+    def input_text(self, text) -> "GestureMacro":
+        self.steps.append({"type": "text", "text": text})
+        return self
+
+    def wait(self, ms) -> "GestureMacro":
+        self.steps.append({"type": "wait", "ms": int(ms)})
+        return self
+
+    @staticmethod
+    def _step_command(step: dict) -> str:
+        kind = step["type"]
+        if kind == "tap":
+            return f"input tap {step['x']} {step['y']}"
+        if kind == "swipe":
+            return f"input swipe {step['x1']} {step['y1']} {step['x2']} {step['y2']} {step['duration']}"
+        if kind == "key":
+            return f"input keyevent {shlex.quote(step['keycode'])}"
+        if kind == "text":
+            return f"input text {shlex.quote(step['text'])}"
+        if kind == "wait":
+            return f"sleep {step['ms'] / 1000:.3f}"
+        raise ValueError(f"未知的手势类型: {kind}")
+
+    def to_script(self) -> str:
+        """编译为单条设备端shell脚本"""
+        return "; ".join(self._step_command(step) for step in self.steps)
+
+    def to_scripts(self, max_length: int = MAX_SCRIPT_LENGTH) -> List[str]:
+        """按步骤边界拆分，保证每段脚本不超过 max_length"""
+        return [script for script, _ in self._split_scripts(max_length)]
+
+    @staticmethod
+    def _step_duration(step: dict) -> float:
+        """步骤在设备上的预计耗时(秒)，只计等待和滑动时长"""
+        if step["type"] == "wait":
+            return step["ms"] / 1000
+        if step["type"] == "swipe":
+            return step["duration"] / 1000
+        return 0.0
+
+    @property
+    def duration(self) -> float:
+        """宏在设备上的预计总耗时(秒)"""
+        return sum(self._step_duration(step) for step in self.steps)
+
+    def _split_scripts(self, max_length: int) -> List[Tuple[str, float]]:
+        """按步骤边界拆分为 (脚本, 预计耗时秒)"""
+        scripts = []
+        current = []
+        length = 0
+        duration = 0.0
+        for step in self.steps:
+            command = self._step_command(step)
+            if current and length + len(command) + 2 > max_length:
+                scripts.append(("; ".join(current), duration))
+                current, length, duration = [], 0, 0.0
+            current.append(command)
+            length += len(command) + 2
+            duration += self._step_duration(step)
+        if current:
+            scripts.append(("; ".join(current), duration))
+        return scripts
+
+    def run(self, adb):
+        """
+        在设备上执行，通常只需一次adb往返
+        每段脚本的超时为其等待和滑动总时长加 MACRO_TIMEOUT_MARGIN，长宏不会因默认超时被中断
+        :param adb: ADBManager
+        """
+        for script, duration in self._split_scripts(MAX_SCRIPT_LENGTH):
+            adb.execute_command(["shell", script], timeout=duration + MACRO_TIMEOUT_MARGIN)
+
+    def save(self, path: str):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"steps": self.steps}, f, ensure_ascii=False, indent=2)
+
+    @classmethod
+    def load(cls, path: str) -> "GestureMacro":
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(json.load(f)["steps"])
+
+    def __len__(self):
+        return len(self.steps)
+
+
+class MacroRecorder:
+    """
+    录制宏: 接口与 ADBManager 的输入操作相同，调用时正常执行，
+    同时记录操作及其间隔，之后可保存为宏文件回放
+    """
+
+    def __init__(self, adb):
+        self.adb = adb
+        self.macro = GestureMacro()
+        self._last_time = None
+
+    def _record_wait(self):
+        # 只记录上一操作完成到本次操作开始之间的空闲时间；
+        # adb 往返和滑动本身的时长在回放时由操作自己消耗，不能再计入等待
+        if self._last_time is not None:
+            self.macro.wait((time.perf_counter() - self._last_time) * 1000)
+
+    def _record_done(self):
+        self._last_time = time.perf_counter()
+
+    def tap(self, x, y):
+        self._record_wait()
+        self.macro.tap(x, y)
+        self.adb.tap(x, y)
+        self._record_done()
+
+    def swipe(self, x1, y1, x2, y2, duration=300):
+        self._record_wait()
+        self.macro.swipe(x1, y1, x2, y2, duration)
+        self.adb.swipe(x1, y1, x2, y2, duration)
+        self._record_done()
+
+    def long_press(self, x, y, duration=1000):
+        self.swipe(x, y, x, y, duration)
+
+    def press_key(self, keycode):
+        self._record_wait()
+        self.macro.press_key(keycode)
+        self.adb.press_key(keycode)
+        self._record_done()
+
+    def input_text(self, text):
+        self._record_wait()
+        self.macro.input_text(text)
+        self.adb.input_text(text)
+        self._record_done()
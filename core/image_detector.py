@@ -1,19 +1,73 @@
 import time
-from typing import Tuple, Optional, List
+from typing import Tuple, Optional, List, Union
 
 import cv2
 import numpy as np
 
+from core.template_cache import TemplateCache, default_template_cache
+from core.template_profile import PreparedTemplate
+from core.tracing import traced, tracer
 
-class ImageDetector:
-    def __init__(self):
-        pass
+# 图像参数既可以是文件路径，也可以是已解码的BGR数组
+ImageSource = Union[str, np.ndarray]
+
+# 金字塔粗匹配时模板的最小边长，再缩小特征会丢失
+MIN_PYRAMID_TEMPLATE_SIZE = 8
+
+
+def non_max_suppression(boxes: np.ndarray, scores: np.ndarray, overlap_threshold: float = 0.3) -> np.ndarray:
+    """
+    贪心框NMS，每轮用向量化IoU一次剔除与当前最高分框重叠过多的全部候选
+    :param boxes: (N, 4) 的 x1, y1, x2, y2
+    :param scores: (N,) 置信度
+    :param overlap_threshold: IoU 超过该值的框被视为同一目标
+    :return: 保留框的下标，按置信度降序
+    """
+    if len(boxes) == 0:
+        return np.empty(0, dtype=np.intp)
+
+    boxes = boxes.astype(np.float32)
+    x1, y1, x2, y2 = boxes[:, 0], boxes[:, 1], boxes[:, 2], boxes[:, 3]
+    areas = (x2 - x1) * (y2 - y1)
+    order = np.argsort(scores)[::-1]
+
+    keep = []
+    while order.size:
+        i = order[0]
+        keep.append(i)
+        rest = order[1:]
+
+        inter_w = np.clip(np.minimum(x2[i], x2[rest]) - np.maximum(x1[i], x1[rest]), 0, None)
+        inter_h = np.clip(np.minimum(y2[i], y2[rest]) - np.maximum(y1[i], y1[rest]), 0, None)
+        inter = inter_w * inter_h
+        iou = inter / (areas[i] + areas[rest] - inter)
+
+        order = rest[iou <= overlap_threshold]
+
+    return np.asarray(keep, dtype=np.intp)
 
-    def find_template(self, screenshot_path: str, template_path: str, threshold: float = 0.8,
+
+class ImageDetector:
+    def __init__(self, template_cache: Optional[TemplateCache] = None):
+        self.template_cache = template_cache if template_cache is not None else default_template_cache
+
+    def load_screenshot(self, screenshot: ImageSource) -> Optional[np.ndarray]:
+        if isinstance(screenshot, np.ndarray):
+            return screenshot
+        with tracer.span("decode", path=screenshot):
+            return cv2.imread(screenshot)
+
+    def load_template(self, template: ImageSource) -> Optional[np.ndarray]:
+        if isinstance(template, np.ndarray):
+            return template
+        return self.template_cache.get(template)
+
+    @traced("match.find_template")
+    def find_template(self, screenshot_path: ImageSource, template_path: ImageSource, threshold: float = 0.8,
                       method: int = cv2.TM_CCOEFF_NORMED) -> Optional[Tuple[int, int, float]]:
         try:
-            screenshot = cv2.imread(screenshot_path)
-            template = cv2.imread(template_path)
+            screenshot = self.load_screenshot(screenshot_path)
+            template = self.load_template(template_path)
 
             if screenshot is None or template is None:
                 raise ValueError("无法读取图像文件")
@@ -40,42 +94,60 @@ class ImageDetector:
             print(f"图像匹配出错: {e}")
             return None
 
-    def find_all_templates(self, screenshot_path: str, template_path: str, threshold: float = 0.8,
-                           method: int = cv2.TM_CCOEFF_NORMED) -> List[Tuple[int, int, float]]:
+    @traced("match.find_all_templates")
+    def find_all_templates(self, screenshot_path: ImageSource, template_path: ImageSource, threshold: float = 0.8,
+                           method: int = cv2.TM_CCOEFF_NORMED, overlap_threshold: float = 0.3,
+                           min_distance: int = 1) -> List[Tuple[int, int, float]]:
+        """
+        查找模板的所有出现位置，每个实际目标只返回一个结果
+        :param overlap_threshold: NMS 的 IoU 阈值，重叠超过该值的命中合并为一个
+        :param min_distance: 局部极大值的最小间距(像素)，在该半径内只保留峰值点
+        :return: (中心x, 中心y, 置信度) 列表，按置信度降序
+        """
         try:
-            screenshot = cv2.imread(screenshot_path)
-            template = cv2.imread(template_path)
+            screenshot = self.load_screenshot(screenshot_path)
+            template = self.load_template(template_path)
 
             if screenshot is None or template is None:
                 raise ValueError("无法读取图像文件")
 
             template_h, template_w = template.shape[:2]
             result = cv2.matchTemplate(screenshot, template, method)
-            locations = np.where(result >= threshold)
-            matches = []
+            if method in [cv2.TM_SQDIFF, cv2.TM_SQDIFF_NORMED]:
+                result = 1 - result
 
-            for pt in zip(*locations[::-1]):
-                confidence = result[pt[1], pt[0]]
-                center_x = pt[0] + template_w // 2
-                center_y = pt[1] + template_h // 2
-                matches.append((center_x, center_y, confidence))
+            # 先用膨胀做局部极大值提取，把每个目标周围的一片高分点收缩为峰值点
+            kernel = np.ones((2 * min_distance + 1, 2 * min_distance + 1), np.uint8)
+            peaks = (result >= threshold) & (result >= cv2.dilate(result, kernel))
+            ys, xs = np.nonzero(peaks)
+            scores = result[ys, xs]
 
-            return sorted(matches, key=lambda x: x[2], reverse=True)
+            boxes = np.stack([xs, ys, xs + template_w, ys + template_h], axis=1)
+            keep = non_max_suppression(boxes, scores, overlap_threshold)
+
+            centers_x = xs[keep] + template_w // 2
+            centers_y = ys[keep] + template_h // 2
+            return [(int(x), int(y), float(c)) for x, y, c in zip(centers_x, centers_y, scores[keep])]
 
         except Exception as e:
             print(f"多目标匹配出错: {e}")
             return []
 
-    def find_template_with_scale(self, screenshot_path: str, template_path: str, threshold: float = 0.8,
-                                 scale_range: Tuple[float, float] = (0.8, 1.2), scale_steps: int = 5) -> Optional[
-        Tuple[int, int, float, float]]:
+    @traced("match.find_template_with_scale")
+    def find_template_with_scale(self, screenshot_path: ImageSource, template_path: ImageSource, threshold: float = 0.8,
+                                 scale_range: Tuple[float, float] = (0.8, 1.2), scale_steps: int = 5,
+                                 pyramid_levels: int = 0) -> Optional[Tuple[int, int, float, float]]:
         try:
-            screenshot = cv2.imread(screenshot_path)
-            template = cv2.imread(template_path)
+            screenshot = self.load_screenshot(screenshot_path)
+            template = self.load_template(template_path)
 
             if screenshot is None or template is None:
                 raise ValueError("无法读取图像文件")
 
+            if pyramid_levels > 0:
+                return self._find_scale_coarse_to_fine(screenshot, template, threshold,
+                                                       scale_range, scale_steps, pyramid_levels)
+
             best_match = None
             best_confidence = 0
             scales = np.linspace(scale_range[0], scale_range[1], scale_steps)
@@ -103,11 +175,76 @@ class ImageDetector:
             print(f"多尺度匹配出错: {e}")
             return None
 
-    def find_template_in_region(self, screenshot_path: str, template_path: str, region: Tuple[int, int, int, int],
-                                threshold: float = 0.8) -> Optional[Tuple[int, int, float]]:
+    def _find_scale_coarse_to_fine(self, screenshot: np.ndarray, template: np.ndarray, threshold: float,
+                                   scale_range: Tuple[float, float], scale_steps: int,
+                                   levels: int) -> Optional[Tuple[int, int, float, float]]:
+        """
+        金字塔多尺度匹配：在下采样画面上遍历全部尺度，选出最佳尺度与位置，
+        再只对该尺度及相邻尺度在原分辨率的小窗口内精确匹配
+        """
+        scales = np.linspace(scale_range[0], scale_range[1], scale_steps)
+        template_h, template_w = template.shape[:2]
+
+        # 保证最小尺度的模板下采样后仍有足够细节
+        smallest_side = min(template_h, template_w) * scales.min()
+        while levels > 0 and smallest_side / 2 ** levels < MIN_PYRAMID_TEMPLATE_SIZE:
+            levels -= 1
+
+        frame_pyramid = self.build_pyramid(screenshot, levels)
+        coarse_frame = frame_pyramid[-1]
+        factor = 2 ** levels
+
+        coarse_best = None
+        for index, scale in enumerate(scales):
+            coarse_w = max(int(template_w * scale / factor), 1)
+            coarse_h = max(int(template_h * scale / factor), 1)
+            if coarse_w >= coarse_frame.shape[1] or coarse_h >= coarse_frame.shape[0]:
+                continue
+
+            coarse_template = cv2.resize(template, (coarse_w, coarse_h), interpolation=cv2.INTER_AREA)
+            result = cv2.matchTemplate(coarse_frame, coarse_template, cv2.TM_CCOEFF_NORMED)
+            _, max_val, _, max_loc = cv2.minMaxLoc(result)
+
+            if coarse_best is None or max_val > coarse_best[0]:
+                coarse_best = (max_val, index, max_loc)
+
+        if coarse_best is None:
+            return None
+
+        _, best_index, coarse_loc = coarse_best
+        margin = 2 * factor
+        best_match = None
+        best_confidence = 0
+
+        # 粗匹配对尺度的分辨能力有限，相邻尺度一起精修
+        for scale in scales[max(best_index - 1, 0):best_index + 2]:
+            scaled_w = int(template_w * scale)
+            scaled_h = int(template_h * scale)
+            if scaled_w >= screenshot.shape[1] or scaled_h >= screenshot.shape[0]:
+                continue
+
+            x = max(coarse_loc[0] * factor - margin, 0)
+            y = max(coarse_loc[1] * factor - margin, 0)
+            roi = screenshot[y:y + scaled_h + 2 * margin, x:x + scaled_w + 2 * margin]
+            if roi.shape[0] < scaled_h or roi.shape[1] < scaled_w:
+                continue
+
+            scaled_template = cv2.resize(template, (scaled_w, scaled_h))
+            result = cv2.matchTemplate(roi, scaled_template, cv2.TM_CCOEFF_NORMED)
+            _, max_val, _, max_loc = cv2.minMaxLoc(result)
+
+            if max_val > best_confidence and max_val >= threshold:
+                best_confidence = max_val
+                best_match = (x + max_loc[0] + scaled_w // 2, y + max_loc[1] + scaled_h // 2, best_confidence, scale)
+
+        return best_match
+
+    @traced("match.find_template_in_region")
+    def find_template_in_region(self, screenshot_path: ImageSource, template_path: ImageSource,
+                                region: Tuple[int, int, int, int], threshold: float = 0.8) -> Optional[Tuple[int, int, float]]:
         try:
-            screenshot = cv2.imread(screenshot_path)
-            template = cv2.imread(template_path)
+            screenshot = self.load_screenshot(screenshot_path)
+            template = self.load_template(template_path)
 
             if screenshot is None or template is None:
                 raise ValueError("无法读取图像文件")
@@ -130,15 +267,184 @@ class ImageDetector:
             print(f"区域匹配出错: {e}")
             return None
 
-    def save_matched_result(self, screenshot_path: str, template_path: str, output_path: str,
+    def build_pyramid(self, image: np.ndarray, levels: int = 0, grayscale: bool = False) -> List[np.ndarray]:
+        """
+        生成图像金字塔，[0]为原分辨率，之后每层宽高减半
+        :param image: BGR图像
+        :param levels: 额外的下采样层数
+        :param grayscale: 是否转为灰度
+        """
+        if grayscale and image.ndim == 3:
+            image = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+
+        pyramid = [image]
+        for _ in range(levels):
+            pyramid.append(cv2.pyrDown(pyramid[-1]))
+        return pyramid
+
+    @traced("match.pyramid")
+    def match_pyramid(self, frame_pyramid: List[np.ndarray], template_pyramid: List[np.ndarray],
+                      threshold: float = 0.8) -> Optional[Tuple[int, int, float]]:
+        """
+        在预先生成的金字塔上匹配：最高可用层上全图粗定位，再在原分辨率的小窗口内精确匹配
+        :return: 原分辨率下的中心坐标和置信度
+        """
+        top = min(len(frame_pyramid), len(template_pyramid)) - 1
+        while top > 0 and min(template_pyramid[top].shape[:2]) < MIN_PYRAMID_TEMPLATE_SIZE:
+            top -= 1
+
+        frame = frame_pyramid[0]
+        template = template_pyramid[0]
+        template_h, template_w = template.shape[:2]
+        if template_h > frame.shape[0] or template_w > frame.shape[1]:
+            return None
+
+        if top == 0:
+            x, y = 0, 0
+            roi = frame
+        else:
+            coarse_frame = frame_pyramid[top]
+            coarse_template = template_pyramid[top]
+            if coarse_template.shape[0] > coarse_frame.shape[0] or coarse_template.shape[1] > coarse_frame.shape[1]:
+                return None
+
+            result = cv2.matchTemplate(coarse_frame, coarse_template, cv2.TM_CCOEFF_NORMED)
+            _, _, _, max_loc = cv2.minMaxLoc(result)
+
+            # 粗定位误差约为一个下采样步长，在其两倍范围内精确匹配
+            factor = 2 ** top
+            margin = 2 * factor
+            x = max(max_loc[0] * factor - margin, 0)
+            y = max(max_loc[1] * factor - margin, 0)
+            roi = frame[y:y + template_h + 2 * margin, x:x + template_w + 2 * margin]
+            if roi.shape[0] < template_h or roi.shape[1] < template_w:
+                return None
+
+        result = cv2.matchTemplate(roi, template, cv2.TM_CCOEFF_NORMED)
+        _, max_val, _, max_loc = cv2.minMaxLoc(result)
+
+        if max_val >= threshold:
+            return (x + max_loc[0] + template_w // 2, y + max_loc[1] + template_h // 2, max_val)
+        return None
+
+    @traced("match.profiled")
+    def match_profiled(self, screenshot: np.ndarray, prepared: PreparedTemplate, threshold: float = 0.8,
+                       region: Optional[Tuple[int, int, int, int]] = None,
+                       processed_frames: Optional[dict] = None) -> Optional[Tuple[int, int, float]]:
+        """
+        按模板预处理配置匹配: 在预处理后的画面上找最佳候选，再在原分辨率彩色图上验证该候选
+        :param region: 限定搜索区域 (x, y, w, h)
+        :param processed_frames: 预处理后画面的缓存(按配置的 preprocess_key)，批量匹配时多个模板共用
+        :return: 原分辨率下的中心坐标和置信度
+        """
+        profile = prepared.profile
+        offset_x, offset_y = 0, 0
+        if region:
+            offset_x, offset_y, w, h = region
+            screenshot = screenshot[offset_y:offset_y + h, offset_x:offset_x + w]
+            processed_frames = None
+
+        key = profile.preprocess_key
+        if processed_frames is not None and key in processed_frames:
+            frame = processed_frames[key]
+        else:
+            frame = profile.apply(screenshot)
+            if processed_frames is not None:
+                processed_frames[key] = frame
+
+        template = prepared.processed
+        if template.shape[0] > frame.shape[0] or template.shape[1] > frame.shape[1]:
+            return None
+
+        result = cv2.matchTemplate(frame, template, cv2.TM_CCOEFF_NORMED, mask=prepared.processed_mask)
+        # 带掩码时平坦区域会出现 inf/nan
+        result = np.nan_to_num(result, nan=0.0, posinf=0.0, neginf=0.0)
+        _, max_val, _, max_loc = cv2.minMaxLoc(result)
+
+        if profile.coarse_threshold is not None and max_val < profile.coarse_threshold:
+            return None
+
+        found = self._verify_profiled(screenshot, prepared, max_loc, max_val)
+        if found and found[2] >= threshold:
+            template_h, template_w = prepared.image.shape[:2]
+            x, y, confidence = found
+            return (offset_x + x + template_w // 2, offset_y + y + template_h // 2, confidence)
+        return None
+
+    def find_all_profiled(self, screenshot: np.ndarray, prepared: PreparedTemplate, threshold: float = 0.8,
+                          overlap_threshold: float = 0.3, min_distance: int = 1) -> List[Tuple[int, int, float]]:
+        """
+        按模板预处理配置查找所有出现位置，find_all_templates 的配置版本
+        预处理后画面上得分不低于 coarse_threshold(未配置时为 threshold)的峰值作为候选，NMS 后逐个验证
+        :return: (中心x, 中心y, 置信度) 列表，按置信度降序
+        """
+        profile = prepared.profile
+        frame = profile.apply(screenshot)
+        template = prepared.processed
+        if template.shape[0] > frame.shape[0] or template.shape[1] > frame.shape[1]:
+            return []
+
+        result = cv2.matchTemplate(frame, template, cv2.TM_CCOEFF_NORMED, mask=prepared.processed_mask)
+        result = np.nan_to_num(result, nan=0.0, posinf=0.0, neginf=0.0)
+
+        candidate_threshold = profile.coarse_threshold if profile.coarse_threshold is not None else threshold
+        kernel = np.ones((2 * min_distance + 1, 2 * min_distance + 1), np.uint8)
+        peaks = (result >= candidate_threshold) & (result >= cv2.dilate(result, kernel))
+        ys, xs = np.nonzero(peaks)
+        scores = result[ys, xs]
+
+        template_h, template_w = template.shape[:2]
+        boxes = np.stack([xs, ys, xs + template_w, ys + template_h], axis=1)
+        keep = non_max_suppression(boxes, scores, overlap_threshold)
+
+        matches = []
+        image_h, image_w = prepared.image.shape[:2]
+        for x, y, score in zip(xs[keep], ys[keep], scores[keep]):
+            found = self._verify_profiled(screenshot, prepared, (int(x), int(y)), float(score))
+            if found and found[2] >= threshold:
+                matches.append((found[0] + image_w // 2, found[1] + image_h // 2, float(found[2])))
+        # 验证后的置信度可能改变先后顺序
+        matches.sort(key=lambda match: match[2], reverse=True)
+        return matches
+
+    @staticmethod
+    def _verify_profiled(screenshot: np.ndarray, prepared: PreparedTemplate, loc: Tuple[int, int],
+                         score: float) -> Optional[Tuple[int, int, float]]:
+        """
+        把预处理画面上的候选位置换算回原分辨率，按配置在原图上验证
+        :return: 原分辨率下的左上角坐标和置信度，验证区域超出画面时返回None
+        """
+        profile = prepared.profile
+        template_h, template_w = prepared.image.shape[:2]
+        x = int(round(loc[0] / profile.scale))
+        y = int(round(loc[1] / profile.scale))
+        if not profile.verify:
+            return x, y, score
+
+        # 缩放带来的定位误差约为 1/scale 像素，在该范围内精确验证
+        margin = int(np.ceil(1 / profile.scale)) + 1
+        x1, y1 = max(x - margin, 0), max(y - margin, 0)
+        roi = screenshot[y1:y + template_h + margin, x1:x + template_w + margin]
+        if roi.shape[0] < template_h or roi.shape[1] < template_w:
+            return None
+
+        result = cv2.matchTemplate(roi, prepared.image, cv2.TM_CCOEFF_NORMED, mask=prepared.mask)
+        result = np.nan_to_num(result, nan=0.0, posinf=0.0, neginf=0.0)
+        _, confidence, _, loc = cv2.minMaxLoc(result)
+        return x1 + loc[0], y1 + loc[1], confidence
+
+    def save_matched_result(self, screenshot_path: ImageSource, template_path: ImageSource, output_path: str,
                             match_result: Tuple[int, int, float]) -> bool:
         try:
-            screenshot = cv2.imread(screenshot_path)
-            template = cv2.imread(template_path)
+            screenshot = self.load_screenshot(screenshot_path)
+            template = self.load_template(template_path)
 
             if screenshot is None or template is None:
                 return False
 
+            # 绘制前复制，避免修改调用方传入的帧
+            screenshot = screenshot.copy()
+
             x, y, confidence = match_result
             template_h, template_w = template.shape[:2]
 
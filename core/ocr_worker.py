@@ -0,0 +1,181 @@
+import multiprocessing
+import queue
+import time
+from typing import Callable, Iterable, Iterator, Optional
+
+import numpy as np
+
+from core.paddle_result import PaddleResult
+from core.tracing import tracer
+
+# 等待队列时检查工作进程是否存活的间隔(秒)
+POLL_INTERVAL = 0.5
+
+
+def create_paddle_ocr():
+    """默认的OCR工厂，在工作进程内加载PaddleOCR模型"""
+    from paddleocr import PaddleOCR
+
+    ocr = PaddleOCR(
+        use_doc_orientation_classify=False,
+        use_doc_unwarping=False,
+        use_textline_orientation=False,
+    )
+    return ocr.predict
+
+
+def _compact(raw_result) -> list:
+    """只保留 PaddleResult 需要的字段，避免把整份预测结果(含原图)传回主进程"""
+    return [
+        {
+            "rec_texts": list(page["rec_texts"]),
+            "rec_polys": [np.asarray(poly).tolist() for poly in page["rec_polys"]],
+        }
+        for page in raw_result
+    ]
+
+
+def _worker_main(ocr_factory, tasks, results):
+    try:
+        ocr = ocr_factory()
+    except Exception as e:
+        results.put((None, None, f"OCR 初始化失败: {e}"))
+        return
+
+    while True:
+        task = tasks.get()
+        if task is None:
+            break
+
+        frame_id, frame = task
+        try:
+            results.put((frame_id, _compact(ocr(frame)), None))
+        except Exception as e:
+            results.put((frame_id, None, f"OCR 识别出错: {e}"))
+
+
+class OCRWorker:
+    """
+    常驻OCR工作进程
+    模型只在工作进程启动时加载一次，帧以 np.ndarray 形式经有界队列传入，
+    主进程可以在识别第N帧的同时采集第N+1帧。
+    """
+
+    def __init__(self, ocr_factory: Callable = create_paddle_ocr, max_pending: int = 2):
+        """
+        :param ocr_factory: 无参可调用对象，在工作进程中调用一次，返回 ocr(frame) -> PaddleOCR 格式结果 的函数；
+                            需可被pickle(模块级函数)，离线测试时可替换为任意替身
+        :param max_pending: 最多排队等待识别的帧数，队列满时 submit 阻塞
+        """
+        self.ocr_factory = ocr_factory
+        self.max_pending = max_pending
+
+        self._tasks = None
+        self._results = None
+        self._process = None
+        self._next_id = 0
+
+    def start(self):
+        if self._process is not None:
+            return
+
+        self._tasks = multiprocessing.Queue(maxsize=self.max_pending)
+        self._results = multiprocessing.Queue()
+        self._process = multiprocessing.Process(target=_worker_main,
+                                                args=(self.ocr_factory, self._tasks, self._results),
+                                                daemon=True)
+        self._process.start()
+
+    def close(self, timeout: float = 5.0):
+        """
+        通知工作进程退出并等待；工作进程已退出、任务队列一直满或超时未退出时直接结束进程
+        :param timeout: 等待工作进程处理完已提交帧并退出的时间(秒)
+        """
+        process, self._process = self._process, None
+        if process is None:
+            return
+
+        if process.is_alive():
+            try:
+                self._tasks.put(None, timeout=timeout)
+            except queue.Full:
+                pass
+            process.join(timeout=timeout)
+        if process.is_alive():
+            process.terminate()
+            process.join()
+        # 工作进程不会再读取队列，避免解释器退出时等待把剩余帧写入管道
+        self._tasks.cancel_join_thread()
+
+    def submit(self, frame: np.ndarray, frame_id: Optional[int] = None) -> int:
+        """
+        提交一帧待识别
+        :param frame: BGR图像
+        :param frame_id: 帧编号，默认自增
+        :return: 帧编号
+        """
+        self.start()
+        if frame_id is None:
+            frame_id = self._next_id
+        self._next_id = frame_id + 1
+
+        # 队列满时分段等待，工作进程退出后不会永远阻塞
+        while True:
+            try:
+                self._tasks.put((frame_id, frame), timeout=POLL_INTERVAL)
+                return frame_id
+            except queue.Full:
+                self._check_alive()
+
+    def get(self, timeout: Optional[float] = None) -> tuple[int, PaddleResult]:
+        """
+        取回一帧的识别结果(按提交顺序)
+        :return: (帧编号, PaddleResult)
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with tracer.span("ocr.wait"):
+            while True:
+                wait = POLL_INTERVAL if deadline is None else min(POLL_INTERVAL, deadline - time.monotonic())
+                try:
+                    frame_id, paddle_result, error = self._results.get(timeout=max(wait, 0))
+                    break
+                except queue.Empty:
+                    self._check_alive()
+                    if deadline is not None and time.monotonic() >= deadline:
+                        raise TimeoutError(f"等待OCR结果超时({timeout}s)")
+
+        if error:
+            raise RuntimeError(error)
+        return frame_id, PaddleResult(paddle_result=paddle_result)
+
+    def _check_alive(self):
+        if self._process is None:
+            raise RuntimeError("OCR工作进程未启动")
+        if not self._process.is_alive():
+            exitcode = self._process.exitcode
+            self.close()
+            raise RuntimeError(f"OCR工作进程已退出(exitcode={exitcode})")
+
+    def imap(self, frames: Iterable[np.ndarray]) -> Iterator[PaddleResult]:
+        """
+        流水线识别: 始终保持最多 max_pending 帧在识别中，
+        frames 的下一帧在上一帧识别期间采集
+        """
+        pending = 0
+        for frame in frames:
+            self.submit(frame)
+            pending += 1
+            if pending > self.max_pending:
+                yield self.get()[1]
+                pending -= 1
+
+        while pending:
+            yield self.get()[1]
+            pending -= 1
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
@@ -1,7 +1,11 @@
 from dataclasses import dataclass
 
+import numpy as np
 
-@dataclass
+from core.tracing import traced
+
+
+@dataclass(slots=True)
 class PaddleResultItemData:
     text: str
     predict_rect: tuple
@@ -12,10 +16,47 @@ class PaddleResult(object):
     def __init__(self, **kwargs):
         self._paddle_result = kwargs.get("paddle_result")
 
+        # 以下均在第一次访问时解析一次，之后复用
+        self._items = None
+        self._texts = None
+        self._boxes = None
+        self._positions = None
+        # 文本 -> 下标 的精确索引，以及 单字/双字 -> 下标集合 的子串索引
+        self._exact_index = None
+        self._gram_index = None
+        self._query_cache = {}
+
+    @classmethod
+    def from_items(cls, items: list[PaddleResultItemData]) -> "PaddleResult":
+        """由已解析的条目直接构造，无需原始OCR输出"""
+        result = cls(paddle_result=[])
+        result._set_items(list(items))
+        return result
+
     @property
     def paddle_result(self) -> list[PaddleResultItemData]:
+        if self._items is None:
+            self._parse()
+        return self._items
+
+    @property
+    def boxes(self) -> np.ndarray:
+        """(N, 4) 的 predict_rect 数组: x_start, y_start, x_end, y_end"""
+        if self._items is None:
+            self._parse()
+        return self._boxes
+
+    @property
+    def positions(self) -> np.ndarray:
+        """(N, 2) 的中心点数组"""
+        if self._items is None:
+            self._parse()
+        return self._positions
+
+    @traced("ocr.parse")
+    def _parse(self):
         res = []
-        for i in self._paddle_result:
+        for i in self._paddle_result or []:
             for j in range(len(i["rec_texts"])):
                 text = i["rec_texts"][j]
                 # ocr_result = {text: [i["rec_polys"][j][0], i["rec_polys"][j][-1]]}
@@ -42,31 +83,75 @@ class PaddleResult(object):
                 )
                 res.append(item_data)
 
-        return res
+        self._set_items(res)
+
+    def _set_items(self, res: list[PaddleResultItemData]):
+        self._items = res
+        self._texts = [item.text for item in res]
+        self._boxes = np.array([item.predict_rect for item in res], dtype=np.float64).reshape(-1, 4)
+        self._positions = np.array([item.pos for item in res], dtype=np.int64).reshape(-1, 2)
+
+    def _build_index(self):
+        if self._items is None:
+            self._parse()
+
+        exact_index = {}
+        gram_index = {}
+        for index, text in enumerate(self._texts):
+            exact_index.setdefault(text, []).append(index)
+            for n in (1, 2):
+                for k in range(len(text) - n + 1):
+                    gram_index.setdefault(text[k:k + n], set()).add(index)
+
+        self._exact_index = exact_index
+        self._gram_index = gram_index
+
+    def _match_indices(self, text) -> list[int]:
+        """返回包含 text 的条目下标(升序)"""
+        cached = self._query_cache.get(text)
+        if cached is not None:
+            return cached
+
+        if self._gram_index is None:
+            self._build_index()
+
+        if not text:
+            indices = list(range(len(self._texts)))
+        elif len(text) <= 2:
+            indices = sorted(self._gram_index.get(text, ()))
+        else:
+            # 用查询串的全部双字取交集得到候选，再做一次子串校验
+            grams = [text[k:k + 2] for k in range(len(text) - 1)]
+            postings = sorted((self._gram_index.get(gram, set()) for gram in grams), key=len)
+            candidates = set(postings[0]).intersection(*postings[1:])
+            indices = sorted(index for index in candidates if text in self._texts[index])
+
+        self._query_cache[text] = indices
+        return indices
+
+    def try_get_text_exact(self, text) -> list[PaddleResultItemData]:
+        if self._exact_index is None:
+            self._build_index()
+        return [self._items[index] for index in self._exact_index.get(text, [])]
 
     def try_get_text_coord(self, text) -> list[PaddleResultItemData]:
         if not self.paddle_result:
             return None
-        res = []
-        for item in self.paddle_result:
-            if text in item.text:
-                res.append(item)
-
-        return res
+        return [self._items[index] for index in self._match_indices(text)]
 
     def try_get_text_coord_in_range(self, text, x1, y1, x2, y2) -> list[PaddleResultItemData]:
 
         if not self.paddle_result:
             return []
 
-        res: list[PaddleResultItemData] = []
+        indices = np.asarray(self._match_indices(text), dtype=np.intp)
+        if indices.size == 0:
+            return []
+
         min_x, max_x = min(x1, x2), max(x1, x2)
         min_y, max_y = min(y1, y2), max(y1, y2)
 
-        for item in self.paddle_result:
-            if text in item.text:
-                pos_x, pos_y = item.pos
-                if min_x <= pos_x <= max_x and min_y <= pos_y <= max_y:
-                    res.append(item)
+        pos = self._positions[indices]
+        mask = (pos[:, 0] >= min_x) & (pos[:, 0] <= max_x) & (pos[:, 1] >= min_y) & (pos[:, 1] <= max_y)
 
-        return res
+        return [self._items[index] for index in indices[mask]]
@@ -0,0 +1,93 @@
+from typing import Callable, Iterable, Tuple
+
+import numpy as np
+
+from core.frame_diff import dhash, hamming_distance
+from core.paddle_result import PaddleResult, PaddleResultItemData
+from core.tracing import tracer
+
+# 区域坐标: x1, y1, x2, y2(与 try_get_text_coord_in_range 一致)
+Region = Tuple[int, int, int, int]
+
+
+class RegionOCR:
+    """
+    按区域识别文字
+    只裁剪并识别调用方关心的区域，区域像素的感知哈希与上次相同时直接复用上次的识别结果，
+    结果坐标统一映射回全屏坐标。全图识别只作为兜底。
+    """
+
+    def __init__(self, ocr: Callable, cell_size: int = 8, max_distance: int = 0):
+        """
+        :param ocr: ocr(frame) -> PaddleOCR 格式的原始结果，例如 create_paddle_ocr() 的返回值
+        :param cell_size: 感知哈希每一位对应的像素边长；文字笔画细，固定 8x8 的哈希察觉不到数字变化，
+                          因此哈希尺寸随区域大小缩放
+        :param max_distance: 哈希汉明距离不超过该值视为区域未变化
+        """
+        self.ocr = ocr
+        self.cell_size = cell_size
+        self.max_distance = max_distance
+        self.hits = 0
+        self.misses = 0
+
+        # 区域 -> (哈希, 全屏坐标下的识别条目)
+        self._cache = {}
+
+    def recognize(self, frame: np.ndarray, regions: Iterable[Region]) -> PaddleResult:
+        """
+        识别多个区域并合并为一个 PaddleResult
+        :param frame: 全屏BGR图像
+        :param regions: 区域列表
+        """
+        items = []
+        for region in regions:
+            items.extend(self._recognize_region(frame, region))
+        return PaddleResult.from_items(items)
+
+    def recognize_full(self, frame: np.ndarray) -> PaddleResult:
+        """全图识别(兜底)"""
+        return PaddleResult(paddle_result=self.ocr(frame))
+
+    def try_get_text_coord_in_range(self, frame: np.ndarray, text, x1, y1, x2, y2) -> list[PaddleResultItemData]:
+        """只识别给定区域并在其中查找文字"""
+        region = (min(x1, x2), min(y1, y2), max(x1, x2), max(y1, y2))
+        return self.recognize(frame, [region]).try_get_text_coord_in_range(text, x1, y1, x2, y2)
+
+    def clear(self):
+        self._cache.clear()
+
+    def _recognize_region(self, frame: np.ndarray, region: Region) -> list[PaddleResultItemData]:
+        frame_h, frame_w = frame.shape[:2]
+        x1, y1, x2, y2 = region
+        x1, y1 = max(int(x1), 0), max(int(y1), 0)
+        x2, y2 = min(int(x2), frame_w), min(int(y2), frame_h)
+        if x2 <= x1 or y2 <= y1:
+            return []
+
+        crop = frame[y1:y2, x1:x2]
+        hash_size = (max((x2 - x1) // self.cell_size, 8), max((y2 - y1) // self.cell_size, 8))
+        crop_hash = dhash(crop, hash_size)
+
+        cached = self._cache.get(region)
+        if cached is not None and hamming_distance(cached[0], crop_hash) <= self.max_distance:
+            self.hits += 1
+            tracer.count("ocr.region_cache_hit")
+            return cached[1]
+
+        self.misses += 1
+        with tracer.span("ocr", region=region):
+            raw = self.ocr(np.ascontiguousarray(crop))
+        items = PaddleResult(paddle_result=self._offset(raw, x1, y1)).paddle_result
+        self._cache[region] = (crop_hash, items)
+        return items
+
+    @staticmethod
+    def _offset(raw_result, dx: int, dy: int) -> list:
+        """把裁剪图坐标下的 rec_polys 平移到全屏坐标"""
+        return [
+            {
+                "rec_texts": list(page["rec_texts"]),
+                "rec_polys": [(np.asarray(poly) + (dx, dy)).tolist() for poly in page["rec_polys"]],
+            }
+            for page in raw_result
+        ]
@@ -0,0 +1,89 @@
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+# 先用最近邻抽样缩到该尺寸，再做区域平均，1080p 画面的签名计算在 1ms 以内
+SAMPLE_SIZE = (240, 135)
+
+
+class ScreenClassifier:
+    """
+    界面识别
+    每个已知界面登记一个或多个签名(灰度差值哈希 + 低分辨率颜色缩略图)，
+    每帧先判断当前处于哪个界面，只匹配该界面登记的模板。
+    """
+
+    def __init__(self, hash_size: int = 16, color_size: Tuple[int, int] = (8, 4), max_distance: float = 0.2):
+        """
+        :param hash_size: 差值哈希边长
+        :param color_size: 颜色缩略图尺寸(宽, 高)
+        :param max_distance: 与最近界面的距离超过该值视为未知界面(0-2，哈希位差比例 + 平均颜色差比例)
+        """
+        self.hash_size = hash_size
+        self.color_size = color_size
+        self.max_distance = max_distance
+
+        self.screen_templates: Dict[str, List[str]] = {}
+        self._labels: List[str] = []
+        self._hashes = np.empty((0, hash_size * hash_size), dtype=bool)
+        self._colors = np.empty((0, color_size[0] * color_size[1] * 3), dtype=np.float32)
+
+    def signature(self, frame: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        sample = cv2.resize(frame, SAMPLE_SIZE, interpolation=cv2.INTER_NEAREST)
+
+        small = cv2.resize(sample, (self.hash_size + 1, self.hash_size), interpolation=cv2.INTER_AREA)
+        if small.ndim == 3:
+            small = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+        hash_bits = (small[:, 1:] > small[:, :-1]).ravel()
+
+        color = cv2.resize(sample, self.color_size, interpolation=cv2.INTER_AREA)
+        if color.ndim == 2:
+            color = cv2.cvtColor(color, cv2.COLOR_GRAY2BGR)
+        return hash_bits, color.astype(np.float32).ravel()
+
+    def register(self, screen_name: str, frame: np.ndarray, template_names: Iterable[str] = ()):
+        """
+        登记界面样本，同一界面可以登记多张样本
+        :param screen_name: 界面名
+        :param frame: 该界面的截图
+        :param template_names: 该界面上需要检测的模板名
+        """
+        hash_bits, color = self.signature(frame)
+        self._labels.append(screen_name)
+        self._hashes = np.vstack([self._hashes, hash_bits])
+        self._colors = np.vstack([self._colors, color])
+
+        templates = self.screen_templates.setdefault(screen_name, [])
+        for name in template_names:
+            if name not in templates:
+                templates.append(name)
+
+    def add_templates(self, screen_name: str, template_names: Iterable[str]):
+        templates = self.screen_templates.setdefault(screen_name, [])
+        templates.extend(name for name in template_names if name not in templates)
+
+    def classify(self, frame: np.ndarray) -> Optional[str]:
+        """返回最接近的已知界面名，未知界面返回None"""
+        match = self.classify_with_distance(frame)
+        return match[0] if match else None
+
+    def classify_with_distance(self, frame: np.ndarray) -> Optional[Tuple[str, float]]:
+        if not self._labels:
+            return None
+
+        hash_bits, color = self.signature(frame)
+        hash_distance = np.count_nonzero(self._hashes != hash_bits, axis=1) / hash_bits.size
+        color_distance = np.abs(self._colors - color).mean(axis=1) / 255
+        distance = hash_distance + color_distance
+
+        best = int(np.argmin(distance))
+        if distance[best] > self.max_distance:
+            return None
+        return self._labels[best], float(distance[best])
+
+    def templates_for(self, screen_name: Optional[str]) -> Optional[List[str]]:
+        """界面登记的模板，未知界面返回None"""
+        if screen_name is None:
+            return None
+        return self.screen_templates.get(screen_name, [])
@@ -0,0 +1,312 @@
+import json
+import os
+import queue
+import struct
+import threading
+import time
+import zlib
+from typing import Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from core.gesture_macro import GestureMacro
+from core.tracing import traced, tracer
+
+# 文件结构: 魔数 + 若干记录；每条记录为 类型(1字节) + 时间戳(相对开始录制的秒数, float64) + 负载长度(uint32) + 负载
+SESSION_MAGIC = b"SREC\x00\x01"
+_RECORD_HEADER = struct.Struct("<BdI")
+_FRAME_HEADER = struct.Struct("<HHB")
+
+RECORD_META = 1
+RECORD_KEYFRAME = 2
+RECORD_DELTA = 3
+RECORD_REPEAT = 4
+RECORD_EVENT = 5
+
+
+class SessionRecorder:
+    """
+    会话录制
+    记录截图帧流和期间发出的点击、滑动等操作，用于离线复现和性能测试。
+    与上一帧完全相同的帧只记一条重复记录；其余帧存为与上一帧的差值(uint8 回绕相减)并用zlib压缩，
+    静态界面的差值几乎全为0，压缩率很高；每 keyframe_interval 帧存一帧完整画面。无损，回放结果与录制时一致。
+    压缩和写盘在后台线程完成，采集线程只把帧放入队列。
+    """
+
+    def __init__(self, path: str, keyframe_interval: int = 60, compress_level: int = 1, max_queue: int = 32):
+        """
+        :param path: 录制文件路径
+        :param keyframe_interval: 每隔多少个存储帧写一帧完整画面
+        :param compress_level: zlib 压缩级别，1 最快
+        :param max_queue: 等待写出的最大帧数，写出跟不上时采集线程会等待(录制不丢帧)
+        """
+        self.path = path
+        self.keyframe_interval = keyframe_interval
+        self.compress_level = compress_level
+
+        self.frames = 0
+        self.repeats = 0
+        self.events = 0
+        self.raw_bytes = 0
+        self.stored_bytes = 0
+
+        self._file = open(path, "wb")
+        self._file.write(SESSION_MAGIC)
+        self._start = time.perf_counter()
+        self._previous = None
+        self._since_keyframe = 0
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._thread = threading.Thread(target=self._work, name="session-recorder", daemon=True)
+        self._thread.start()
+        self._queue.put((RECORD_META, 0.0, {"start_time": time.time()}))
+
+    def _now(self) -> float:
+        return time.perf_counter() - self._start
+
+    def add_frame(self, frame: np.ndarray, copy: bool = False):
+        """
+        记录一帧截图
+        :param copy: 调用方之后会修改或复用该数组时需要复制；为False时调用方不能再修改该数组，
+                     它会在后台线程写出，并作为下一帧差值的基准
+        """
+        if copy:
+            frame = frame.copy()
+            # 副本同时是下一帧差值的基准，设为只读防止被意外修改
+            frame.flags.writeable = False
+        # 写出时再决定存为完整帧、差值帧还是重复帧
+        self._queue.put((RECORD_KEYFRAME, self._now(), frame))
+
+    def add_event(self, kind: str, **fields):
+        """记录一次操作，例如 add_event("tap", x=100, y=200)"""
+        self._queue.put((RECORD_EVENT, self._now(), {"type": kind, **fields}))
+
+    def close(self):
+        if self._thread is None:
+            return
+        self._queue.put(None)
+        self._thread.join()
+        self._thread = None
+        self._file.close()
+
+    def stats(self) -> dict:
+        return {
+            "frames": self.frames,
+            "repeats": self.repeats,
+            "events": self.events,
+            "raw_mb": self.raw_bytes / 1024 / 1024,
+            "stored_mb": self.stored_bytes / 1024 / 1024,
+            "ratio": self.raw_bytes / self.stored_bytes if self.stored_bytes else 0.0,
+        }
+
+    def _write(self, kind: int, timestamp: float, payload: bytes = b""):
+        self._file.write(_RECORD_HEADER.pack(kind, timestamp, len(payload)))
+        self._file.write(payload)
+        self.stored_bytes += _RECORD_HEADER.size + len(payload)
+
+    def _work(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                self._file.flush()
+                return
+
+            kind, timestamp, data = item
+            try:
+                with tracer.span("record"):
+                    if kind == RECORD_KEYFRAME:
+                        self._write_frame(timestamp, data)
+                    else:
+                        if kind == RECORD_EVENT:
+                            self.events += 1
+                        self._write(kind, timestamp, json.dumps(data, ensure_ascii=False).encode("utf-8"))
+            except Exception as e:
+                print(f"写入录制文件出错: {e}")
+
+    def _write_frame(self, timestamp: float, frame: np.ndarray):
+        frame = np.ascontiguousarray(frame)
+        self.frames += 1
+        self.raw_bytes += frame.nbytes
+        previous = self._previous
+
+        if previous is not None and previous.shape == frame.shape and np.array_equal(previous, frame):
+            self.repeats += 1
+            self._write(RECORD_REPEAT, timestamp)
+            return
+
+        channels = frame.shape[2] if frame.ndim == 3 else 1
+        header = _FRAME_HEADER.pack(frame.shape[0], frame.shape[1], channels)
+        if previous is None or previous.shape != frame.shape or self._since_keyframe >= self.keyframe_interval:
+            self._write(RECORD_KEYFRAME, timestamp, header + zlib.compress(frame.data, self.compress_level))
+            self._since_keyframe = 0
+        else:
+            # uint8 相减自动回绕，回放时相加即可还原
+            delta = np.subtract(frame, previous, dtype=np.uint8)
+            self._write(RECORD_DELTA, timestamp, header + zlib.compress(delta.data, self.compress_level))
+            self._since_keyframe += 1
+        self._previous = frame
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+class SessionReplay:
+    """
+    读取录制文件
+    打开时只扫描记录头建立索引，帧在迭代时按顺序解码
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.meta = {}
+        # 帧: (时间戳, 类型, 负载偏移, 负载长度)
+        self.frame_index: List[Tuple[float, int, int, int]] = []
+        # 操作: (时间戳, 操作内容)
+        self.events: List[Tuple[float, dict]] = []
+
+        with open(path, "rb") as f:
+            if f.read(len(SESSION_MAGIC)) != SESSION_MAGIC:
+                raise ValueError(f"不是录制文件: {path}")
+            size = os.fstat(f.fileno()).st_size
+            while True:
+                header = f.read(_RECORD_HEADER.size)
+                if len(header) < _RECORD_HEADER.size:
+                    break
+                kind, timestamp, length = _RECORD_HEADER.unpack(header)
+                offset = f.tell()
+                # 录制中断时最后一条记录可能不完整
+                if offset + length > size:
+                    break
+                if kind in (RECORD_META, RECORD_EVENT):
+                    data = json.loads(f.read(length).decode("utf-8"))
+                    if kind == RECORD_META:
+                        self.meta.update(data)
+                    else:
+                        self.events.append((timestamp, data))
+                else:
+                    f.seek(length, 1)
+                    self.frame_index.append((timestamp, kind, offset, length))
+
+    def __len__(self):
+        return len(self.frame_index)
+
+    @property
+    def duration(self) -> float:
+        timestamps = [t for t, *_ in self.frame_index] + [t for t, _ in self.events]
+        return max(timestamps, default=0.0)
+
+    def frames(self) -> Iterator[Tuple[float, np.ndarray]]:
+        """按顺序产出 (时间戳, 帧)；重复帧产出同一个数组对象"""
+        previous = None
+        with open(self.path, "rb") as f:
+            for timestamp, kind, offset, length in self.frame_index:
+                if kind != RECORD_REPEAT:
+                    f.seek(offset)
+                    payload = f.read(length)
+                    height, width, channels = _FRAME_HEADER.unpack_from(payload)
+                    shape = (height, width) if channels == 1 else (height, width, channels)
+                    data = np.frombuffer(zlib.decompress(payload[_FRAME_HEADER.size:]), dtype=np.uint8).reshape(shape)
+                    if kind == RECORD_KEYFRAME:
+                        previous = data
+                    else:
+                        previous = np.add(previous, data, dtype=np.uint8)
+                    # 解码结果只读，防止调用方修改后影响后续差值帧的还原
+                    previous.flags.writeable = False
+                yield timestamp, previous
+
+
+class ReplayDevice:
+    """
+    回放设备
+    提供与 ADBManager 相同的截图和输入接口，截图来自录制文件，输入操作只记录不执行，
+    可直接替换 ADBManager 驱动 GameImageDetector / OCR 的主循环。
+    speed=None 时每次截图取下一帧(最快速度)；否则按录制时间轴推进，截图返回当前时刻对应的帧，
+    处理慢于录制时会像真实设备一样跳过中间帧。
+    """
+
+    def __init__(self, replay: SessionReplay, speed: Optional[float] = None):
+        """
+        :param replay: 录制文件或其路径
+        :param speed: 回放倍速，None 为最快速度
+        """
+        self.replay = SessionReplay(replay) if isinstance(replay, str) else replay
+        self.speed = speed
+        # 回放中发出的操作: (相对开始回放的秒数, 操作内容)
+        self.issued_events: List[Tuple[float, dict]] = []
+        self.frames_served = 0
+        # 与 ADBManager 一致，TemplateLibrary.for_device 按序列号缓存分辨率
+        self.device_serial = self.replay.path
+
+        self._frames = self.replay.frames()
+        self._pending = None
+        self._current = None
+        self._start = None
+
+    def _elapsed(self) -> float:
+        return time.perf_counter() - self._start
+
+    def _next(self):
+        if self._pending is not None:
+            item, self._pending = self._pending, None
+            return item
+        return next(self._frames, None)
+
+    @traced("capture")
+    def screenshot_array(self, raw=True) -> Optional[np.ndarray]:
+        """返回下一帧，录制结束后返回None"""
+        if self._start is None:
+            self._start = time.perf_counter()
+
+        if self.speed is None:
+            item = self._next()
+            if item is None:
+                return None
+            self.frames_served += 1
+            return item[1]
+
+        # 取录制时间不晚于当前回放时刻的最后一帧
+        now = self._elapsed() * self.speed
+        while True:
+            item = self._next()
+            if item is None:
+                if self._current is None or now > self.replay.duration:
+                    return None
+                break
+            if item[0] > now and self._current is not None:
+                self._pending = item
+                break
+            self._current = item
+        self.frames_served += 1
+        return self._current[1]
+
+    def get_screen_resolution(self) -> Tuple[int, int]:
+        """录制画面的 (宽, 高)，取自第一帧"""
+        _, frame = next(self.replay.frames())
+        height, width = frame.shape[:2]
+        return width, height
+
+    def _record(self, kind: str, **fields):
+        elapsed = self._elapsed() if self._start is not None else 0.0
+        self.issued_events.append((elapsed, {"type": kind, **fields}))
+
+    def tap(self, x, y):
+        self._record("tap", x=int(x), y=int(y))
+
+    def swipe(self, x1, y1, x2, y2, duration=300):
+        self._record("swipe", x1=int(x1), y1=int(y1), x2=int(x2), y2=int(y2), duration=int(duration))
+
+    def long_press(self, x, y, duration=1000):
+        self.swipe(x, y, x, y, duration)
+
+    def press_key(self, keycode):
+        self._record("key", keycode=str(keycode))
+
+    def input_text(self, text):
+        self._record("text", text=text)
+
+    def run_macro(self, macro):
+        if isinstance(macro, str):
+            macro = GestureMacro.load(macro)
+        self._record("macro", steps=macro.steps)
@@ -0,0 +1,189 @@
+import subprocess
+import threading
+import time
+from collections import deque
+from typing import Callable, List, Optional, Tuple
+
+import numpy as np
+
+
+class ScreenStream:
+    """
+    连续画面流采集
+    后台线程持续解码 H.264 码流(adb screenrecord 输出或录制好的文件)，
+    最近若干帧保存在环形缓冲区中，latest_frame() 直接返回最新一帧，没有单次截图的延迟。
+    解码依赖 PyAV(pip install av)；文件源在缺少 PyAV 时退回 cv2.VideoCapture。
+    """
+
+    def __init__(self, open_source: Callable, ring_size: int = 8, restart: bool = False,
+                 pace_fps: Optional[float] = None):
+        """
+        :param open_source: 无参函数，返回 (可读二进制流或文件路径, 进程或None)
+        :param ring_size: 环形缓冲区保存的帧数
+        :param restart: 码流结束后是否重新打开(screenrecord 有单次录制时长上限)
+        :param pace_fps: 按给定帧率放慢解码，回放录制文件时模拟实时画面；None 表示尽快解码
+        """
+        self.open_source = open_source
+        self.restart = restart
+        self.pace_fps = pace_fps
+
+        # 元素为 (序号, 时间戳, BGR帧)
+        self._frames = deque(maxlen=ring_size)
+        self._condition = threading.Condition()
+        self._sequence = 0
+        self._running = False
+        self._thread = None
+        self._process = None
+        self.error = None
+
+    @classmethod
+    def from_adb(cls, adb, bit_rate: int = 8_000_000, size: Optional[Tuple[int, int]] = None,
+                 ring_size: int = 8) -> "ScreenStream":
+        """
+        从设备的 screenrecord 码流采集
+        :param adb: 已连接设备的 ADBManager
+        :param bit_rate: 编码码率
+        :param size: 编码分辨率(宽, 高)，None 为设备原始分辨率
+        """
+        command = ["exec-out", "screenrecord", "--output-format=h264", f"--bit-rate={bit_rate}"]
+        if size:
+            command.append(f"--size={size[0]}x{size[1]}")
+        command.append("-")
+
+        def open_source():
+            process = subprocess.Popen(adb._build_command(command),
+                                       stdout=subprocess.PIPE,
+                                       stderr=subprocess.DEVNULL)
+            return process.stdout, process
+
+        return cls(open_source, ring_size=ring_size, restart=True)
+
+    @classmethod
+    def from_file(cls, path: str, ring_size: int = 8, pace_fps: Optional[float] = None) -> "ScreenStream":
+        """从录制好的 H.264 文件采集，用于离线测试"""
+        return cls(lambda: (path, None), ring_size=ring_size, pace_fps=pace_fps)
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> "ScreenStream":
+        if self.running:
+            return self
+        self._running = True
+        self.error = None
+        self._thread = threading.Thread(target=self._run, name="screen-stream", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._running = False
+        self._kill_process()
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+            self._thread = None
+        with self._condition:
+            self._condition.notify_all()
+
+    def latest_frame(self) -> Optional[np.ndarray]:
+        """最新解码的一帧，尚无画面时返回None"""
+        with self._condition:
+            return self._frames[-1][2] if self._frames else None
+
+    def recent_frames(self) -> List[Tuple[int, float, np.ndarray]]:
+        """环形缓冲区内的全部帧 (序号, 时间戳, 帧)，从旧到新"""
+        with self._condition:
+            return list(self._frames)
+
+    def wait_frame(self, after_sequence: int = 0, timeout: Optional[float] = None) -> Optional[Tuple[int, np.ndarray]]:
+        """
+        等待序号大于 after_sequence 的新帧
+        :return: (序号, 帧)，超时或码流结束返回None
+        """
+        with self._condition:
+            ready = self._condition.wait_for(
+                lambda: self._sequence > after_sequence or not self.running, timeout)
+            if not ready or self._sequence <= after_sequence:
+                return None
+            sequence, _, frame = self._frames[-1]
+            return sequence, frame
+
+    def _push(self, frame: np.ndarray):
+        with self._condition:
+            self._sequence += 1
+            self._frames.append((self._sequence, time.time(), frame))
+            self._condition.notify_all()
+
+    def _run(self):
+        try:
+            while self._running:
+                decoded_before = self._sequence
+                source, self._process = self.open_source()
+                try:
+                    self._decode(source)
+                finally:
+                    self._kill_process()
+                if not self.restart:
+                    break
+                # 一帧都没解出说明码流无法使用，避免无限重启
+                if self._sequence == decoded_before:
+                    raise RuntimeError("码流未输出任何画面")
+        except Exception as e:
+            if self._running:
+                self.error = e
+                print(f"画面流解码出错: {e}")
+        finally:
+            self._running = False
+            with self._condition:
+                self._condition.notify_all()
+
+    def _decode(self, source):
+        try:
+            import av
+        except ImportError:
+            if isinstance(source, str):
+                self._decode_with_opencv(source)
+                return
+            raise ImportError("解码 screenrecord 码流需要 PyAV: pip install av")
+
+        # 裸 H.264 流没有容器信息，缩小探测量以降低首帧延迟
+        with av.open(source, format="h264", mode="r",
+                     options={"probesize": "32768", "analyzeduration": "0"}) as container:
+            stream = container.streams.video[0]
+            # 帧级多线程会缓存多帧再输出，增加延迟；只用片级多线程
+            stream.thread_type = "SLICE"
+            for frame in container.decode(stream):
+                if not self._running:
+                    break
+                self._push(frame.to_ndarray(format="bgr24"))
+                self._pace()
+
+    def _decode_with_opencv(self, path: str):
+        import cv2
+
+        capture = cv2.VideoCapture(path)
+        try:
+            while self._running:
+                ok, frame = capture.read()
+                if not ok:
+                    break
+                self._push(frame)
+                self._pace()
+        finally:
+            capture.release()
+
+    def _pace(self):
+        if self.pace_fps:
+            time.sleep(1 / self.pace_fps)
+
+    def _kill_process(self):
+        process, self._process = self._process, None
+        if process is not None and process.poll() is None:
+            process.kill()
+            process.wait()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
@@ -0,0 +1,84 @@
+import os
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+import cv2
+import numpy as np
+
+
+class TemplateCache:
+    """
+    已解码模板图片的LRU缓存
+    以 (路径, 读取标志) 为键，并记录文件修改时间，文件被修改后自动重新解码；
+    缓存总字节数超过 max_bytes 时淘汰最久未使用的模板。
+    """
+
+    def __init__(self, max_bytes: int = 256 * 1024 * 1024):
+        """
+        :param max_bytes: 缓存占用内存上限(字节)
+        """
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, path: str, flags: int = cv2.IMREAD_COLOR) -> Optional[np.ndarray]:
+        """
+        读取模板，命中缓存时不再访问磁盘内容
+        :param path: 模板图片路径
+        :param flags: cv2.imread 读取标志
+        :return: 解码后的图像，文件不存在或无法解码时返回None
+        """
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            return None
+
+        key = (os.path.abspath(path), flags)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == mtime:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+
+        image = cv2.imread(path, flags)
+        if image is None:
+            return None
+
+        with self._lock:
+            self.misses += 1
+            self._put(key, mtime, image)
+        return image
+
+    def _put(self, key, mtime, image):
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self.current_bytes -= old[1].nbytes
+
+        # 单张超过上限的模板不缓存
+        if image.nbytes > self.max_bytes:
+            return
+
+        self._entries[key] = (mtime, image)
+        self.current_bytes += image.nbytes
+
+        while self.current_bytes > self.max_bytes:
+            _, (_, evicted) = self._entries.popitem(last=False)
+            self.current_bytes -= evicted.nbytes
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+
+# 进程级共享缓存，保证同一模板在一个进程内只解码一次
+default_template_cache = TemplateCache()
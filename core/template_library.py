@@ -0,0 +1,162 @@
+import os
+import threading
+from typing import Dict, Optional, Tuple
+
+import cv2
+
+from core.game_image_detector import GameImageDetector
+from core.template_pack import PACK_SUFFIX
+from core.template_profile import TemplateProfile, load_template_meta
+
+TEMPLATE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp")
+
+
+class TemplateLibrary:
+    """
+    与分辨率无关的模板库
+    模板按 base_resolution 采集；每种设备分辨率只计算一次缩放比例，
+    预先生成对应尺寸的模板(内存 + 磁盘缓存)，运行时只需单尺度匹配。
+    每种分辨率的模板还会编译为一个模板包，之后的进程直接映射模板包，无需逐个解码图片。
+    """
+
+    def __init__(self, template_dir: str, base_resolution: Tuple[int, int] = (1920, 1080),
+                 cache_dir: Optional[str] = None, use_pack: bool = True):
+        """
+        :param template_dir: 模板目录，模板名为相对路径去掉扩展名
+        :param base_resolution: 采集模板时的屏幕分辨率
+        :param cache_dir: 缩放后模板的磁盘缓存目录，默认 template_dir/.scaled
+        :param use_pack: 是否使用并维护 cache_dir 下的模板包(比所有模板及配置文件都新时才使用)
+        """
+        self.template_dir = template_dir
+        self.base_resolution = base_resolution
+        self.cache_dir = cache_dir or os.path.join(template_dir, ".scaled")
+        self.use_pack = use_pack
+
+        self._detectors: Dict[Tuple[int, int], GameImageDetector] = {}
+        self._resolutions: Dict[str, Tuple[int, int]] = {}
+        self._lock = threading.Lock()
+
+    def scale_for(self, resolution: Tuple[int, int]) -> float:
+        """
+        模板缩放比例
+        wm size 总是返回竖屏尺寸，按长短边分别比较；游戏UI一般等比缩放并在多出的方向留边，取较小的比例
+        """
+        long_side, short_side = max(resolution), min(resolution)
+        base_long, base_short = max(self.base_resolution), min(self.base_resolution)
+        return min(long_side / base_long, short_side / base_short)
+
+    def for_device(self, adb) -> GameImageDetector:
+        """
+        取设备分辨率对应的检测器，每台设备只查询一次分辨率
+        :param adb: 已连接设备的 ADBManager
+        """
+        serial = adb.device_serial
+        resolution = self._resolutions.get(serial)
+        if resolution is None:
+            resolution = adb.get_screen_resolution()
+            self._resolutions[serial] = resolution
+        return self.for_resolution(resolution)
+
+    def for_resolution(self, resolution: Tuple[int, int]) -> GameImageDetector:
+        """同一分辨率的设备共用一个已加载缩放模板的检测器"""
+        key = (max(resolution), min(resolution))
+        with self._lock:
+            detector = self._detectors.get(key)
+            if detector is None:
+                detector = self._build_detector(key)
+                self._detectors[key] = detector
+            return detector
+
+    def template_paths(self) -> Dict[str, str]:
+        """模板名 -> 模板文件路径"""
+        paths = {}
+        for root, dirs, files in os.walk(self.template_dir):
+            # 跳过缓存目录
+            dirs[:] = [d for d in dirs
+                       if os.path.normpath(os.path.join(root, d)) != os.path.normpath(self.cache_dir)]
+            for file in files:
+                if file.lower().endswith(TEMPLATE_EXTENSIONS):
+                    path = os.path.join(root, file)
+                    name = os.path.splitext(os.path.relpath(path, self.template_dir))[0].replace(os.sep, "/")
+                    paths[name] = path
+        return paths
+
+    def pack_path(self, resolution: Tuple[int, int]) -> str:
+        return os.path.join(self.cache_dir, f"{max(resolution)}x{min(resolution)}{PACK_SUFFIX}")
+
+    def build_pack(self, pack_path: str, resolution: Tuple[int, int]) -> int:
+        """
+        按设备分辨率缩放、预处理所有模板并编译为模板包
+        :return: 模板数
+        """
+        detector = self._load_templates((max(resolution), min(resolution)))
+        os.makedirs(os.path.dirname(os.path.abspath(pack_path)), exist_ok=True)
+        return detector.save_pack(pack_path, meta={"resolution": list(resolution),
+                                                   "base_resolution": list(self.base_resolution)})
+
+    def _build_detector(self, resolution: Tuple[int, int]) -> GameImageDetector:
+        if not self.use_pack:
+            return self._load_templates(resolution)
+
+        pack_path = self.pack_path(resolution)
+        if not self._pack_is_fresh(pack_path):
+            self.build_pack(pack_path, resolution)
+        detector = GameImageDetector()
+        detector.load_pack(pack_path)
+        return detector
+
+    def _pack_is_fresh(self, pack_path: str) -> bool:
+        """模板包比所有模板及其配置文件都新，且没有模板被删除"""
+        if not os.path.exists(pack_path):
+            return False
+
+        pack_mtime = os.path.getmtime(pack_path)
+        for path in self.template_paths().values():
+            for source in (path, TemplateProfile.profile_path(path)):
+                if os.path.exists(source) and os.path.getmtime(source) > pack_mtime:
+                    return False
+        # 模板被删除时目录修改时间会更新
+        for root, dirs, _ in os.walk(self.template_dir):
+            dirs[:] = [d for d in dirs
+                       if os.path.normpath(os.path.join(root, d)) != os.path.normpath(self.cache_dir)]
+            if os.path.getmtime(root) > pack_mtime:
+                return False
+        return True
+
+    def _load_templates(self, resolution: Tuple[int, int]) -> GameImageDetector:
+        scale = self.scale_for(resolution)
+        detector = GameImageDetector()
+
+        for name, path in self.template_paths().items():
+            profile = TemplateProfile.load(path)
+            scaled_path = path if abs(scale - 1.0) < 1e-3 else self._scaled_template(name, path, resolution, scale)
+            if scaled_path:
+                detector.load_template(name, scaled_path, profile=profile)
+                # 缩放后的模板旁没有配置文件，阈值和区域按源模板配置
+                threshold, region = load_template_meta(path)
+                if region:
+                    region = tuple(int(round(v * scale)) for v in region)
+                detector.set_template_meta(name, threshold, region)
+
+        return detector
+
+    def _scaled_template(self, name: str, path: str, resolution: Tuple[int, int], scale: float) -> Optional[str]:
+        scaled_path = os.path.join(self.cache_dir, f"{resolution[0]}x{resolution[1]}", name + ".png")
+
+        # 磁盘缓存比源模板新时直接复用
+        if os.path.exists(scaled_path) and os.path.getmtime(scaled_path) >= os.path.getmtime(path):
+            return scaled_path
+
+        template = cv2.imread(path, cv2.IMREAD_UNCHANGED)
+        if template is None:
+            print(f"无法读取模板图片: {path}")
+            return None
+
+        h, w = template.shape[:2]
+        size = (max(int(round(w * scale)), 1), max(int(round(h * scale)), 1))
+        interpolation = cv2.INTER_AREA if scale < 1 else cv2.INTER_CUBIC
+        scaled = cv2.resize(template, size, interpolation=interpolation)
+
+        os.makedirs(os.path.dirname(scaled_path), exist_ok=True)
+        cv2.imwrite(scaled_path, scaled)
+        return scaled_path
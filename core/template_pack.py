@@ -0,0 +1,157 @@
+import argparse
+import json
+import os
+import struct
+from dataclasses import asdict, dataclass
+from typing import Dict, Iterable, Optional, Tuple
+
+import numpy as np
+
+from core.template_profile import PreparedTemplate, TemplateProfile
+
+# 文件结构: 魔数(8字节) + 索引长度(uint64) + JSON索引 + 按64字节对齐的原始数组
+PACK_MAGIC = b"TPACK\x00\x00\x01"
+PACK_SUFFIX = ".tpack"
+_ALIGN = 64
+_ARRAY_FIELDS = ("image", "mask", "processed", "processed_mask")
+
+
+@dataclass
+class PackedTemplate:
+    """模板包中的一个模板: 解码并预处理好的数组与元数据"""
+    name: str
+    image: np.ndarray
+    profile: Optional[TemplateProfile] = None
+    mask: Optional[np.ndarray] = None
+    processed: Optional[np.ndarray] = None
+    processed_mask: Optional[np.ndarray] = None
+    threshold: Optional[float] = None
+    region: Optional[Tuple[int, int, int, int]] = None
+
+    @property
+    def prepared(self) -> Optional[PreparedTemplate]:
+        """有预处理配置时返回 PreparedTemplate，否则为None"""
+        if self.profile is None:
+            return None
+        return PreparedTemplate(profile=self.profile,
+                                image=self.image,
+                                mask=self.mask,
+                                processed=self.processed,
+                                processed_mask=self.processed_mask)
+
+
+def write_pack(path: str, templates: Iterable[PackedTemplate], meta: Optional[dict] = None):
+    """
+    把模板编译为单个模板包文件
+    :param meta: 附加到索引中的信息，例如分辨率
+    """
+    entries = {}
+    blobs = []
+    offset = 0
+    for template in templates:
+        arrays = {}
+        for field in _ARRAY_FIELDS:
+            array = getattr(template, field)
+            if array is None:
+                continue
+            array = np.ascontiguousarray(array)
+            arrays[field] = {"offset": offset, "shape": list(array.shape), "dtype": array.dtype.str}
+            blobs.append((offset, array))
+            offset += (array.nbytes + _ALIGN - 1) // _ALIGN * _ALIGN
+
+        entries[template.name] = {
+            "arrays": arrays,
+            "profile": asdict(template.profile) if template.profile is not None else None,
+            "threshold": template.threshold,
+            "region": list(template.region) if template.region else None,
+        }
+
+    index = json.dumps({"meta": meta or {}, "templates": entries}, ensure_ascii=False).encode("utf-8")
+    header_size = len(PACK_MAGIC) + 8 + len(index)
+    data_start = (header_size + _ALIGN - 1) // _ALIGN * _ALIGN
+
+    # 先写临时文件再替换，正在读取旧包的进程不受影响
+    temp_path = path + ".tmp"
+    with open(temp_path, "wb") as f:
+        f.write(PACK_MAGIC)
+        f.write(struct.pack("<Q", len(index)))
+        f.write(index)
+        for blob_offset, array in blobs:
+            f.seek(data_start + blob_offset)
+            f.write(array.tobytes())
+        f.truncate(data_start + offset)
+    os.replace(temp_path, path)
+
+
+class TemplatePack:
+    """
+    只读模板包
+    数组通过 np.memmap 映射，加载时不解码图片也不复制数据，
+    多个工作进程打开同一个包时共享操作系统页缓存。
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            if f.read(len(PACK_MAGIC)) != PACK_MAGIC:
+                raise ValueError(f"不是模板包文件: {path}")
+            (index_size,) = struct.unpack("<Q", f.read(8))
+            index = json.loads(f.read(index_size).decode("utf-8"))
+
+        self.meta: dict = index["meta"]
+        self._entries: Dict[str, dict] = index["templates"]
+        self._data_start = (len(PACK_MAGIC) + 8 + index_size + _ALIGN - 1) // _ALIGN * _ALIGN
+        self._data = np.memmap(path, dtype=np.uint8, mode="r")
+
+    def names(self):
+        return list(self._entries)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, name):
+        return name in self._entries
+
+    def _array(self, spec: dict) -> np.ndarray:
+        dtype = np.dtype(spec["dtype"])
+        start = self._data_start + spec["offset"]
+        count = int(np.prod(spec["shape"]))
+        return self._data[start:start + count * dtype.itemsize].view(dtype).reshape(spec["shape"])
+
+    def get(self, name: str) -> PackedTemplate:
+        entry = self._entries[name]
+        arrays = {field: self._array(spec) for field, spec in entry["arrays"].items()}
+        profile = entry["profile"]
+        region = entry["region"]
+        return PackedTemplate(name=name,
+                              profile=TemplateProfile(**profile) if profile is not None else None,
+                              threshold=entry["threshold"],
+                              region=tuple(region) if region else None,
+                              **arrays)
+
+    def templates(self) -> Iterable[PackedTemplate]:
+        for name in self._entries:
+            yield self.get(name)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="把模板目录编译为模板包")
+    parser.add_argument("template_dir")
+    parser.add_argument("output", nargs="?", help=f"输出文件，默认 template_dir/templates{PACK_SUFFIX}")
+    parser.add_argument("--resolution", help="目标设备分辨率，例如 1280x720，默认与采集分辨率相同")
+    parser.add_argument("--base-resolution", default="1920x1080", help="采集模板时的分辨率")
+    args = parser.parse_args()
+
+    from core.template_library import TemplateLibrary
+
+    base_resolution = tuple(int(v) for v in args.base_resolution.lower().split("x"))
+    library = TemplateLibrary(args.template_dir, base_resolution=base_resolution, use_pack=False)
+    resolution = tuple(int(v) for v in args.resolution.lower().split("x")) if args.resolution else base_resolution
+    output = args.output or os.path.join(args.template_dir, "templates" + PACK_SUFFIX)
+
+    count = library.build_pack(output, resolution)
+    print(f"已编译 {count} 个模板: {output}")
+
+
+if __name__ == "__main__":
+    main()
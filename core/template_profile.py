@@ -0,0 +1,131 @@
+import json
+import os
+from dataclasses import asdict, dataclass, fields
+from typing import Optional, Tuple
+
+import cv2
+import numpy as np
+
+# 配置文件与模板同名，扩展名为 .json，例如 start_button.png -> start_button.json
+PROFILE_SUFFIX = ".json"
+
+
+@dataclass(frozen=True)
+class TemplateProfile:
+    """
+    模板预处理配置
+    粗匹配在预处理后的(灰度/缩小/边缘)图像上进行，
+    只对最终候选位置在原分辨率彩色图上做一次验证。
+    """
+    grayscale: bool = False
+    scale: float = 1.0
+    edges: bool = False
+    use_mask: bool = True
+    # 粗匹配得分低于该值直接判定未找到，None 表示总是验证最佳候选
+    coarse_threshold: Optional[float] = None
+    verify: bool = True
+
+    @property
+    def is_default(self) -> bool:
+        return self == TemplateProfile()
+
+    @property
+    def preprocess_key(self) -> tuple:
+        """决定画面预处理结果的字段，相同key的模板可以共用一份预处理后的画面"""
+        return self.grayscale or self.edges, self.scale, self.edges
+
+    @staticmethod
+    def profile_path(template_path: str) -> str:
+        return os.path.splitext(template_path)[0] + PROFILE_SUFFIX
+
+    @classmethod
+    def load(cls, template_path: str) -> "TemplateProfile":
+        """读取模板旁的配置文件，不存在时返回默认配置"""
+        data = read_sidecar(template_path)
+        known = {field.name for field in fields(cls)}
+        return cls(**{key: value for key, value in data.items() if key in known})
+
+    def save(self, template_path: str):
+        # 保留配置文件中的其他字段(阈值、区域等)
+        data = read_sidecar(template_path)
+        data.update(asdict(self))
+        with open(self.profile_path(template_path), "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+
+    def apply(self, image: np.ndarray, interpolation: int = cv2.INTER_AREA) -> np.ndarray:
+        """对画面或模板做同样的预处理"""
+        if (self.grayscale or self.edges) and image.ndim == 3:
+            image = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        if self.scale != 1.0:
+            h, w = image.shape[:2]
+            size = (max(int(round(w * self.scale)), 1), max(int(round(h * self.scale)), 1))
+            image = cv2.resize(image, size, interpolation=interpolation)
+        if self.edges:
+            image = cv2.Canny(image, 50, 150)
+        return image
+
+
+def read_sidecar(template_path: str) -> dict:
+    """模板旁配置文件的全部内容，不存在时返回空字典"""
+    path = TemplateProfile.profile_path(template_path)
+    if not os.path.exists(path):
+        return {}
+
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def load_template_meta(template_path: str) -> Tuple[Optional[float], Optional[Tuple[int, int, int, int]]]:
+    """
+    配置文件中与预处理无关的模板元数据
+    :return: (匹配阈值, 常见出现区域 (x, y, w, h))，未配置时为None
+    """
+    data = read_sidecar(template_path)
+    region = data.get("region")
+    return data.get("threshold"), tuple(int(v) for v in region) if region else None
+
+
+@dataclass
+class PreparedTemplate:
+    """按配置预处理好的模板，原图用于最终验证"""
+    profile: TemplateProfile
+    image: np.ndarray
+    mask: Optional[np.ndarray]
+    processed: np.ndarray
+    processed_mask: Optional[np.ndarray]
+
+
+def split_alpha(image: np.ndarray):
+    """
+    把 cv2.IMREAD_UNCHANGED 读出的图像拆成 BGR 与掩码
+    透明PNG的alpha通道作为匹配掩码，完全不透明时不使用掩码
+    """
+    if image.ndim == 2:
+        return cv2.cvtColor(image, cv2.COLOR_GRAY2BGR), None
+    if image.shape[2] == 4:
+        alpha = image[:, :, 3]
+        bgr = np.ascontiguousarray(image[:, :, :3])
+        if alpha.min() == 255:
+            return bgr, None
+        return bgr, np.where(alpha > 0, 255, 0).astype(np.uint8)
+    return image, None
+
+
+def prepare_template(image: np.ndarray, mask: Optional[np.ndarray], profile: TemplateProfile) -> PreparedTemplate:
+    if not profile.use_mask:
+        mask = None
+
+    processed_mask = None
+    if mask is not None:
+        # 掩码只缩放，不做灰度/边缘处理
+        processed_mask = TemplateProfile(scale=profile.scale).apply(mask, cv2.INTER_NEAREST)
+        if mask.ndim == 2 and image.ndim == 3:
+            mask = cv2.merge([mask] * 3)
+        if processed_mask.ndim == 2 and not (profile.grayscale or profile.edges):
+            processed_mask = cv2.merge([processed_mask] * 3)
+
+    return PreparedTemplate(profile=profile,
+                            image=image,
+                            mask=mask,
+                            processed=profile.apply(image),
+                            processed_mask=processed_mask)
@@ -0,0 +1,192 @@
+import functools
+import json
+import math
+import os
+import threading
+import time
+from collections import deque
+from typing import Dict, Optional
+
+
+class _NullSpan:
+    """关闭追踪时使用的空span，进入/退出不做任何事"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ("tracer", "name", "attrs", "start")
+
+    def __init__(self, tracer, name, attrs):
+        self.tracer = tracer
+        self.name = name
+        self.attrs = attrs
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.tracer.record(self.name, self.start, time.perf_counter() - self.start, self.attrs)
+        return False
+
+
+class Histogram:
+    """耗时直方图，按对数分桶(每个2倍区间分4桶)，用于估算分位数"""
+
+    BUCKETS_PER_OCTAVE = 4
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = 0.0
+        self.buckets: Dict[int, int] = {}
+
+    def add(self, seconds: float):
+        self.count += 1
+        self.total += seconds
+        self.min = min(self.min, seconds)
+        self.max = max(self.max, seconds)
+        bucket = math.floor(math.log2(max(seconds, 1e-9)) * self.BUCKETS_PER_OCTAVE)
+        self.buckets[bucket] = self.buckets.get(bucket, 0) + 1
+
+    def percentile(self, p: float) -> float:
+        if not self.count:
+            return 0.0
+        target = self.count * p / 100
+        seen = 0
+        for bucket in sorted(self.buckets):
+            seen += self.buckets[bucket]
+            if seen >= target:
+                # 取桶上界
+                return min(2 ** ((bucket + 1) / self.BUCKETS_PER_OCTAVE), self.max)
+        return self.max
+
+    def as_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "total_ms": self.total * 1000,
+            "mean_ms": self.total / self.count * 1000 if self.count else 0.0,
+            "min_ms": self.min * 1000 if self.count else 0.0,
+            "max_ms": self.max * 1000,
+            "p50_ms": self.percentile(50) * 1000,
+            "p90_ms": self.percentile(90) * 1000,
+            "p99_ms": self.percentile(99) * 1000,
+        }
+
+
+class Tracer:
+    """
+    采集 → 检测 → 操作 各阶段的耗时追踪
+    默认关闭；关闭时 span() 返回共享的空对象，traced 装饰器只多一次属性判断。
+    开启后记录每个span(保留最近 max_spans 个)、按名称聚合的耗时直方图和计数器，
+    可导出为 JSON lines 或 Chrome trace(chrome://tracing、Perfetto 可直接打开)。
+    """
+
+    def __init__(self, max_spans: int = 100_000):
+        self.enabled = os.environ.get("AUTOMATION_TRACE") == "1"
+        self.spans = deque(maxlen=max_spans)
+        self.histograms: Dict[str, Histogram] = {}
+        self.counters: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._origin = time.perf_counter()
+
+    def enable(self):
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def reset(self):
+        with self._lock:
+            self.spans.clear()
+            self.histograms.clear()
+            self.counters.clear()
+            self._origin = time.perf_counter()
+
+    def span(self, name: str, **attrs):
+        """
+        用法: with tracer.span("match", template=name): ...
+        """
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name, attrs)
+
+    def count(self, name: str, value: int = 1):
+        if not self.enabled:
+            return
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def record(self, name: str, start: float, duration: float, attrs: Optional[dict] = None):
+        with self._lock:
+            self.spans.append((name, start, duration, threading.get_ident(), os.getpid(), attrs or None))
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = Histogram()
+            histogram.add(duration)
+
+    def summary(self) -> dict:
+        with self._lock:
+            return {
+                "spans": {name: histogram.as_dict() for name, histogram in self.histograms.items()},
+                "counters": dict(self.counters),
+            }
+
+    def export_jsonl(self, path: str):
+        """每行一个span: name, ts_ms(相对开启时刻), dur_ms, tid, attrs"""
+        with self._lock:
+            spans = list(self.spans)
+        with open(path, "w", encoding="utf-8") as f:
+            for name, start, duration, tid, _, attrs in spans:
+                record = {"name": name, "ts_ms": (start - self._origin) * 1000, "dur_ms": duration * 1000,
+                          "tid": tid}
+                if attrs:
+                    record["attrs"] = attrs
+                f.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+
+    def export_chrome_trace(self, path: str):
+        """导出 Chrome trace event 格式"""
+        with self._lock:
+            spans = list(self.spans)
+            counters = dict(self.counters)
+
+        events = []
+        for name, start, duration, tid, pid, attrs in spans:
+            event = {"name": name, "ph": "X", "ts": (start - self._origin) * 1e6, "dur": duration * 1e6,
+                     "pid": pid, "tid": tid}
+            if attrs:
+                event["args"] = {key: str(value) for key, value in attrs.items()}
+            events.append(event)
+
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": events, "otherData": {"counters": counters}}, f, ensure_ascii=False)
+
+
+# 进程级全局追踪器；设置环境变量 AUTOMATION_TRACE=1 或调用 tracer.enable() 开启
+tracer = Tracer()
+
+
+def traced(name: str):
+    """函数级span装饰器"""
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not tracer.enabled:
+                return func(*args, **kwargs)
+            with _Span(tracer, name, None):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
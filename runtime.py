@@ -0,0 +1,84 @@
+"""
+无界面运行入口: 只做截图、模板匹配和点击
+不导入OCR、绘图和调试输出相关模块，适合作为多开时每个工作进程的启动入口
+用法: python runtime.py --port 16384 --templates resources/templates --tap start_button confirm_button
+"""
+import argparse
+import time
+
+from core.adb_manager import ADBManager
+from core.game_image_detector import GameImageDetector
+from core.template_library import TemplateLibrary
+from core.template_pack import PACK_SUFFIX
+from core.tracing import tracer
+
+
+def load_detector(adb: ADBManager, templates: str, base_resolution) -> GameImageDetector:
+    """
+    templates 为模板包文件时直接映射，为模板目录时按设备分辨率取缩放后的模板包
+    :param adb: ADBManager，或回放录制文件的 ReplayDevice(分辨率取自录制画面)
+    """
+    if templates.endswith(PACK_SUFFIX):
+        detector = GameImageDetector()
+        detector.load_pack(templates)
+        return detector
+    return TemplateLibrary(templates, base_resolution=base_resolution).for_device(adb)
+
+
+def run(adb: ADBManager, detector: GameImageDetector, tap_names, interval: float, max_frames: int):
+    """
+    循环: 截图 → 批量匹配 → 按 tap_names 的顺序点击第一个找到的模板
+    :param adb: ADBManager，或回放录制文件的 ReplayDevice(截图返回None时结束)
+    :param max_frames: 最多处理的帧数，0 表示不限
+    :return: 处理的帧数
+    """
+    frames = 0
+    while not max_frames or frames < max_frames:
+        start = time.perf_counter()
+        with tracer.span("loop"):
+            frame = adb.screenshot_array()
+            if frame is None:
+                break
+            found = detector.find_elements(frame, tap_names)
+            for name in tap_names:
+                if name in found:
+                    x, y, _ = found[name]
+                    adb.tap(x, y)
+                    print(f"点击 '{name}': ({x}, {y})")
+                    break
+
+        frames += 1
+        elapsed = time.perf_counter() - start
+        time.sleep(max(interval - elapsed, 0))
+    return frames
+
+
+def main():
+    parser = argparse.ArgumentParser(description="无界面模板匹配与点击")
+    parser.add_argument("--adb", default="adb")
+    parser.add_argument("--ip", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=16384)
+    parser.add_argument("--templates", required=True, help=f"模板目录或 {PACK_SUFFIX} 模板包")
+    parser.add_argument("--base-resolution", default="1920x1080", help="采集模板时的分辨率")
+    parser.add_argument("--tap", nargs="+", required=True, help="按优先级排列的要点击的模板名")
+    parser.add_argument("--interval", type=float, default=1.0, help="每轮最短间隔(秒)")
+    parser.add_argument("--max-frames", type=int, default=0)
+    parser.add_argument("--record", help="录制截图帧和点击到该文件，之后可用 benchmarks.bench_replay 离线回放")
+    args = parser.parse_args()
+
+    adb = ADBManager(adb_path=args.adb, default_port=args.port, persistent_shell=True)
+    if not adb.connect_device(args.ip, args.port):
+        raise RuntimeError("无法连接到设备")
+
+    base_resolution = tuple(int(v) for v in args.base_resolution.lower().split("x"))
+    detector = load_detector(adb, args.templates, base_resolution)
+    if args.record:
+        adb.start_recording(args.record)
+    try:
+        run(adb, detector, args.tap, args.interval, args.max_frames)
+    finally:
+        adb.disconnect_device()
+
+
+if __name__ == "__main__":
+    main()
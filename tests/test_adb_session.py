@@ -0,0 +1,39 @@
+import os
+import sys
+
+import pytest
+
+from core.adb_session import ADBShellSession
+
+pytestmark = pytest.mark.skipif(sys.platform == "win32", reason="用 /bin/sh 模拟 adb shell")
+
+
+def fake_adb(tmp_path, body):
+    path = tmp_path / "adb"
+    path.write_text(f"#!/bin/sh\n{body}\n")
+    os.chmod(path, 0o755)
+    return str(path)
+
+
+def test_timeout_is_not_retried(tmp_path):
+    runs = tmp_path / "runs.txt"
+    with ADBShellSession(fake_adb(tmp_path, "exec sh"), timeout=0.3) as session:
+        with pytest.raises(TimeoutError):
+            session.run(f"echo x >> {runs}; sleep 0.6")
+    assert runs.read_text().count("x") == 1
+
+
+def test_per_call_timeout(tmp_path):
+    with ADBShellSession(fake_adb(tmp_path, "exec sh"), timeout=0.2) as session:
+        assert session.run("sleep 0.4; echo done", timeout=2) == "done"
+
+
+def test_reconnect_resends_only_unfinished_commands(tmp_path):
+    # 第一次启动的shell执行完前两条命令(含哨兵)后退出
+    once = tmp_path / "once"
+    log = tmp_path / "log.txt"
+    adb = fake_adb(tmp_path, f"if [ ! -f {once} ]; then touch {once}; head -n 4 | sh; else exec sh; fi")
+    commands = [f"echo {name} >> {log}; echo {name.upper()}" for name in "abc"]
+    with ADBShellSession(adb) as session:
+        assert session.run_many(commands) == ["A", "B", "C"]
+    assert log.read_text().split() == ["a", "b", "c"]
@@ -0,0 +1,57 @@
+import multiprocessing
+
+import numpy as np
+
+from core.frame_bus import FrameBus
+
+
+def read_in_worker(name, results):
+    bus = FrameBus.attach(name)
+    frame = bus.read(copy=True)
+    results.put((frame.seq, frame.serial, int(frame.image.sum())))
+    bus.close()
+
+
+def test_publish_and_read_round_trip():
+    rng = np.random.default_rng(0)
+    color = rng.integers(0, 255, (48, 64, 3), np.uint8)
+    gray = rng.integers(0, 255, (30, 40), np.uint8)
+
+    with FrameBus.create(slots=2, max_shape=(48, 64, 3)) as bus:
+        assert bus.read() is None
+        assert bus.publish(color, serial="127.0.0.1:16384", timestamp=12.5) == 0
+        assert bus.publish(gray) == 1
+
+        frame = bus.read(0, copy=True)
+        assert np.array_equal(frame.image, color)
+        assert (frame.seq, frame.timestamp, frame.serial) == (0, 12.5, "127.0.0.1:16384")
+
+        latest = bus.read(copy=True)
+        assert latest.seq == 1
+        assert latest.image.shape == gray.shape and np.array_equal(latest.image, gray)
+
+
+def test_overwritten_slot_is_detected():
+    with FrameBus.create(slots=2, max_shape=(8, 8, 3)) as bus:
+        bus.publish(np.zeros((8, 8, 3), np.uint8))
+        view = bus.read(0)
+        assert not view.image.flags.writeable
+        assert bus.is_valid(view)
+
+        bus.publish(np.ones((8, 8, 3), np.uint8))
+        bus.publish(np.full((8, 8, 3), 2, np.uint8))
+        assert not bus.is_valid(view)
+        assert bus.read(0) is None
+        assert bus.wait_frame(after_seq=2, timeout=0.01) is None
+        del view
+
+
+def test_other_process_reads_published_frame():
+    image = np.arange(16 * 16 * 3, dtype=np.uint32).reshape(16, 16, 3).astype(np.uint8)
+    results = multiprocessing.Queue()
+    with FrameBus.create(slots=2, max_shape=(16, 16, 3)) as bus:
+        bus.publish(image, serial="dev")
+        process = multiprocessing.Process(target=read_in_worker, args=(bus.name, results))
+        process.start()
+        assert results.get(timeout=20) == (0, "dev", int(image.sum()))
+        process.join(timeout=20)
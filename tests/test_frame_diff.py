@@ -0,0 +1,14 @@
+import numpy as np
+
+from core.frame_diff import FrameDiffer
+
+
+def test_slow_fade_accumulates_against_last_reported_frame():
+    differ = FrameDiffer(diff_threshold=8)
+    assert differ.update(np.zeros((360, 640), np.uint8)) is None
+
+    # 每帧只变亮3，单看相邻帧永远不超过阈值
+    results = [differ.update(np.full((360, 640), value, np.uint8)) for value in range(3, 40, 3)]
+    assert any(results)
+    assert results[0] == [] and results[1] == []
+    assert results[2] == [(0, 0, 640, 360)]
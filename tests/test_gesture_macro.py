@@ -0,0 +1,32 @@
+import pytest
+
+from core.gesture_macro import MACRO_TIMEOUT_MARGIN, GestureMacro
+
+
+class FakeADB:
+    def __init__(self):
+        self.calls = []
+
+    def execute_command(self, command, timeout=None):
+        self.calls.append((command, timeout))
+
+
+def test_run_timeout_covers_macro_duration():
+    macro = GestureMacro().tap(1, 2).wait(12000).swipe(0, 0, 100, 100, 500).wait(3000)
+    assert macro.duration == 15.5
+
+    adb = FakeADB()
+    macro.run(adb)
+    assert adb.calls == [(["shell", macro.to_script()], 15.5 + MACRO_TIMEOUT_MARGIN)]
+
+
+def test_split_scripts_timeout_per_script():
+    macro = GestureMacro()
+    for _ in range(400):
+        macro.tap(100, 200).wait(100)
+
+    adb = FakeADB()
+    macro.run(adb)
+    assert [command[1] for command, _ in adb.calls] == macro.to_scripts()
+    assert len(adb.calls) > 1
+    assert sum(timeout - MACRO_TIMEOUT_MARGIN for _, timeout in adb.calls) == pytest.approx(macro.duration)
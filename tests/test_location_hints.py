@@ -0,0 +1,44 @@
+import numpy as np
+
+from core.game_image_detector import GameImageDetector
+
+
+def test_stale_location_hint_is_dropped_after_consecutive_misses():
+    rng = np.random.default_rng(0)
+    screen = rng.integers(0, 255, (300, 400, 3), np.uint8)
+    detector = GameImageDetector(hint_miss_limit=2)
+    detector.template_cache["button"] = screen[100:140, 200:260].copy()
+
+    assert detector.find_element(screen, "button") == (230, 120)
+    assert detector.location_hints["button"] == (230, 120)
+
+    # 元素消失后，位置提示连续未命中 hint_miss_limit 次即被丢弃
+    blank = np.zeros_like(screen)
+    assert detector.find_element(blank, "button") is None
+    assert "button" in detector.location_hints
+    assert detector.find_element(blank, "button") is None
+    assert "button" not in detector.location_hints
+    assert detector.hint_stats["button"].hint_misses == 2
+
+    assert detector.find_element(blank, "button") is None
+    assert detector.hint_stats["button"].hint_misses == 2
+
+
+def test_find_elements_uses_and_updates_location_hints():
+    rng = np.random.default_rng(0)
+    screen = rng.integers(0, 255, (300, 400, 3), np.uint8)
+    detector = GameImageDetector()
+    detector.template_cache["button"] = screen[100:140, 200:260].copy()
+
+    assert detector.find_elements(screen, ["button"])["button"][:2] == (230, 120)
+    assert detector.location_hints["button"] == (230, 120)
+    assert detector.hint_stats["button"].full_searches == 1
+
+    # 第二帧直接在提示窗口内命中，不再全图搜索
+    assert detector.find_elements(screen, ["button"])["button"][:2] == (230, 120)
+    stats = detector.hint_stats["button"]
+    assert (stats.hint_hits, stats.full_searches) == (1, 1)
+
+    # find_element 与 find_elements 共用同一份提示
+    assert detector.find_element(screen, "button") == (230, 120)
+    assert detector.hint_stats["button"].hint_hits == 2
@@ -0,0 +1,51 @@
+import numpy as np
+
+from core.image_detector import ImageDetector, non_max_suppression
+
+
+def loop_nms(boxes, scores, overlap_threshold):
+    """逐对比较的贪心NMS，作为向量化实现的参照"""
+    order = sorted(range(len(boxes)), key=lambda i: scores[i], reverse=True)
+    keep = []
+    for i in order:
+        x1, y1, x2, y2 = boxes[i]
+        suppressed = False
+        for j in keep:
+            kx1, ky1, kx2, ky2 = boxes[j]
+            inter = max(min(x2, kx2) - max(x1, kx1), 0) * max(min(y2, ky2) - max(y1, ky1), 0)
+            union = (x2 - x1) * (y2 - y1) + (kx2 - kx1) * (ky2 - ky1) - inter
+            if inter / union > overlap_threshold:
+                suppressed = True
+                break
+        if not suppressed:
+            keep.append(i)
+    return keep
+
+
+def test_matches_loop_implementation():
+    rng = np.random.default_rng(0)
+    for overlap_threshold in (0.0, 0.3, 0.7):
+        xy = rng.integers(0, 200, (300, 2))
+        wh = rng.integers(10, 40, (300, 2))
+        boxes = np.hstack([xy, xy + wh])
+        # 分数互不相同，两种实现的处理顺序唯一
+        scores = rng.permutation(300).astype(np.float32) / 300
+
+        keep = non_max_suppression(boxes, scores, overlap_threshold)
+        assert keep.tolist() == loop_nms(boxes.tolist(), scores.tolist(), overlap_threshold)
+
+
+def test_empty_input():
+    assert non_max_suppression(np.empty((0, 4)), np.empty(0)).size == 0
+
+
+def test_find_all_templates_one_hit_per_instance():
+    rng = np.random.default_rng(1)
+    screen = rng.integers(0, 255, (200, 300, 3), np.uint8)
+    template = rng.integers(0, 255, (20, 30, 3), np.uint8)
+    positions = [(10, 10), (100, 50), (240, 150)]
+    for x, y in positions:
+        screen[y:y + 20, x:x + 30] = template
+
+    matches = ImageDetector().find_all_templates(screen, template, threshold=0.9)
+    assert sorted(match[:2] for match in matches) == sorted((x + 15, y + 10) for x, y in positions)
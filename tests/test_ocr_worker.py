@@ -0,0 +1,36 @@
+import os
+
+import numpy as np
+import pytest
+
+from core.ocr_worker import OCRWorker
+
+
+def failing_factory():
+    raise ValueError("模拟引擎初始化失败")
+
+
+def crashing_factory():
+    def ocr(frame):
+        os._exit(3)
+    return ocr
+
+
+def test_close_does_not_block_when_worker_died_with_full_queue():
+    worker = OCRWorker(failing_factory, max_pending=1)
+    worker.submit(np.zeros((4, 4, 3), np.uint8))
+    worker._process.join(timeout=10)
+    worker.close()
+    assert worker._process is None
+
+
+def test_dead_worker_raises_instead_of_blocking():
+    worker = OCRWorker(crashing_factory, max_pending=1)
+    with pytest.raises(RuntimeError, match="exitcode=3"):
+        for _ in range(10):
+            worker.submit(np.zeros((4, 4, 3), np.uint8))
+
+    worker = OCRWorker(crashing_factory, max_pending=1)
+    worker.submit(np.zeros((4, 4, 3), np.uint8))
+    with pytest.raises(RuntimeError, match="exitcode=3"):
+        worker.get(timeout=10)
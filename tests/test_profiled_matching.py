@@ -0,0 +1,53 @@
+import asyncio
+
+import cv2
+import numpy as np
+
+from core.adb_manager import ADBManager
+from core.async_adb_manager import AsyncADBManager
+from core.game_image_detector import GameImageDetector
+
+
+def make_icon_scene(tmp_path):
+    """透明背景的圆形图标放在两处不同的背景上，不带掩码时背景差异会拉低匹配分数"""
+    rng = np.random.default_rng(0)
+    screen = rng.integers(0, 255, (240, 320, 3), np.uint8)
+    icon = np.zeros((32, 32, 4), np.uint8)
+    cv2.circle(icon, (16, 16), 12, (40, 200, 90, 255), -1)
+    cv2.putText(icon, "A", (9, 23), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255, 255), 2)
+
+    alpha = icon[:, :, 3:] / 255.0
+    for x, y in ((40, 50), (220, 150)):
+        roi = screen[y:y + 32, x:x + 32]
+        roi[:] = (icon[:, :, :3] * alpha + roi * (1 - alpha)).astype(np.uint8)
+
+    path = str(tmp_path / "icon.png")
+    cv2.imwrite(path, icon)
+    return screen, path
+
+
+def test_masked_template_found_on_every_path(tmp_path):
+    screen, path = make_icon_scene(tmp_path)
+    detector = GameImageDetector(use_hints=False)
+    detector.load_template("icon", path)
+    assert "icon" in detector.prepared_templates
+
+    assert detector.find_element(screen, "icon", threshold=0.9) in ((56, 66), (236, 166))
+    found = detector.wait_for_element(lambda: screen, "icon", timeout=1, interval=0.1, threshold=0.9)
+    assert found in ((56, 66), (236, 166))
+    assert sorted(detector.find_multiple_elements(screen, "icon", threshold=0.9)) == [(56, 66), (236, 166)]
+
+
+def test_find_image_on_screen_uses_mask(tmp_path):
+    screen, path = make_icon_scene(tmp_path)
+
+    class FakeADB(ADBManager):
+        def screenshot_array(self, raw=True):
+            return screen
+
+    class FakeAsyncADB(AsyncADBManager):
+        async def screenshot_array(self, raw=True):
+            return screen
+
+    assert FakeADB().find_image_on_screen(path, threshold=0.9) in ((56, 66), (236, 166))
+    assert asyncio.run(FakeAsyncADB().find_image_on_screen(path, threshold=0.9)) in ((56, 66), (236, 166))
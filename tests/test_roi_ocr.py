@@ -0,0 +1,61 @@
+import cv2
+import numpy as np
+
+from core.roi_ocr import RegionOCR
+
+
+class FakeOCR:
+    """记录调用次数，返回裁剪图中固定位置的一条文字"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, crop):
+        self.calls += 1
+        return [{"rec_texts": [f"text{self.calls}"], "rec_polys": [[[2, 3], [40, 3], [40, 20], [2, 20]]]}]
+
+
+def make_frame(value: str):
+    frame = np.zeros((200, 300, 3), np.uint8)
+    cv2.putText(frame, value, (110, 70), cv2.FONT_HERSHEY_SIMPLEX, 1.0, (255, 255, 255), 2)
+    return frame
+
+
+def test_unchanged_region_reuses_cached_result():
+    ocr = FakeOCR()
+    region_ocr = RegionOCR(ocr)
+    region = (100, 40, 220, 90)
+
+    first = region_ocr.recognize(make_frame("123"), [region])
+    second = region_ocr.recognize(make_frame("123"), [region])
+    assert ocr.calls == 1
+    assert (region_ocr.hits, region_ocr.misses) == (1, 1)
+    assert [item.text for item in second.paddle_result] == [item.text for item in first.paddle_result] == ["text1"]
+
+
+def test_changed_region_invalidates_cache():
+    ocr = FakeOCR()
+    region_ocr = RegionOCR(ocr)
+    region = (100, 40, 220, 90)
+
+    region_ocr.recognize(make_frame("123"), [region])
+    result = region_ocr.recognize(make_frame("128"), [region])
+    assert ocr.calls == 2
+    assert [item.text for item in result.paddle_result] == ["text2"]
+
+    # 区域外的变化不影响缓存
+    frame = make_frame("128")
+    frame[150:190, 10:60] = 255
+    region_ocr.recognize(frame, [region])
+    assert ocr.calls == 2
+
+    region_ocr.clear()
+    region_ocr.recognize(frame, [region])
+    assert ocr.calls == 3
+
+
+def test_result_coordinates_mapped_to_full_frame():
+    region_ocr = RegionOCR(FakeOCR())
+    item = region_ocr.recognize(make_frame("123"), [(100, 40, 220, 90)]).paddle_result[0]
+    x1, y1, _, y2 = item.predict_rect
+    assert (x1, y1, y2) == (102, 43, 60)
@@ -0,0 +1,50 @@
+import cv2
+import numpy as np
+
+from core.game_image_detector import GameImageDetector
+from core.screen_classifier import ScreenClassifier
+
+
+def make_screens():
+    rng = np.random.default_rng(0)
+    menu = cv2.GaussianBlur(rng.integers(0, 255, (180, 320, 3), np.uint8), (0, 0), 6)
+    battle = cv2.GaussianBlur(rng.integers(0, 255, (180, 320, 3), np.uint8), (0, 0), 6)
+    battle[:] = np.clip(battle.astype(int) + (0, 0, 80), 0, 255).astype(np.uint8)
+    return menu, battle
+
+
+def test_classify_registered_and_unknown_screens():
+    menu, battle = make_screens()
+    classifier = ScreenClassifier()
+    classifier.register("menu", menu, ["start"])
+    classifier.register("battle", battle, ["skill"])
+
+    # 小幅变化(计时器、压缩噪声)仍识别为同一界面
+    noisy_menu = menu.copy()
+    cv2.putText(noisy_menu, "00:12", (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 1)
+    assert classifier.classify(noisy_menu) == "menu"
+    assert classifier.classify(battle) == "battle"
+    assert classifier.classify(np.full_like(menu, 255)) is None
+    assert classifier.templates_for("battle") == ["skill"]
+    assert classifier.templates_for(None) is None
+
+
+def test_find_elements_checks_only_current_screen_templates():
+    menu, battle = make_screens()
+    classifier = ScreenClassifier()
+    classifier.register("menu", menu, ["start"])
+    classifier.register("battle", battle, ["skill"])
+
+    detector = GameImageDetector(screen_classifier=classifier)
+    detector.template_cache["start"] = menu[60:100, 100:160].copy()
+    detector.template_cache["skill"] = menu[60:100, 100:160].copy()
+
+    found = detector.find_elements(menu)
+    assert detector.current_screen == "menu"
+    assert list(found) == ["start"]
+
+    # 未知界面时匹配所有模板
+    unknown = np.full_like(menu, 255)
+    unknown[60:100, 100:160] = menu[60:100, 100:160]
+    assert set(detector.find_elements(unknown)) == {"start", "skill"}
+    assert detector.current_screen is None
@@ -0,0 +1,72 @@
+import numpy as np
+
+from core.gesture_macro import GestureMacro
+from core.session_recorder import ReplayDevice, SessionRecorder, SessionReplay
+
+
+def make_frames():
+    rng = np.random.default_rng(0)
+    base = rng.integers(0, 255, (60, 80, 3), np.uint8)
+    frames = []
+    for i in range(12):
+        frame = base.copy()
+        frame[10:20, 10 + i:30 + i] = 255 - i * 10
+        frames.append(frame)
+        if i % 4 == 0:
+            # 重复帧
+            frames.append(frame.copy())
+    # 分辨率变化和灰度帧
+    frames.append(rng.integers(0, 255, (40, 50, 3), np.uint8))
+    frames.append(rng.integers(0, 255, (40, 50), np.uint8))
+    return frames
+
+
+def test_replay_is_lossless(tmp_path):
+    path = str(tmp_path / "session.rec")
+    frames = make_frames()
+    with SessionRecorder(path, keyframe_interval=4) as recorder:
+        for frame in frames:
+            recorder.add_frame(frame)
+        recorder.add_event("tap", x=10, y=20)
+    stats = recorder.stats()
+    assert stats["frames"] == len(frames) and stats["repeats"] == 3 and stats["events"] == 1
+
+    replay = SessionReplay(path)
+    assert len(replay) == len(frames)
+    assert [event for _, event in replay.events] == [{"type": "tap", "x": 10, "y": 20}]
+
+    device = ReplayDevice(replay)
+    assert device.get_screen_resolution() == (80, 60)
+    replayed = []
+    while (frame := device.screenshot_array()) is not None:
+        assert not frame.flags.writeable
+        replayed.append(frame.copy())
+    assert len(replayed) == len(frames)
+    for original, restored in zip(frames, replayed):
+        assert original.shape == restored.shape and np.array_equal(original, restored)
+
+
+def test_recorder_keeps_private_copy(tmp_path):
+    path = str(tmp_path / "session.rec")
+    frames = [np.full((8, 8, 3), i, np.uint8) for i in range(5)]
+    with SessionRecorder(path) as recorder:
+        for frame in frames:
+            recorder.add_frame(frame, copy=True)
+            frame[:] = 255
+    assert [int(frame[0, 0, 0]) for _, frame in SessionReplay(path).frames()] == [0, 1, 2, 3, 4]
+
+
+def test_replay_device_records_inputs(tmp_path):
+    path = str(tmp_path / "session.rec")
+    with SessionRecorder(path) as recorder:
+        recorder.add_frame(np.zeros((8, 8, 3), np.uint8))
+
+    device = ReplayDevice(path)
+    device.tap(1, 2)
+    device.long_press(3, 4, 500)
+    device.run_macro(GestureMacro().tap(5, 6))
+    assert [event for _, event in device.issued_events] == [
+        {"type": "tap", "x": 1, "y": 2},
+        {"type": "swipe", "x1": 3, "y1": 4, "x2": 3, "y2": 4, "duration": 500},
+        {"type": "macro", "steps": [{"type": "tap", "x": 5, "y": 6}]},
+    ]
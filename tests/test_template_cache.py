@@ -0,0 +1,59 @@
+import os
+
+import cv2
+import numpy as np
+
+from core.game_image_detector import GameImageDetector
+from core.image_detector import ImageDetector
+from core.template_cache import TemplateCache, default_template_cache
+
+
+def test_custom_cache_is_used(tmp_path):
+    cache = TemplateCache(max_bytes=1024)
+    assert ImageDetector(cache).template_cache is cache
+    assert GameImageDetector(template_cache=cache).matcher.template_cache is cache
+    assert ImageDetector().template_cache is default_template_cache
+
+
+def test_custom_cache_respects_max_bytes(tmp_path):
+    cache = TemplateCache(max_bytes=1024)
+    detector = ImageDetector(cache)
+    for i in range(3):
+        path = str(tmp_path / f"t{i}.png")
+        cv2.imwrite(path, np.full((16, 16, 3), i * 40, dtype=np.uint8))
+        assert detector.load_template(path) is not None
+
+    assert cache.current_bytes <= 1024
+    assert len(cache) == 1
+
+
+def test_cache_hits_and_reloads_modified_file(tmp_path):
+    cache = TemplateCache()
+    path = str(tmp_path / "t.png")
+    cv2.imwrite(path, np.full((16, 16, 3), 10, dtype=np.uint8))
+
+    first = cache.get(path)
+    assert cache.get(path) is first
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    cv2.imwrite(path, np.full((16, 16, 3), 200, dtype=np.uint8))
+    os.utime(path, ns=(os.stat(path).st_atime_ns, os.stat(path).st_mtime_ns + 1_000_000))
+    reloaded = cache.get(path)
+    assert reloaded is not first
+    assert int(reloaded[0, 0, 0]) == 200
+    assert cache.get(str(tmp_path / "missing.png")) is None
+
+
+def test_array_and_path_inputs_match_identically(tmp_path):
+    rng = np.random.default_rng(0)
+    screen = rng.integers(0, 255, (120, 160, 3), np.uint8)
+    template = screen[30:60, 40:90].copy()
+    screen_path, template_path = str(tmp_path / "screen.png"), str(tmp_path / "template.png")
+    cv2.imwrite(screen_path, screen)
+    cv2.imwrite(template_path, template)
+
+    detector = ImageDetector(TemplateCache())
+    from_arrays = detector.find_template(screen, template)
+    assert from_arrays[:2] == (65, 45)
+    assert detector.find_template(screen_path, template_path)[:2] == from_arrays[:2]
+    assert detector.find_template(screen, template_path)[:2] == from_arrays[:2]
@@ -0,0 +1,56 @@
+import cv2
+import numpy as np
+import pytest
+
+from core.game_image_detector import GameImageDetector
+from core.template_pack import TemplatePack
+from core.template_profile import TemplateProfile
+
+
+def make_detector(tmp_path):
+    rng = np.random.default_rng(0)
+    screen = rng.integers(0, 255, (200, 300, 3), np.uint8)
+
+    detector = GameImageDetector()
+    detector.template_cache["plain"] = screen[20:60, 30:90].copy()
+    detector.set_template_meta("plain", threshold=0.9, region=(0, 0, 150, 100))
+
+    icon = np.zeros((24, 24, 4), np.uint8)
+    cv2.circle(icon, (12, 12), 10, (30, 180, 240, 255), -1)
+    path = str(tmp_path / "icon.png")
+    cv2.imwrite(path, icon)
+    detector.load_template("icon", path, profile=TemplateProfile(grayscale=True, scale=0.5))
+    return detector, screen
+
+
+def test_save_and_load_round_trip(tmp_path):
+    detector, screen = make_detector(tmp_path)
+    pack_path = str(tmp_path / "templates.tpack")
+    assert detector.save_pack(pack_path, meta={"resolution": [300, 200]}) == 2
+
+    pack = TemplatePack(pack_path)
+    assert sorted(pack.names()) == ["icon", "plain"] and pack.meta == {"resolution": [300, 200]}
+
+    loaded = GameImageDetector()
+    assert loaded.load_pack(pack_path) == 2
+    for name in ("plain", "icon"):
+        assert np.array_equal(loaded.template_cache[name], detector.template_cache[name])
+    assert loaded.thresholds == {"plain": 0.9}
+    assert loaded.region_hints == {"plain": (0, 0, 150, 100)}
+
+    original, restored = detector.prepared_templates["icon"], loaded.prepared_templates["icon"]
+    assert restored.profile == original.profile
+    for field in ("image", "mask", "processed", "processed_mask"):
+        assert np.array_equal(getattr(restored, field), getattr(original, field))
+    assert "plain" not in loaded.prepared_templates
+
+    # 包内数组是只读映射，匹配结果与原检测器一致
+    assert not loaded.template_cache["plain"].flags.writeable
+    assert loaded.find_element(screen, "plain") == detector.find_element(screen, "plain") == (60, 40)
+
+
+def test_rejects_other_files(tmp_path):
+    path = tmp_path / "not_a_pack.tpack"
+    path.write_bytes(b"garbage")
+    with pytest.raises(ValueError):
+        TemplatePack(str(path))
@@ -0,0 +1,33 @@
+import numpy as np
+
+from core.game_image_detector import GameImageDetector
+
+
+def make_detector():
+    rng = np.random.default_rng(1)
+    screen = rng.integers(0, 255, (200, 300, 3), np.uint8)
+    template = screen[60:100, 120:180].copy()
+    # 画面上的目标带噪声，匹配分数约 0.95
+    noise = rng.normal(0, 18, screen[60:100, 120:180].shape)
+    screen[60:100, 120:180] = np.clip(screen[60:100, 120:180] + noise, 0, 255).astype(np.uint8)
+
+    detector = GameImageDetector(use_hints=False)
+    detector.template_cache["button"] = template
+    return detector, screen
+
+
+def test_wait_and_multiple_use_configured_threshold():
+    detector, screen = make_detector()
+
+    detector.set_template_meta("button", threshold=0.99)
+    assert detector.find_element(screen, "button") is None
+    assert detector.wait_for_element(lambda: screen, "button", timeout=0.3, interval=0.1) is None
+    assert detector.find_multiple_elements(screen, "button") == []
+
+    detector.set_template_meta("button", threshold=0.5)
+    assert detector.find_element(screen, "button") == (150, 80)
+    assert detector.wait_for_element(lambda: screen, "button", timeout=0.3, interval=0.1) == (150, 80)
+    assert detector.find_multiple_elements(screen, "button") == [(150, 80)]
+
+    # 显式传入的阈值优先于配置
+    assert detector.wait_for_element(lambda: screen, "button", timeout=0.3, interval=0.1, threshold=0.99) is None
@@ -1,23 +1,26 @@
 from typing import List, Tuple
 
 import cv2
-import matplotlib.image as mpimg
-import matplotlib.pyplot as plt
 import numpy as np
-from matplotlib.widgets import RectangleSelector
 
-from core.adb_manager import ADBManager
+from core.debug_sink import draw_boxes
+from core.image_detector import ImageSource
 
 
-def draw_bounding_boxes(image_path: str, boxes: List[Tuple[int, int, int, int]], output_path: str = None,
+def draw_bounding_boxes(image_path: ImageSource, boxes: List[Tuple[int, int, int, int]], output_path: str = None,
                         color: Tuple[int, int, int] = (0, 255, 0), thickness: int = 2) -> np.ndarray:
-    image = cv2.imread(image_path)
-    if image is None:
-        raise ValueError(f"无法读取图片: {image_path}")
-
-    for box in boxes:
-        x1, y1, x2, y2 = box
-        cv2.rectangle(image, (x1, y1), (x2, y2), color, thickness)
+    """
+    :param image_path: 图片路径或BGR数组(不会修改传入的数组)
+    :param output_path: 同步写出路径；在主循环中输出调试图请使用 core.debug_sink.DebugSink
+    """
+    if isinstance(image_path, np.ndarray):
+        image = image_path.copy()
+    else:
+        image = cv2.imread(image_path)
+        if image is None:
+            raise ValueError(f"无法读取图片: {image_path}")
+
+    draw_boxes(image, boxes, color, thickness)
 
     if output_path:
         cv2.imwrite(output_path, image)
@@ -59,19 +62,18 @@ def display_image(image: np.ndarray):
 # plt.show()
 
 
-if __name__ == '__main__':
-    adb = ADBManager(default_port=16384)
-    adb.connect_device()
-
-    save_path = r"D:\automation_demo\resources\test.png"
-    adb.screenshot(save_path)
+def crop_interactive(image_path: str, output_path: str):
+    """框选截图中的区域并保存为模板图片"""
+    # matplotlib 只在交互截取模板时使用，按需导入，避免拖慢工作进程启动
+    import matplotlib.image as mpimg
+    import matplotlib.pyplot as plt
+    from matplotlib.widgets import RectangleSelector
 
-    img = mpimg.imread(save_path)
+    img = mpimg.imread(image_path)
 
     fig, ax = plt.subplots()
     ax.imshow(img)
 
-
     def onselect(eclick, erelease):
         x1, y1 = eclick.xdata, eclick.ydata
         x2, y2 = erelease.xdata, erelease.ydata
@@ -79,14 +81,25 @@ if __name__ == '__main__':
 
         cropped_img = img[int(y1):int(y2), int(x1):int(x2)]
 
-        plt.imsave(r'D:\automation_demo\resources\cropped_image.jpg', cropped_img)
-        print("截图已保存为 'cropped_image.jpg'")
-
+        plt.imsave(output_path, cropped_img)
+        print(f"截图已保存为 '{output_path}'")
 
     rect_selector = RectangleSelector(ax, onselect, useblit=True)
 
     plt.show()
 
+
+if __name__ == '__main__':
+    from core.adb_manager import ADBManager
+
+    adb = ADBManager(default_port=16384)
+    adb.connect_device()
+
+    save_path = r"D:\automation_demo\resources\test.png"
+    adb.screenshot(save_path)
+
+    crop_interactive(save_path, r'D:\automation_demo\resources\cropped_image.jpg')
+
 # if __name__ == "__main__":
 #     image_path = r"D:\automation_demo\resources\test.png"
 #     boxes = [(1814, 1026, 1880, 1059), ]